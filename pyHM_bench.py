@@ -0,0 +1,842 @@
+# pyHM
+# Copyright (C) 2017  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+import pyHM_dattrc
+import pyHM_metrics
+import pyHM_dbtool
+import pyHM_websrv
+import argparse
+import datetime
+import http.client
+import json
+import os
+import queue
+import random
+import re
+import serial
+import sqlite3
+import ssl
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from collections import OrderedDict
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+def sml_frame(payload):
+  """
+  @brief   Pack a payload into a SML transport frame.
+  @param   payload   The payload bytes.
+  @return  The frame including start sequence, escaped payload, padding, end sequence and CRC.
+  """
+  esc = pyHM_dattrc.HM_DatTrc_SMLFramer.ESC
+  pad = (4 - (len(payload) % 4)) % 4
+  dat = bytes(payload) + bytes(pad)
+  frm = bytearray(pyHM_dattrc.HM_DatTrc_SMLFramer.START)
+  for i in range(0, len(dat), 4):
+    frm.extend(dat[i:i+4])
+    if ( dat[i:i+4] == esc ): frm.extend(esc)
+  frm.extend(esc + bytes([0x1A, pad]))
+  frm.extend(sml_crc16(frm).to_bytes(2, "little"))
+  return bytes(frm)
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def sml_frames(count, size, seed=0):
+  """
+  @brief   Create random SML transport frames, some of them containing escaped escape sequences.
+  @param   count   The number of frames.
+  @param   size    The payload size of each frame in bytes.
+  @param   seed    The random seed.
+  """
+  rnd = random.Random(seed)
+  frm = []
+  for i in range(count):
+    payload = bytearray(rnd.getrandbits(8) for j in range(size))
+    if ( 0 == i % 3 and 8 <= size ): payload[4:8] = pyHM_dattrc.HM_DatTrc_SMLFramer.ESC
+    frm.append(sml_frame(payload))
+  return frm
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def sml_crc16(data):
+  """
+  @brief   Calculate the CRC16/X.25 used by SML messages and transport frames.
+  @param   data   The bytes.
+  @return  The CRC value, transmitted low byte first.
+  """
+  crc = 0xFFFF
+  for byte in data:
+    crc = crc ^ byte
+    for i in range(8):
+      if ( crc & 1 ): crc = (crc >> 1) ^ 0x8408
+      else          : crc = crc >> 1
+  return crc ^ 0xFFFF
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def sml_value(value, size=None, signed=True):
+  """
+  @brief   Encode a SML type length field and value.
+  @param   value    None for an absent optional value, bytes for an octet string, a list of encoded elements for a list
+                    or an integer.
+  @param   size     The number of bytes of an integer, or None for the least number of bytes.
+  @param   signed   Whether an integer is encoded as signed or as unsigned.
+  @return  The encoded bytes.
+  """
+  if ( None == value ):
+    return b"\x01"
+  if ( isinstance(value, list) ):
+    if ( 15 >= len(value) ):
+      return bytes([0x70 | len(value)]) + b"".join(value)
+    return bytes([0xF0 | (len(value) >> 4), len(value) & 0x0F]) + b"".join(value)
+  if ( isinstance(value, (bytes, bytearray)) ):
+    typ, dat = 0x0, bytes(value)
+  else:
+    if ( None == size ):
+      if ( signed ): size = max(1, ({True:~value, False:value}[0 > value].bit_length() + 8) // 8)
+      else         : size = max(1, (value.bit_length() + 7) // 8)
+    typ, dat = {True:0x5, False:0x6}[signed], value.to_bytes(size, "big", signed=signed)
+  if ( 14 >= len(dat) ):
+    return bytes([(typ << 4) | (len(dat) + 1)]) + dat
+  return bytes([0x80 | (typ << 4) | ((len(dat) + 2) >> 4), (len(dat) + 2) & 0x0F]) + dat
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def sml_message(txid, tag, body):
+  """
+  @brief   Encode a SML message including its CRC.
+  @param   txid   The transaction identifier bytes.
+  @param   tag    The message body tag, e.g. 0x0701 for SML_GetListRes.
+  @param   body   The encoded message body.
+  @return  The encoded bytes.
+  """
+  msg = bytes([0x76]) + sml_value(txid) + sml_value(0, 1, False) + sml_value(0, 1, False) + sml_value([sml_value(tag, 4, False), body])
+  return msg + b"\x63" + sml_crc16(msg).to_bytes(2, "little") + b"\x00"
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def sml_telegram(seq, values, server=b"\x0a\x01BENCH\x00\x01"):
+  """
+  @brief   Encode a SML transport frame with a SML_PublicOpen.Res, a SML_GetList.Res and a SML_PublicClose.Res message,
+           the way meters push their readings.
+  @param   seq      The sequence number of the telegram, used for the transaction identifiers.
+  @param   values   A list of (obis, unit, scaler, value) tuples, value either an integer or bytes.
+  @param   server   The server identifier bytes.
+  @return  The frame bytes.
+  """
+  txid = seq.to_bytes(4, "big")
+  vals = [sml_value([sml_value(obis.to_bytes(6, "big")), sml_value(None), sml_value(None), sml_value(unit, 1, False), sml_value(scaler, 1), sml_value(value), sml_value(None)]) for obis, unit, scaler, value in values]
+  msg  = sml_message(txid + b"\x00", 0x0101, sml_value([sml_value(None), sml_value(None), sml_value(txid), sml_value(server), sml_value(None), sml_value(None)]))
+  msg += sml_message(txid + b"\x01", 0x0701, sml_value([sml_value(None), sml_value(server), sml_value(None), sml_value(None), sml_value(vals), sml_value(None), sml_value(None)]))
+  msg += sml_message(txid + b"\x02", 0x0201, sml_value([sml_value(None)]))
+  return sml_frame(msg)
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def sml_telegrams(count, values, seed=0):
+  """
+  @brief   Create synthetic SML_GetList.Res telegrams, an energy register followed by power values.
+  @param   count    The number of telegrams.
+  @param   values   The number of OBIS values per telegram.
+  @param   seed     The random seed.
+  @return  A list of frames.
+  """
+  rnd = random.Random(seed)
+  frm = []
+  for i in range(count):
+    val = [(0x0100010800FF, 30, -1, 123456789 + 10*i)]
+    val = val + [(0x0100100700FF + (j << 24), 27, 0, rnd.randint(-5000, 5000)) for j in range(values - 1)]
+    frm.append(sml_telegram(i, val[:values]))
+  return frm
+
+########################################################################################################################
+
+class HM_Bench_RegexFramer:
+  """
+  @brief   The former regular expression based frame search of HM_DatTrc_SMLPacket.data_received as reference.
+  """
+
+  PATTERN = re.compile(bytes("(?<!\x1b\x1b\x1b\x1b)\x1b\x1b\x1b\x1b\x01\x01\x01\x01.*?(?<!\x1b\x1b\x1b\x1b)\x1b\x1b\x1b\x1b\x1a(\x00|\x01|\x02|\x03)..".encode("ascii")), re.DOTALL)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self):
+    """
+    @brief   Constructor.
+    """
+    self.buffer = bytearray()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def feed(self, data):
+    """
+    @brief   Buffer received data and return all frames completed by it.
+    @param   data   Bytes received via serial port.
+    """
+    self.buffer.extend(data)
+    packets = [packet for packet in self.PATTERN.finditer(self.buffer)]
+    frames  = [self.buffer[packet.start():packet.end()] for packet in packets]
+    if ( packets != [] ):
+      del self.buffer[:packets[-1].end()]
+    return frames
+
+########################################################################################################################
+
+class HM_Bench_LegacyInsert:
+  """
+  @brief   The former statement sequence of HM_DatTrc_Sql.insert as reference, i.e. a point inserted with a NULL
+           timestamp, the timestamp inserted and the point updated on each timestamp cache miss, and a commit after
+           each value.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, sqldb):
+    """
+    @brief   Constructor.
+    @param   sqldb   The SQL database file.
+    """
+    self.con = sqlite3.connect(sqldb)
+    self.con.execute("CREATE TABLE IF NOT EXISTS m_TIMESTAMPS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, UNIQUE(value));")
+    self.con.execute("CREATE TABLE IF NOT EXISTS m_POINTS (PK INTEGER PRIMARY KEY AUTOINCREMENT, pk_timestamp, pk_meter, pk_obis, pk_unit, value, UNIQUE(pk_meter, pk_obis, pk_unit, value));")
+    self.con.commit()
+    self.tstamps = {}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def trace(self, callback):
+    """
+    @brief   Register a callback called with each executed SQL statement.
+    @param   callback   The callback.
+    """
+    self.con.set_trace_callback(callback)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def insert_many(self, rows):
+    """
+    @brief   Insert data tuples the former way.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    for timestamp, meter, obis, unit, value in rows:
+      try:
+        pk_tstamp = self.tstamps[timestamp]
+        self.con.execute("INSERT INTO m_POINTS (pk_timestamp, pk_meter, pk_obis, pk_unit, value) VALUES (?, ?, ?, ?, ?);", [pk_tstamp, 1, obis, unit, value])
+      except sqlite3.IntegrityError:
+        pass
+      except KeyError:
+        try:
+          pk_point = self.con.execute("INSERT INTO m_POINTS (pk_timestamp, pk_meter, pk_obis, pk_unit, value) VALUES (?, ?, ?, ?, ?);", [None, 1, obis, unit, value]).lastrowid
+        except sqlite3.IntegrityError:
+          pass
+        else:
+          self.tstamps = {timestamp: self.con.execute("INSERT INTO m_TIMESTAMPS (value) VALUES (?);", [timestamp.isoformat()]).lastrowid}
+          self.con.execute("UPDATE m_POINTS SET pk_timestamp=? WHERE PK=?", [self.tstamps[timestamp], pk_point])
+      self.con.commit()
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def telegram_rows(count, values, meter="BenchMeter", seed=0):
+  """
+  @brief   Create the data tuples of synthetic telegrams, one timestamp per second.
+  @param   count    The number of telegrams.
+  @param   values   The number of OBIS values per telegram.
+  @param   meter    The HM meter identifier.
+  @param   seed     The random seed.
+  @return  A list of telegrams, each a list of (timestamp, meter, obis, unit, value) data tuples.
+  """
+  rnd = random.Random(seed)
+  t0  = datetime.datetime(2017, 1, 1)
+  return [[(t0 + datetime.timedelta(seconds=i), meter, 0x0100010800FF + (j << 16), 30, round(rnd.uniform(0, 1e6), 1)) for j in range(values)] for i in range(count)]
+
+########################################################################################################################
+
+class HM_Bench_ReplayPacket(pyHM_dattrc.HM_DatTrc_SMLPacket):
+  """
+  @brief   HM_DatTrc_SMLPacket measuring the processing time of each telegram and counting the stored values.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, idf, cfg, wrt=None):
+    """
+    @brief   Constructor.
+    @param   idf   A HM meter identifier.
+    @param   cfg   A HM meter configuration.
+    @param   wrt   A HM_DatTrc_SqlWriter to pass the data tuples to, or None to insert them directly.
+    """
+    super(HM_Bench_ReplayPacket, self).__init__(idf, cfg, wrt)
+    self.latency = []
+    self.values  = 0
+    self.__recv  = None
+    self.__tsim  = datetime.datetime(2017, 1, 1)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def prepare(self):
+    """
+    @brief   Prepare the processing, the RESET marker is not counted.
+    """
+    super(HM_Bench_ReplayPacket, self).prepare()
+    self.values = 0
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def store(self, rows):
+    """
+    @brief   Count and store data tuples. Replayed at full speed, many telegrams are received within a millisecond,
+             so each telegram is restamped one second after the previous one, as sent by meters.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    if ( rows and rows[0][0] != self.__recv ):
+      self.__recv = rows[0][0]
+      self.__tsim = self.__tsim + datetime.timedelta(seconds=1)
+    rows        = [(self.__tsim,) + tuple(row[1:]) for row in rows]
+    self.values = self.values + len(rows)
+    super(HM_Bench_ReplayPacket, self).store(rows)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def handle_packet(self, packet, timestamp=None):
+    """
+    @brief   Process a packet and measure the time taken to decode and store it.
+    @param   packet      A SML_Telegram.
+    @param   timestamp   The receive timestamp of the packet.
+    """
+    tstart = time.perf_counter()
+    super(HM_Bench_ReplayPacket, self).handle_packet(packet, timestamp)
+    self.latency.append(time.perf_counter() - tstart)
+
+########################################################################################################################
+
+class HM_Bench_DecodePacket(pyHM_dattrc.HM_DatTrc_SMLPacket):
+  """
+  @brief   HM_DatTrc_SMLPacket collecting the decoded data tuples instead of storing them.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, idf, cfg):
+    """
+    @brief   Constructor.
+    @param   idf   A HM meter identifier.
+    @param   cfg   A HM meter configuration.
+    """
+    super(HM_Bench_DecodePacket, self).__init__(idf, cfg)
+    self.rows = []
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def store(self, rows):
+    """
+    @brief   Collect data tuples without their timestamps.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    self.rows.extend([row[1:] for row in rows])
+
+########################################################################################################################
+
+class HM_Bench_LoadClient(threading.Thread):
+  """
+  @brief   HTTP(S) client thread of the load benchmark, requesting paths from a queue over a kept alive connection.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, url, ctx, timeout, paths, results):
+    """
+    @brief   Constructor.
+    @param   url       The split base URL of the web server.
+    @param   ctx       The SSL context for HTTPS, or None for HTTP.
+    @param   timeout   The request timeout in seconds.
+    @param   paths     A queue.Queue of the paths to request.
+    @param   results   A list the (status, time to first byte, latency, size[, error]) tuples are appended to.
+    """
+    super(HM_Bench_LoadClient, self).__init__()
+    self.__url     = url
+    self.__ctx     = ctx
+    self.__timeout = timeout
+    self.__paths   = paths
+    self.__results = results
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __connect(self):
+    """
+    @brief   Return a new connection to the web server.
+    """
+    if ( None != self.__ctx ):
+      return http.client.HTTPSConnection(self.__url.hostname, self.__url.port or 443, timeout=self.__timeout, context=self.__ctx)
+    return http.client.HTTPConnection(self.__url.hostname, self.__url.port or 80, timeout=self.__timeout)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def run(self):
+    """
+    @brief   Request paths until the queue is empty, failed requests are recorded with status 0.
+    """
+    con = self.__connect()
+    while ( True ):
+      try:
+        path = self.__paths.get_nowait()
+      except queue.Empty:
+        break
+      tstart = time.perf_counter()
+      try:
+        con.request("GET", path, headers={"Accept-Encoding":"gzip"})
+        rsp  = con.getresponse()
+        ttfb = time.perf_counter() - tstart
+        size = len(rsp.read())
+        self.__results.append((rsp.status, ttfb, time.perf_counter() - tstart, size, {True:None, False:"HTTP {}".format(rsp.status)}[200 == rsp.status]))
+        if ( rsp.will_close ):
+          con.close()
+          con = self.__connect()
+      except (OSError, http.client.HTTPException) as e:
+        self.__results.append((0, 0.0, time.perf_counter() - tstart, 0, "{}: {}".format(type(e).__name__, e)))
+        con.close()
+        con = self.__connect()
+    con.close()
+
+########################################################################################################################
+
+def bench_framer(args):
+  """
+  @brief   Feed fragmented frames into the frame scanners and report the throughput.
+  @param   args   The parsed command line arguments.
+  """
+  frames = sml_frames(args.count, args.size)
+  noise  = bytes(random.Random(1).getrandbits(8) for i in range(args.noise))
+  stream = noise + b"".join(frames)
+  print("framer: {} frames, {} bytes payload, {} bytes noise, {} bytes total".format(len(frames), args.size, len(noise), len(stream)))
+  for name, factory in (("regex", HM_Bench_RegexFramer), ("incremental", pyHM_dattrc.HM_DatTrc_SMLFramer)):
+    for chunk in args.chunk:
+      framer = factory()
+      found  = []
+      tstart = time.perf_counter()
+      for i in range(0, len(stream), chunk):
+        found.extend(framer.feed(stream[i:i+chunk]))
+      tdelta = time.perf_counter() - tstart
+      status = {True:"ok", False:"MISMATCH"}[[bytes(f) for f in found] == frames]
+      print("  {:<12} chunk {:>5} B: {:>10.3f} ms, {:>8.3f} us/byte, {:>9.1f} frames/s, {}".format(name, chunk, tdelta*1e3, tdelta*1e6/len(stream), len(found)/tdelta if tdelta else 0.0, status))
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_insert(args):
+  """
+  @brief   Insert synthetic telegrams and report the executed SQL statements per telegram and the throughput.
+  @param   args   The parsed command line arguments.
+  """
+  telegrams = telegram_rows(args.count, args.values)
+  print("insert: {} telegrams, {} values per telegram".format(args.count, args.values))
+  tmpdir = tempfile.mkdtemp()
+  for name in ("legacy", "schema1", "schema2"):
+    sqldb = os.path.join(tmpdir, name + ".sqlite")
+    if ( "legacy" == name ): sql = HM_Bench_LegacyInsert(sqldb)
+    else                   : sql = pyHM_dattrc.HM_DatTrc_Sql("BenchMeter", {"logref":"__LOGGER__BENCH__", "sqldb":sqldb, "note":"bench", "sqlver":int(name[-1])})
+    stmts = []
+    sql.trace(stmts.append)
+    tstart = time.perf_counter()
+    for rows in telegrams:
+      sql.insert_many(rows)
+    tdelta = time.perf_counter() - tstart
+    sql.trace(None)
+    print("  {:<8}: {:>6.2f} statements/telegram, {:>6.2f} commits/telegram, {:>9.1f} telegrams/s".format(name, len(stmts)/len(telegrams), len([st for st in stmts if st.startswith("COMMIT")])/len(telegrams), len(telegrams)/tdelta))
+    del sql
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def percentile(samples, q):
+  """
+  @brief   Return a percentile of samples.
+  @param   samples   The samples.
+  @param   q         The percentile between 0 and 100.
+  @return  The nearest rank sample, or 0.0 without samples.
+  """
+  if ( not samples ): return 0.0
+  samples = sorted(samples)
+  return samples[min(len(samples) - 1, int(round(q / 100.0 * (len(samples) - 1))))]
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def sqldb_size(sqldb):
+  """
+  @brief   Return the size of a SQL database including its journal files.
+  @param   sqldb   The SQL database file.
+  """
+  return sum(os.path.getsize(sqldb + ext) for ext in ("", "-wal", "-journal") if os.path.exists(sqldb + ext))
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_replay(args):
+  """
+  @brief   Replay a captured or synthetic SML byte stream through HM_DatTrc_SMLPacket into a SQL database at full speed
+           and report the throughput, the per telegram latency and the database growth.
+  @param   args   The parsed command line arguments.
+  """
+  if ( None != args.capture ):
+    with ( open(args.capture, "rb") ) as fhdl:
+      stream = fhdl.read()
+    count = len(pyHM_dattrc.HM_DatTrc_SMLFramer(len(stream) + 1).feed(stream))
+    print("replay: {} telegrams, {} bytes captured in '{}'".format(count, len(stream), args.capture))
+  else:
+    frames = sml_telegrams(args.count, args.values)
+    stream = b"".join(frames)
+    count  = len(frames)
+    print("replay: {} telegrams, {} values per telegram, {} bytes synthetic".format(count, args.values, len(stream)))
+  tmpdir = tempfile.mkdtemp()
+  for sqlver in args.sqlver:
+    cfg = {"logref":"__LOGGER__BENCH__", "sqldb":os.path.join(tmpdir, "replay{}.sqlite".format(sqlver)), "note":"bench", "sqlver":sqlver, "filter":[]}
+    sql = pyHM_dattrc.HM_DatTrc_Sql("BenchMeter", cfg)
+    del sql
+    size = sqldb_size(cfg["sqldb"])
+    wrt  = None
+    if ( True == args.writer ):
+      wrt = pyHM_dattrc.HM_DatTrc_SqlWriter(OrderedDict([("BenchMeter", cfg)]), {})
+      wrt.start()
+    prt    = HM_Bench_ReplayPacket("BenchMeter", cfg, wrt)
+    tstart = time.perf_counter()
+    if ( "direct" == args.via ):
+      prt.prepare()
+      for i in range(0, len(stream), args.chunk):
+        prt.data_received(stream[i:i+args.chunk])
+      prt.disperse()
+    else:
+      port = serial.serial_for_url("loop://", timeout=1)
+      thd  = pyHM_dattrc.HM_DatTrc_ReaderThread(port, prt)
+      thd.start()
+      for i in range(0, len(stream), args.chunk):
+        port.write(stream[i:i+args.chunk])
+      done, tlast = 0, time.perf_counter()
+      while ( len(prt.latency) < count and time.perf_counter() - tlast < 5.0 ):
+        if ( done != len(prt.latency) ): done, tlast = len(prt.latency), time.perf_counter()
+        time.sleep(0.001)
+      thd.close()
+    if ( None != wrt ):
+      wrt.close()
+      wrt.join()
+    tdelta = time.perf_counter() - tstart
+    growth = sqldb_size(cfg["sqldb"]) - size
+    print("  schema{} {:<6}: {:>9.1f} telegrams/s, {:>10.1f} values/s, latency p50 {:>7.3f} ms, p99 {:>7.3f} ms, {:>7.1f} MB per million values".format(
+          sqlver, args.via, len(prt.latency)/tdelta, prt.values/tdelta, percentile(prt.latency, 50)*1e3, percentile(prt.latency, 99)*1e3, growth/prt.values if prt.values else 0.0))
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_decode(args):
+  """
+  @brief   Decode captured or synthetic telegrams by pySML and by the HM_DatTrc_SMLDecoder via
+           HM_DatTrc_SMLPacket.handle_packet, report the telegrams per second and compare the decoded data tuples.
+  @param   args   The parsed command line arguments.
+  """
+  if ( None != args.capture ):
+    with ( open(args.capture, "rb") ) as fhdl:
+      stream = fhdl.read()
+    frames = pyHM_dattrc.HM_DatTrc_SMLFramer(len(stream) + 1).feed(stream)
+    flt    = args.filter
+    src    = "captured in '{}'".format(args.capture)
+  else:
+    frames = [bytearray(f) for f in sml_telegrams(args.count, args.values)]
+    flt    = [0x0100100700FF + (j << 24) for j in range(args.values - 1)][::-1][:args.filtered] + args.filter
+    src    = "synthetic, {} values per telegram".format(args.values)
+  print("decode: {} telegrams {}, {} OBIS codes filtered".format(len(frames), src, len(flt)))
+  base = None
+  for name, fastdec in (("pysml", False), ("fast", True)):
+    prt    = HM_Bench_DecodePacket("BenchMeter", {"logref":"__LOGGER__BENCH__", "filter":flt, "fastdec":fastdec})
+    tdelta = 0.0
+    for k in range(args.repeat):
+      prt.rows = []
+      tstart   = time.perf_counter()
+      for frame in frames:
+        prt.handle_packet(frame)
+      tdelta   = tdelta + time.perf_counter() - tstart
+    if ( None == base ): base = (prt.rows, tdelta)
+    report(args, {"decoder":name, "telegrams":len(frames), "values":len(prt.rows), "telegrams_s":args.repeat*len(frames)/tdelta if tdelta else 0.0,
+                  "us_telegram":tdelta*1e6/(args.repeat*len(frames)) if frames else 0.0, "speedup":base[1]/tdelta if tdelta else 0.0,
+                  "match":prt.rows == base[0]},
+           "  {decoder:<6}: {telegrams_s:>9.1f} telegrams/s, {us_telegram:>8.1f} us/telegram, {values} values, speedup {speedup:.2f}, match {match}")
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_crc(args):
+  """
+  @brief   Corrupt a fraction of synthetic telegrams by a bit flip, check HM_DatTrc_CRC16 against the bitwise reference
+           and report the CRC throughput and the telegrams per second through HM_DatTrc_SMLPacket.data_received with and
+           without CRC validation, including the corrupt telegrams rejected, failing to decode or decoded.
+  @param   args   The parsed command line arguments.
+  """
+  rnd    = random.Random(args.seed)
+  frames = [bytearray(f) for f in sml_telegrams(args.count, args.values)]
+  bad    = set(rnd.sample(range(len(frames)), int(len(frames) * args.corrupt)))
+  for i in bad:
+    # flip a bit within the messages, the frame boundaries stay intact
+    frames[i][rnd.randrange(8, len(frames[i]) - 8)] ^= 1 << rnd.randrange(8)
+  print("crc: {} telegrams, {} values per telegram, {} corrupt".format(len(frames), args.values, len(bad)))
+  crc    = pyHM_dattrc.HM_DatTrc_CRC16
+  if ( [crc.compute(f[:-2]) for f in frames] != [sml_crc16(f[:-2]) for f in frames] ):
+    print("  MISMATCH of HM_DatTrc_CRC16 and the bitwise reference")
+    return 1
+  for name, func in (("bitwise", sml_crc16), ("table", crc.compute)):
+    tstart = time.perf_counter()
+    for f in frames:
+      func(f[:-2])
+    tdelta = time.perf_counter() - tstart
+    report(args, {"crc":name, "telegrams_s":len(frames)/tdelta, "mb_s":sum([len(f) for f in frames])/tdelta/1e6},
+           "  {crc:<7} crc: {telegrams_s:>10.1f} telegrams/s, {mb_s:>7.2f} MB/s")
+  mtc = pyHM_metrics.metrics
+  for enable in (False, True):
+    idf    = "BenchMeter-crc-{}".format({True:"on", False:"off"}[enable])
+    prt    = HM_Bench_DecodePacket(idf, {"logref":"__LOGGER__BENCH__", "filter":[], "crc":enable, "crcdump":0})
+    tstart = time.perf_counter()
+    for f in frames:
+      prt.data_received(f)
+    tdelta = time.perf_counter() - tstart
+    report(args, {"crc":{True:"on", False:"off"}[enable], "telegrams_s":len(frames)/tdelta, "values":len(prt.rows),
+                  "rejected":mtc.value("pyhm_crc_errors_total", meter=idf), "failed":mtc.value("pyhm_decode_failures_total", meter=idf),
+                  "decoded":mtc.value("pyhm_telegrams_total", meter=idf)},
+           "  crc {crc:<3}: {telegrams_s:>10.1f} telegrams/s, {decoded} decoded, {rejected} rejected, {failed} failed to decode, {values} values")
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def synthetic_series(count):
+  """
+  @brief   Return the OBIS codes and units of synthetic series, an energy register followed by power values.
+  @param   count   The number of series.
+  """
+  return [(0x0100010800FF, 30)] + [(0x0100100700FF + (j << 24), 27) for j in range(count - 1)]
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def synthetic_value(j, i, sql=False):
+  """
+  @brief   Return the value of a synthetic series at a second, or the equivalent SQL expression.
+  @param   j     The index of the series, 0 is the energy register.
+  @param   i     The second since the start of the series, or its SQL expression.
+  @param   sql   Whether to return the SQL expression.
+  """
+  if ( 0 == j ):
+    if ( sql ): return "(100000.0 + ({}) * 0.5)".format(i)
+    return 100000.0 + i * 0.5
+  if ( sql ): return "((({}) * 2654435761 + {} * 40503) % 4001 - 1000)".format(i, j)
+  return (i * 2654435761 + j * 40503) % 4001 - 1000
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_gendb(args):
+  """
+  @brief   Generate a synthetic SQL database with the tables and views of the data tracer, one value per series and
+           second. The basic tables, views and the first telegram of each meter are written by HM_DatTrc_Sql, the
+           remaining points are generated by SQLite itself, one day and series per statement.
+  @param   args   The parsed command line arguments.
+  """
+  if ( os.path.exists(args.sqldb) ):
+    print("'{}' already exists".format(args.sqldb))
+    return 1
+  t0     = datetime.datetime(2017, 1, 1)
+  s0     = pyHM_dattrc.HM_DatTrc_Sql.ms(t0) // 1000
+  meters = ["BenchMeter{:02}".format(i + 1) for i in range(args.meters)]
+  series = synthetic_series(args.obis)
+  secs   = int(args.days * 86400)
+  tstart = time.time()
+  sql    = None
+  for meter in meters:
+    cfg = {"logref":"__LOGGER__BENCH__", "sqldb":args.sqldb, "note":"synthetic", "sqlver":args.sqlver, "journal":args.journal}
+    if ( None == sql ): sql = pyHM_dattrc.HM_DatTrc_Sql(meter, cfg)
+    else              : sql.attach(meter, cfg)
+    sql.insert_many([(t0, meter, obis, unit, synthetic_value(j, 0)) for j, (obis, unit) in enumerate(series)])
+  del sql
+
+  con = sqlite3.connect(args.sqldb)
+  pks = {}
+  for tab in ("b_METERS", "b_OBIS", "b_UNITS"):
+    pks[tab] = dict((row[1], row[0]) for row in con.execute("SELECT PK, value FROM {};".format(tab)))
+  gen = "WITH RECURSIVE s(i) AS (SELECT :i0 UNION ALL SELECT i + 1 FROM s WHERE i < :i1) "
+  for day in range(0, secs, 86400):
+    i0, i1 = max(1, day), min(secs, day + 86400) - 1
+    if ( i1 < i0 ): continue
+    if ( 1 == args.sqlver ):
+      con.execute("INSERT OR IGNORE INTO m_TIMESTAMPS (value) " + gen + "SELECT strftime('%Y-%m-%dT%H:%M:%S', :s0 + i, 'unixepoch') FROM s;", {"i0":i0, "i1":i1, "s0":s0})
+    for meter in meters:
+      for j, (obis, unit) in enumerate(series):
+        par = {"i0":i0, "i1":i1, "s0":s0, "m":pks["b_METERS"][meter], "o":pks["b_OBIS"][obis], "u":pks["b_UNITS"][unit]}
+        if ( 1 == args.sqlver ):
+          con.execute("""INSERT OR IGNORE INTO m_POINTS (pk_timestamp, pk_meter, pk_obis, pk_unit, value)
+                           SELECT PK, :m, :o, :u, {} FROM (SELECT PK, CAST(strftime('%s', value) AS INTEGER) - :s0 AS i FROM m_TIMESTAMPS
+                                                           WHERE value BETWEEN strftime('%Y-%m-%dT%H:%M:%S', :s0 + :i0, 'unixepoch') AND strftime('%Y-%m-%dT%H:%M:%S', :s0 + :i1, 'unixepoch'));
+                      """.format(synthetic_value(j, "i", True)), par)
+        else:
+          con.execute("INSERT OR IGNORE INTO m_POINTS2 (pk_meter, pk_obis, ts, pk_unit, value) " + gen + "SELECT :m, :o, (:s0 + i) * 1000, :u, {} FROM s;".format(synthetic_value(j, "i", True)), par)
+    con.commit()
+    if ( 0 == (day // 86400 + 1) % 30 ):
+      print("  {} days".format(day // 86400 + 1))
+  cur = con.cursor()
+  pyHM_dattrc.HM_DatTrc_Catalog.rebuild(cur, args.sqlver)
+  count = cur.execute("SELECT sum(count) FROM c_SERIES;").fetchone()[0]
+  con.commit()
+  con.close()
+  if ( True == args.rollup ):
+    pyHM_dbtool.cmd_rollup(argparse.Namespace(sqldb=args.sqldb, sqlver=args.sqlver, chunk=100000))
+  size = sqldb_size(args.sqldb)
+  print("gendb: {} meters, {} series each, {:.2f} days, {} points in {:.1f} s, {:.1f} MB, {:.1f} bytes/point".format(
+        len(meters), len(series), secs / 86400.0, count, time.time() - tstart, size / 1e6, size / count))
+  return 0
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def report(args, record, text):
+  """
+  @brief   Print a measurement either as a JSON object per line or as text.
+  @param   args     The parsed command line arguments.
+  @param   record   The measurement as dictionary.
+  @param   text     The text format string, formatted with the measurement.
+  """
+  if ( True == args.json ): print(json.dumps(record, sort_keys=True))
+  else                    : print(text.format(**record))
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_ranges(args):
+  """
+  @brief   Return the meter and the time ranges to benchmark, each ending at the last stored point of the meter.
+  @param   args   The parsed command line arguments.
+  @return  A tuple of the HM_WebSrv_Sql, the meter, its OBIS codes and a list of (seconds, datetime from, datetime until)
+           tuples.
+  """
+  sql   = pyHM_websrv.HM_WebSrv_Sql({"logref":"__LOGGER__BENCH__", "sqldb":args.sqldb, "sqlver":args.sqlver, "readonly":True})
+  meter = args.meter
+  if ( None == meter ): meter = sorted(sql.meters)[0]
+  obis  = sorted(o for m, o in sql.series if m == meter)
+  dtu   = sql.getLastTimestamp(meter)
+  return (sql, meter, obis, [(rng, dtu - datetime.timedelta(seconds=rng), dtu) for rng in args.ranges])
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_query(args):
+  """
+  @brief   Measure the extraction time of the web server SQL access across time ranges and every nth point values,
+           without cache.
+  @param   args   The parsed command line arguments.
+  """
+  sql, meter, obis, ranges = bench_ranges(args)
+  for rng, dtf, dtu in ranges:
+    for enp in args.enp:
+      times = []
+      for i in range(args.repeat):
+        tstart = time.perf_counter()
+        data   = sql.extract(meter, dtf.isoformat(), dtu.isoformat(), enp, obis)
+        times.append(time.perf_counter() - tstart)
+      report(args, {"bench":"query", "sqlver":args.sqlver, "meter":meter, "range_s":rng, "enp":enp, "points":sum(len(v["t"]) for v in data.values()),
+                    "series":len(data), "extract_ms_p50":percentile(times, 50)*1e3, "extract_ms_max":max(times)*1e3},
+             "  range {range_s:>9} s, enp {enp:>5}: {points:>9} points, extract p50 {extract_ms_p50:>9.1f} ms, max {extract_ms_max:>9.1f} ms")
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def bench_load(args):
+  """
+  @brief   Request the data page and the series API of a running pyHM_websrv concurrently across time ranges and every
+           nth point values. Each client keeps its connection alive and accepts gzip; the response size is the size
+           transferred, the page latency includes the HTML rendering.
+  @param   args   The parsed command line arguments.
+  """
+  sql, meter, obis, ranges = bench_ranges(args)
+  del sql
+  url = urllib.parse.urlsplit(args.url)
+  ctx = None
+  if ( "https" == url.scheme ):
+    ctx = ssl.create_default_context(cafile=args.cafile)
+    if ( True == args.insecure ):
+      ctx.check_hostname = False
+      ctx.verify_mode    = ssl.CERT_NONE
+
+  for rng, dtf, dtu in ranges:
+    for enp in args.enp:
+      for endpoint in args.endpoints:
+        query = urllib.parse.urlencode({"meter":meter, "obis":obis, "dtf":dtf.isoformat(), "dtu":dtu.isoformat(), "enp":enp}, doseq=True)
+        paths = queue.Queue()
+        for i in range(args.requests):
+          paths.put({"page":"/?", "api":"/api/series?"}[endpoint] + query)
+        results = []
+        clients = [HM_Bench_LoadClient(url, ctx, args.timeout, paths, results) for i in range(args.clients)]
+        tstart  = time.perf_counter()
+        for thd in clients: thd.start()
+        for thd in clients: thd.join()
+        tdelta  = time.perf_counter() - tstart
+        ok      = [r for r in results if 200 == r[0]]
+        record  = {"bench":"load", "url":args.url, "endpoint":endpoint, "meter":meter, "range_s":rng, "enp":enp, "clients":args.clients,
+                   "requests":len(results), "errors":len(results) - len(ok), "rps":len(results)/tdelta,
+                   "ttfb_ms_p50":percentile([r[1] for r in ok], 50)*1e3, "latency_ms_p50":percentile([r[2] for r in ok], 50)*1e3,
+                   "latency_ms_p99":percentile([r[2] for r in ok], 99)*1e3, "bytes":int(percentile([r[3] for r in ok], 50)),
+                   "error":next((r[4] for r in results if None != r[4]), None)}
+        report(args, record,
+               "  {endpoint:<4} range {range_s:>9} s, enp {enp:>5}: {rps:>7.1f} req/s, {errors} errors, ttfb p50 {ttfb_ms_p50:>8.1f} ms, latency p50 {latency_ms_p50:>8.1f} ms, p99 {latency_ms_p99:>8.1f} ms, {bytes:>10} bytes")
+        if ( None != record["error"] and False == args.json ):
+          print("    first error: {}".format(record["error"]))
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+if ( __name__ == '__main__' ):
+
+  parser = argparse.ArgumentParser(description="pyHM benchmarks")
+  subpar = parser.add_subparsers(dest="bench")
+
+  p = subpar.add_parser("framer", help="SML transport frame scanner")
+  p.add_argument("--count", type=int, default=200,       help="number of frames")
+  p.add_argument("--size",  type=int, default=400,       help="payload size of a frame in bytes")
+  p.add_argument("--noise", type=int, default=4096,      help="number of garbage bytes in front of the frames")
+  p.add_argument("--chunk", type=int, default=[1,64], nargs="+", help="sizes of the chunks fed into the scanner")
+  p.set_defaults(func=bench_framer)
+
+  p = subpar.add_parser("insert", help="SQL statements per telegram")
+  p.add_argument("--count",  type=int, default=200, help="number of telegrams")
+  p.add_argument("--values", type=int, default=8,   help="number of OBIS values per telegram")
+  p.set_defaults(func=bench_insert)
+
+  p = subpar.add_parser("replay", help="ingestion of captured or synthetic telegrams")
+  p.add_argument("--capture", default=None,                            help="file with a captured SML byte stream, else synthetic telegrams")
+  p.add_argument("--count",   type=int, default=1000,                  help="number of synthetic telegrams")
+  p.add_argument("--values",  type=int, default=8,                     help="number of OBIS values per synthetic telegram")
+  p.add_argument("--chunk",   type=int, default=64,                    help="size of the chunks fed into the serial path")
+  p.add_argument("--via",     default="direct", choices=["direct","loop"], help="feed HM_DatTrc_SMLPacket directly or via a pyserial loop:// port and HM_DatTrc_ReaderThread")
+  p.add_argument("--writer",  action="store_true",                     help="store via a HM_DatTrc_SqlWriter thread")
+  p.add_argument("--sqlver",  type=int, default=[1,2], nargs="+",      help="SQL schema versions")
+  p.set_defaults(func=bench_replay)
+
+  p = subpar.add_parser("decode", help="SML_GetListRes decoding by pySML and by the fast decoder")
+  p.add_argument("--capture",  default=None,                     help="file with a captured SML byte stream, else synthetic telegrams")
+  p.add_argument("--count",    type=int, default=2000,           help="number of synthetic telegrams")
+  p.add_argument("--values",   type=int, default=8,              help="number of OBIS values per synthetic telegram")
+  p.add_argument("--filtered", type=int, default=0,              help="number of the synthetic power values filtered")
+  p.add_argument("--filter",   type=lambda x: int(x, 0), default=[], nargs="+", help="further filtered OBIS codes, e.g. 0x8181C78205FF")
+  p.add_argument("--repeat",   type=int, default=3,              help="number of passes over the telegrams")
+  p.add_argument("--json",     action="store_true",              help="print one JSON object per measurement")
+  p.set_defaults(func=bench_decode)
+
+  p = subpar.add_parser("crc", help="CRC validation of corrupt telegrams before decoding")
+  p.add_argument("--count",    type=int, default=2000,           help="number of synthetic telegrams")
+  p.add_argument("--values",   type=int, default=8,              help="number of OBIS values per synthetic telegram")
+  p.add_argument("--corrupt",  type=float, default=0.1,          help="fraction of telegrams corrupted by a bit flip")
+  p.add_argument("--seed",     type=int, default=1,              help="random seed of the corruption")
+  p.add_argument("--json",     action="store_true",              help="print one JSON object per measurement")
+  p.set_defaults(func=bench_crc)
+
+  p = subpar.add_parser("gendb", help="generate a synthetic SQL database")
+  p.add_argument("--sqldb",   default="./bench.sqlite",            help="SQL database file to create")
+  p.add_argument("--sqlver",  type=int, default=2,                 help="SQL schema version")
+  p.add_argument("--meters",  type=int, default=2,                 help="number of meters")
+  p.add_argument("--obis",    type=int, default=4,                 help="number of OBIS codes per meter")
+  p.add_argument("--days",    type=float, default=7.0,             help="number of days at 1 s resolution, 365 per year")
+  p.add_argument("--journal", default=None,                        help="SQL journal mode, e.g. wal")
+  p.add_argument("--rollup",  action="store_true",                 help="build the rollup tables too")
+  p.set_defaults(func=bench_gendb)
+
+  for name, func, text in (("query", bench_query, "web server extraction times"), ("load", bench_load, "concurrent requests against a running web server")):
+    p = subpar.add_parser(name, help=text)
+    p.add_argument("--sqldb",   default="./bench.sqlite",                 help="SQL database file, to look up the meter and its last point")
+    p.add_argument("--sqlver",  type=int, default=2,                      help="SQL schema version")
+    p.add_argument("--meter",   default=None,                             help="meter, else the first one")
+    p.add_argument("--ranges",  type=int, default=[3600,86400,604800], nargs="+", help="time ranges in seconds before the last point")
+    p.add_argument("--enp",     type=int, default=[1,10,60], nargs="+",   help="every nth point values")
+    p.add_argument("--json",    action="store_true",                      help="print one JSON object per measurement")
+    if ( "query" == name ):
+      p.add_argument("--repeat",    type=int, default=3,                  help="number of extractions per measurement")
+    else:
+      p.add_argument("--url",       default="https://127.0.0.1:4443",     help="base URL of the web server")
+      p.add_argument("--cafile",    default=None,                         help="CA or self-signed certificate to verify the web server")
+      p.add_argument("--insecure",  action="store_true",                  help="do not verify the certificate of the web server")
+      p.add_argument("--endpoints", default=["page","api"], nargs="+", choices=["page","api"], help="requested endpoints")
+      p.add_argument("--clients",   type=int, default=4,                  help="number of concurrent clients")
+      p.add_argument("--requests",  type=int, default=40,                 help="number of requests per measurement")
+      p.add_argument("--timeout",   type=float, default=120.0,            help="request timeout in seconds")
+    p.set_defaults(func=func)
+
+  args = parser.parse_args()
+  if ( not hasattr(args, "func") ):
+    parser.print_help()
+  else:
+    sys.exit(args.func(args))
@@ -18,12 +18,23 @@
 import pyLOG
 import pyOBIS
 import pySML
+import pyHM_log
+import pyHM_metrics
+import asyncio
+import binascii
+import calendar
 import datetime
+import inspect
+import marshal
+import mmap
+import multiprocessing, multiprocessing.connection
 import os
-import re
+import queue
 import serial, serial.threaded
 import signal
 import sqlite3
+import struct
+import sys
 import threading
 import traceback
 import time
@@ -62,11 +73,243 @@ class HM_DatTrc_Exception(Exception):
 
 ########################################################################################################################
 
+class HM_DatTrc_Rollup:
+  """
+  @brief   HM data tracing accumulator of the minute, hour and day aggregates of numeric values. Accumulated aggregates
+           are merged into the rollup tables, so partial aggregates of the same bucket may be flushed repeatedly.
+           Buckets are identified by their start as milliseconds since 1970-01-01T00:00:00 (local time).
+  """
+
+  TABLES = OrderedDict([("r_MINUTES", 60000), ("r_HOURS", 3600000), ("r_DAYS", 86400000)])
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self):
+    """
+    @brief   Constructor.
+    """
+    self.__acc = {}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __len__(self):
+    """
+    @brief   Returns the number of accumulated buckets.
+    """
+    return len(self.__acc)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def create(cls, cur):
+    """
+    @brief   Create the rollup tables if not exists.
+    @param   cur   A SQL database cursor.
+    """
+    for tab in cls.TABLES:
+      cur.execute("CREATE TABLE IF NOT EXISTS {} (pk_meter INTEGER NOT NULL, pk_obis INTEGER NOT NULL, bucket INTEGER NOT NULL, pk_unit INTEGER, vmin, vmax, vsum, vcnt, vfirst, vlast, tfirst, tlast, PRIMARY KEY(pk_meter, pk_obis, bucket)) WITHOUT ROWID;".format(tab))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def add(self, pk_meter, pk_obis, pk_unit, ts, value):
+    """
+    @brief   Accumulate a value, non-numeric values are ignored.
+    @param   pk_meter   The primary key of the meter.
+    @param   pk_obis    The primary key of the OBIS code.
+    @param   pk_unit    The primary key of the unit.
+    @param   ts         The timestamp as milliseconds since 1970-01-01T00:00:00.
+    @param   value      The value.
+    """
+    if ( not isinstance(value, (int, float)) or isinstance(value, bool) ):
+      return
+    for tab, res in self.TABLES.items():
+      key = (tab, pk_meter, pk_obis, ts - (ts % res))
+      acc = self.__acc.get(key)
+      if ( None == acc ):
+        self.__acc[key] = [pk_unit, value, value, value, 1, value, value, ts, ts]
+      else:
+        acc[0] = pk_unit
+        if ( value < acc[1] ): acc[1] = value
+        if ( value > acc[2] ): acc[2] = value
+        acc[3] = acc[3] + value
+        acc[4] = acc[4] + 1
+        if ( ts <  acc[7] ): acc[5] = value; acc[7] = ts
+        if ( ts >= acc[8] ): acc[6] = value; acc[8] = ts
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def reset(self):
+    """
+    @brief   Forget all accumulated aggregates, e.g. after a rollback.
+    """
+    self.__acc.clear()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def flush(self, cur):
+    """
+    @brief   Merge the accumulated aggregates into the rollup tables, without committing.
+    @param   cur   A SQL database cursor.
+    """
+    for tab in self.TABLES:
+      rows = [{"m":k[1], "o":k[2], "b":k[3], "u":v[0], "vmin":v[1], "vmax":v[2], "vsum":v[3], "vcnt":v[4], "vfirst":v[5], "vlast":v[6], "tfirst":v[7], "tlast":v[8]} for k,v in self.__acc.items() if k[0] == tab]
+      cur.executemany("INSERT OR IGNORE INTO {} (pk_meter, pk_obis, bucket, vsum, vcnt) VALUES (:m, :o, :b, 0, 0);".format(tab), rows)
+      cur.executemany("""UPDATE {} SET pk_unit = :u,
+                                       vmin    = min(coalesce(vmin, :vmin), :vmin),
+                                       vmax    = max(coalesce(vmax, :vmax), :vmax),
+                                       vsum    = vsum + :vsum,
+                                       vcnt    = vcnt + :vcnt,
+                                       vfirst  = CASE WHEN tfirst IS NULL OR :tfirst <  tfirst THEN :vfirst ELSE vfirst END,
+                                       vlast   = CASE WHEN tlast  IS NULL OR :tlast  >= tlast  THEN :vlast  ELSE vlast  END,
+                                       tfirst  = min(coalesce(tfirst, :tfirst), :tfirst),
+                                       tlast   = max(coalesce(tlast,  :tlast),  :tlast)
+                         WHERE pk_meter == :m AND pk_obis == :o AND bucket == :b;
+                      """.format(tab), rows)
+    self.__acc.clear()
+
+########################################################################################################################
+
+class HM_DatTrc_Catalog:
+  """
+  @brief   HM data tracing accumulator of the catalog of series, the first and last timestamp and the number of points
+           per meter, OBIS code and unit. Accumulated series are merged into c_SERIES and each flush increments the
+           change counter in c_CHANGES, so readers only reload the catalog after it changed. Only points actually stored
+           are accumulated, so the catalog equals the one rebuilt from the point tables.
+  """
+
+  TABLES  = ["CREATE TABLE IF NOT EXISTS c_SERIES (pk_meter INTEGER NOT NULL, pk_obis INTEGER NOT NULL, pk_unit INTEGER NOT NULL, tfirst, tlast, count, PRIMARY KEY(pk_meter, pk_obis, pk_unit)) WITHOUT ROWID;",
+             "CREATE TABLE IF NOT EXISTS c_CHANGES (PK INTEGER PRIMARY KEY CHECK (PK == 1), counter INTEGER NOT NULL);",
+             "INSERT OR IGNORE INTO c_CHANGES (PK, counter) VALUES (1, 0);"]
+
+  SOURCES = {1: """SELECT mp.pk_meter AS pk_meter, mp.pk_obis AS pk_obis, mp.pk_unit AS pk_unit, {} AS ts
+                   FROM m_POINTS mp
+                     INNER JOIN m_TIMESTAMPS mt ON (mp.pk_timestamp = mt.PK)""",
+             2: """SELECT pk_meter, pk_obis, pk_unit, ts FROM m_POINTS2"""}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self):
+    """
+    @brief   Constructor.
+    """
+    self.__acc = {}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __len__(self):
+    """
+    @brief   Returns the number of accumulated series.
+    """
+    return len(self.__acc)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def create(cls, cur):
+    """
+    @brief   Create the catalog tables if not exists.
+    @param   cur   A SQL database cursor.
+    @return  whether the catalog tables were created.
+    """
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type == 'table' AND name == 'c_SERIES';")
+    new = ( None == cur.fetchone() )
+    for sql in cls.TABLES:
+      cur.execute(sql)
+    return new
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def rebuild(cls, cur, ver):
+    """
+    @brief   Rebuild the catalog from the stored points, without committing.
+    @param   cur   A SQL database cursor.
+    @param   ver   The SQL schema version of the stored points.
+    @return  the number of series.
+    """
+    cur.execute("DELETE FROM c_SERIES;")
+    cur.execute("""INSERT INTO c_SERIES (pk_meter, pk_obis, pk_unit, tfirst, tlast, count)
+                     SELECT pk_meter, pk_obis, pk_unit, MIN(ts), MAX(ts), COUNT(*) FROM ({}) GROUP BY pk_meter, pk_obis, pk_unit;
+                """.format(cls.SOURCES[ver].format(HM_DatTrc_Sql.SQL_MS.format("mt.value"))))
+    cnt = cur.rowcount
+    cur.execute("UPDATE c_CHANGES SET counter = counter + 1;")
+    return cnt
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def add(self, pk_meter, pk_obis, pk_unit, ts):
+    """
+    @brief   Accumulate a point.
+    @param   pk_meter   The primary key of the meter.
+    @param   pk_obis    The primary key of the OBIS code.
+    @param   pk_unit    The primary key of the unit.
+    @param   ts         The timestamp as milliseconds since 1970-01-01T00:00:00.
+    """
+    key = (pk_meter, pk_obis, pk_unit)
+    acc = self.__acc.get(key)
+    if ( None == acc ):
+      self.__acc[key] = [ts, ts, 1]
+    else:
+      if ( ts < acc[0] ): acc[0] = ts
+      if ( ts > acc[1] ): acc[1] = ts
+      acc[2] = acc[2] + 1
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def reset(self):
+    """
+    @brief   Forget all accumulated series, e.g. after a rollback.
+    """
+    self.__acc.clear()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def flush(self, cur):
+    """
+    @brief   Merge the accumulated series into the catalog and increment the change counter, without committing.
+    @param   cur   A SQL database cursor.
+    """
+    if ( not self.__acc ):
+      return
+    # one statement merging up to 166 series, limited by the SQLite default of 999 host parameters per statement
+    rows = [k + tuple(v) for k,v in self.__acc.items()]
+    for i in range(0, len(rows), 166):
+      chunk = rows[i:i+166]
+      cur.execute("""INSERT OR REPLACE INTO c_SERIES (pk_meter, pk_obis, pk_unit, tfirst, tlast, count)
+                       SELECT v.column1, v.column2, v.column3,
+                              min(coalesce(cs.tfirst, v.column4), v.column4),
+                              max(coalesce(cs.tlast,  v.column5), v.column5),
+                              coalesce(cs.count, 0) + v.column6
+                       FROM (VALUES {}) v
+                         LEFT JOIN c_SERIES cs ON (cs.pk_meter = v.column1 AND cs.pk_obis = v.column2 AND cs.pk_unit = v.column3);
+                  """.format(",".join(["(?, ?, ?, ?, ?, ?)"] * len(chunk))), [e for r in chunk for e in r])
+    cur.execute("UPDATE c_CHANGES SET counter = counter + 1;")
+    self.__acc.clear()
+
+########################################################################################################################
+
 class HM_DatTrc_Sql:
   """
   @brief   HM data tracing SQL access class.
+           Schema version 1 stores ISO timestamps in m_TIMESTAMPS referenced by m_POINTS, schema version 2 stores
+           timestamps as integer milliseconds since 1970-01-01T00:00:00 (local time) inline in the WITHOUT ROWID table
+           m_POINTS2 keyed by meter, OBIS code and timestamp. Optionally the minute, hour and day aggregates of the
+           numeric values stored, without those ignored as duplicates, are maintained in the rollup tables of
+           HM_DatTrc_Rollup. The catalog of series of HM_DatTrc_Catalog is always maintained.
   """
 
+  SQL_MS = "CAST(ROUND((julianday({}) - 2440587.5) * 86400000.0) AS INTEGER)"
+
+  # INSERT ... RETURNING, reporting the points not ignored as duplicates, is supported since SQLite 3.35.0
+  RETURNING = ( (3, 35, 0) <= sqlite3.sqlite_version_info )
+
+  TABLES = {1: ["CREATE TABLE IF NOT EXISTS m_TIMESTAMPS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, UNIQUE(value));",
+                "CREATE TABLE IF NOT EXISTS m_POINTS (PK INTEGER PRIMARY KEY AUTOINCREMENT, pk_timestamp, pk_meter, pk_obis, pk_unit, value, UNIQUE(pk_meter, pk_obis, pk_unit, value));"],
+            2: ["CREATE TABLE IF NOT EXISTS m_POINTS2 (pk_meter INTEGER NOT NULL, pk_obis INTEGER NOT NULL, ts INTEGER NOT NULL, pk_unit INTEGER, value, PRIMARY KEY(pk_meter, pk_obis, ts)) WITHOUT ROWID;"]}
+
+  VIEWS  = {1: """CREATE VIEW IF NOT EXISTS v_{} AS SELECT mt.value AS timestamp, bo.value AS obis, bo.description AS obis_desc, bu.value AS unit, bu.description AS unit_desc, mp.value AS value
+                  FROM m_POINTS mp
+                    INNER JOIN m_TIMESTAMPS mt ON (mp.pk_timestamp = mt.pk)
+                    INNER JOIN b_OBIS       bo ON (mp.pk_obis      = bo.pk)
+                    INNER JOIN b_UNITS      bu ON (mp.pk_unit      = bu.pk)
+                  WHERE mp.pk_meter=={}
+                  ORDER BY timestamp, obis;
+               """,
+            2: """CREATE VIEW IF NOT EXISTS v_{} AS SELECT strftime('%Y-%m-%dT%H:%M:%f', mp.ts/1000.0, 'unixepoch') AS timestamp, bo.value AS obis, bo.description AS obis_desc, bu.value AS unit, bu.description AS unit_desc, mp.value AS value, mp.ts AS ts
+                  FROM m_POINTS2 mp
+                    INNER JOIN b_OBIS       bo ON (mp.pk_obis      = bo.pk)
+                    INNER JOIN b_UNITS      bu ON (mp.pk_unit      = bu.pk)
+                  WHERE mp.pk_meter=={}
+                  ORDER BY ts, obis;
+               """}
+
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def __init__(self, idf, cfg):
     """
@@ -76,7 +319,8 @@ class HM_DatTrc_Sql:
     """
     self.__idf                 = idf
     self.__cfg                 = cfg
-    self.__log                 = pyLOG.Log(self.__cfg["logref"])
+    self.__mtr                 = OrderedDict([(idf, cfg)])
+    self.__log                 = pyHM_log.HM_Log(self.__cfg["logref"])
     self.__sql_con             = sqlite3.connect(self.__cfg["sqldb"])
     self.__sql_con.row_factory = sqlite3.Row
     self.__sql_cur             = self.__sql_con.cursor()
@@ -87,153 +331,1071 @@ class HM_DatTrc_Sql:
     self.__tab_obis            = dict()
     self.__tab_tstamps         = OrderedDict()
     self.__max_tstamps         = 5
+    self.__max_rows            = 199
     self.__obs                 = pyOBIS.OBIS()
+    self.__ver                 = self.__cfg.get("sqlver", 1)
+    self.__rol                 = None
+    self.__cat                 = HM_DatTrc_Catalog()
+    self.__ins                 = dict()   # values inserted per meter since the last commit
+    self.__mtc                 = pyHM_metrics.metrics
 
     self.__log.log_callinfo()
 
-    # setup + read basic tables
-    # - meters
+    self.__mtc.declare("pyhm_values_inserted_total", "counter", "Values per meter committed to the SQL database, without ignored duplicates.")
+    self.__mtc.declare("pyhm_insert_duration_seconds", "histogram", "Duration per meter of inserting the values of a telegram, without committing.")
+    self.__mtc.declare("pyhm_commit_duration_seconds", "histogram", "Duration of committing a transaction, labelled by the meters sharing the SQL database.")
+
+    if ( self.__ver not in self.TABLES ):
+      raise HM_DatTrc_Exception("unknown SQL schema version '{}'".format(self.__ver))
+
+    # journal mode, e.g. 'wal' to let readers not block writing
+    if ( None != self.__cfg.get("journal", None) ):
+      self.__sql_cur.execute("PRAGMA journal_mode = {};".format(self.__cfg["journal"]))
+
+    # setup basic tables
     self.__sql_cur.execute("CREATE TABLE IF NOT EXISTS b_METERS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, description, UNIQUE(value));")
-    self.__sql_cur.execute("SELECT * FROM b_METERS WHERE value == ?;", [idf])
-    for i, row in enumerate(self.__sql_cur.fetchall()):
-      self.__tab_meters[row["value"]] = row["PK"]
+    self.__sql_cur.execute("CREATE TABLE IF NOT EXISTS b_UNITS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, description, UNIQUE(value));")
+    self.__sql_cur.execute("CREATE TABLE IF NOT EXISTS b_OBIS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, description, UNIQUE(value));")
+
+    # check for measure tables
+    for sql in self.TABLES[self.__ver]:
+      self.__sql_cur.execute(sql)
+    # - catalog, built from the points already stored when created
+    if ( self.__cat.create(self.__sql_cur) ):
+      self.__cat.rebuild(self.__sql_cur, self.__ver)
+      self.__sql_con.commit()
+    # - rollups
+    if ( True == self.__cfg.get("rollup", False) ):
+      self.__rol = HM_DatTrc_Rollup()
+      self.__rol.create(self.__sql_cur)
+
+    # read basic tables
+    self.__reload()
+
+    # check for views
+    self.__create_view()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __del__(self):
+    """
+    @brief   Destructor.
+    """
+    self.__log.log_callinfo()
+    self.__sql_con.commit()
+    self.__sql_con.close()
 
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __reload(self):
+    """
+    @brief   (Re)read the basic tables and the most recent timestamps into the caches.
+    """
+    # - meters
+    self.__tab_meters.clear()
+    for idf in self.__mtr:
+      self.__sql_cur.execute("SELECT * FROM b_METERS WHERE value == ?;", [idf])
+      for i, row in enumerate(self.__sql_cur.fetchall()):
+        self.__tab_meters[row["value"]] = row["PK"]
     # - units
-    self.__sql_cur.execute("CREATE TABLE IF NOT EXISTS b_UNITS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, description, UNIQUE(value));")
+    self.__tab_units.clear()
     self.__sql_cur.execute("SELECT * FROM b_UNITS;")
     for i, row in enumerate(self.__sql_cur.fetchall()):
       self.__tab_units[row["value"]] = row["PK"]
     # - obis
-    self.__sql_cur.execute("CREATE TABLE IF NOT EXISTS b_OBIS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, description, UNIQUE(value));")
+    self.__tab_obis.clear()
     self.__sql_cur.execute("SELECT * FROM b_OBIS;")
     for i, row in enumerate(self.__sql_cur.fetchall()):
       self.__tab_obis[row["value"]] = row["PK"]
-
-    # check for measure tables
     # - timestamps
-    self.__sql_cur.execute("CREATE TABLE IF NOT EXISTS m_TIMESTAMPS (PK INTEGER PRIMARY KEY AUTOINCREMENT, value, UNIQUE(value));")
-    self.__sql_cur.execute("SELECT * FROM (SELECT * FROM m_TIMESTAMPS ORDER BY value DESC LIMIT ?) ORDER BY value ASC;", [self.__max_tstamps])
-    for i, row in enumerate(self.__sql_cur.fetchall()):
-      self.__tab_tstamps[row["value"]] = row["PK"]
-    # - points
-    self.__sql_cur.execute("CREATE TABLE IF NOT EXISTS m_POINTS (PK INTEGER PRIMARY KEY AUTOINCREMENT, pk_timestamp, pk_meter, pk_obis, pk_unit, value, UNIQUE(pk_meter, pk_obis, pk_unit, value));")
+    self.__tab_tstamps.clear()
+    if ( 1 == self.__ver ):
+      self.__sql_cur.execute("SELECT * FROM (SELECT * FROM m_TIMESTAMPS ORDER BY value DESC LIMIT ?) ORDER BY value ASC;", [self.__max_tstamps])
+      for i, row in enumerate(self.__sql_cur.fetchall()):
+        self.__tab_tstamps[row["value"]] = row["PK"]
 
-    # check for views
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __create_view(self):
+    """
+    @brief   Create views per meter if not exists.
+    """
+    for idf in self.__mtr:
+      try:
+        self.__sql_cur.execute(self.VIEWS[self.__ver].format(idf, self.__tab_meters[idf]))
+      except:
+        pass
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __lookup(self, meter, obis, unit):
+    """
+    @brief   Return the primary keys of a meter, an OBIS code and an unit, insert them into the basic tables if necessary.
+    @param   meter   The HM meter identifier.
+    @param   obis    The OBIS code.
+    @param   unit    The unit.
+    """
+    if ( meter not in self.__mtr ):
+      raise HM_DatTrc_Exception("passed meter != configured meter")
+
+    if ( meter != None and meter not in self.__tab_meters ):
+      self.__sql_sve = True
+      try:
+        self.__sql_cur.execute("INSERT INTO b_METERS (value, description) VALUES (?, ?);", [meter, self.__mtr[meter]["note"]])
+        self.__tab_meters[meter] = self.__sql_cur.lastrowid
+      except sqlite3.IntegrityError:
+        self.__sql_cur.execute("SELECT * FROM b_METERS WHERE value == ?;", [meter])
+        for i, row in enumerate(self.__sql_cur.fetchall()):
+          self.__tab_meters[row["value"]] = row["PK"]
+
+    if ( unit != None and unit not in self.__tab_units ):
+      self.__sql_sve = True
+      try:
+        self.__sql_cur.execute("INSERT INTO b_UNITS (value, description) VALUES (?, ?);", [unit, self.__obs.getUnit(unit)["native"]])
+        self.__tab_units[unit] = self.__sql_cur.lastrowid
+      except sqlite3.IntegrityError:
+        self.__sql_cur.execute("SELECT * FROM b_UNITS;")
+        for i, row in enumerate(self.__sql_cur.fetchall()):
+          self.__tab_units[row["value"]] = row["PK"]
+
+    if ( obis != None and obis not in self.__tab_obis ):
+      self.__sql_sve = True
+      try:
+        self.__sql_cur.execute("INSERT INTO b_OBIS (value, description) VALUES (?, ?);", [obis, self.__obs.getDescr(obis)["descr"]])
+        self.__tab_obis[obis] = self.__sql_cur.lastrowid
+      except sqlite3.IntegrityError:
+        self.__sql_cur.execute("SELECT * FROM b_OBIS;")
+        for i, row in enumerate(self.__sql_cur.fetchall()):
+          self.__tab_obis[row["value"]] = row["PK"]
+
+    return (self.__tab_meters[meter], self.__tab_obis[obis], self.__tab_units[unit])
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __tstamp(self, timestamp):
+    """
+    @brief   Return the primary key of a timestamp, insert it into the timestamps table if necessary.
+    @param   timestamp   The timestamp.
+    @return  a tuple of the primary key and whether the timestamp was inserted.
+    """
+    value = timestamp.isoformat()
+    new   = False
+    if ( value not in self.__tab_tstamps ):
+      try:
+        self.__sql_cur.execute("INSERT INTO m_TIMESTAMPS (value) VALUES (?);", [value])
+        self.__tab_tstamps[value] = self.__sql_cur.lastrowid
+        new = True
+      except sqlite3.IntegrityError:
+        self.__sql_cur.execute("SELECT * FROM m_TIMESTAMPS WHERE value == ?;", [value])
+        for i, row in enumerate(self.__sql_cur.fetchall()):
+          self.__tab_tstamps[row["value"]] = row["PK"]
+      while ( len(self.__tab_tstamps) > self.__max_tstamps ):
+        self.__tab_tstamps.popitem(last=False)
+    return (self.__tab_tstamps[value], new)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def ms(timestamp):
+    """
+    @brief   Return a timestamp as integer milliseconds since 1970-01-01T00:00:00 as stored by schema version 2.
+    @param   timestamp   The (naive) timestamp.
+    """
+    return calendar.timegm(timestamp.timetuple()) * 1000 + timestamp.microsecond // 1000
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def attach(self, idf, cfg):
+    """
+    @brief   Attach a further HM meter storing into the same SQL database.
+    @param   idf   A HM meter identifier.
+    @param   cfg   A HM meter configuration.
+    """
+    self.__log.log_callinfo()
+    self.__mtr[idf] = cfg
+    self.__sql_cur.execute("SELECT * FROM b_METERS WHERE value == ?;", [idf])
+    for i, row in enumerate(self.__sql_cur.fetchall()):
+      self.__tab_meters[row["value"]] = row["PK"]
     self.__create_view()
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def __del__(self):
+  def __points(self, timestamp, meter, values):
+    """
+    @brief   Insert the values of a telegram as one timestamp row plus one multi-row point insert, without committing.
+    @param   timestamp   The timestamp.
+    @param   meter       The HM meter identifier.
+    @param   values      A list of (obis, unit, value) tuples.
+    """
+    tstart = time.time()
+    points = []
+    keys   = []
+    ts     = self.ms(timestamp)
+    if ( 2 == self.__ver ):
+      for obis, unit, value in values:
+        if ( unit == None ): unit = 0xFF
+        pk_meter, pk_obis, pk_unit = self.__lookup(meter, obis, unit)
+        points.extend((pk_meter, pk_obis, ts, pk_unit, value))
+        keys.append((pk_meter, pk_obis, pk_unit, value))
+      sql = "INSERT OR IGNORE INTO m_POINTS2 (pk_meter, pk_obis, ts, pk_unit, value) VALUES "
+    else:
+      pk_tstamp, new = self.__tstamp(timestamp)
+      for obis, unit, value in values:
+        if ( unit == None ): unit = 0xFF
+        pk_meter, pk_obis, pk_unit = self.__lookup(meter, obis, unit)
+        points.extend((pk_tstamp, pk_meter, pk_obis, pk_unit, value))
+        keys.append((pk_meter, pk_obis, pk_unit, value))
+      sql = "INSERT OR IGNORE INTO m_POINTS (pk_timestamp, pk_meter, pk_obis, pk_unit, value) VALUES "
+    # 5 columns per row, limited by the SQLite default of 999 host parameters per statement
+    count = 0
+    for i in range(0, len(points), 5*self.__max_rows):
+      stored = self.__insert(sql, points[i:i+5*self.__max_rows], keys[i//5:i//5+self.__max_rows])
+      count  = count + len(stored)
+      for pk_meter, pk_obis, pk_unit, value in stored:
+        self.__cat.add(pk_meter, pk_obis, pk_unit, ts)
+        if ( None != self.__rol ): self.__rol.add(pk_meter, pk_obis, pk_unit, ts, value)
+    self.__ins[meter] = self.__ins.get(meter, 0) + count
+    # a timestamp inserted for a telegram of only unchanged values would not be referenced by any point
+    if ( 1 == self.__ver and 0 == count and True == new ):
+      self.__sql_cur.execute("DELETE FROM m_TIMESTAMPS WHERE PK == ?;", [pk_tstamp])
+      self.__tab_tstamps.pop(timestamp.isoformat(), None)
+    self.__mtc.observe("pyhm_insert_duration_seconds", time.time() - tstart, meter=meter)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __insert(self, sql, points, keys):
+    """
+    @brief   Insert points, ignoring duplicates, by one multi-row statement returning the stored points if supported by
+             SQLite, else by one statement per point.
+    @param   sql      The 'INSERT OR IGNORE ... VALUES ' statement of 5 columns including pk_meter, pk_obis, pk_unit and
+                      value.
+    @param   points   The flat list of the column values of the points.
+    @param   keys     A list of (pk_meter, pk_obis, pk_unit, value) tuples, one per point.
+    @return  the list of (pk_meter, pk_obis, pk_unit, value) tuples of the points actually stored.
+    """
+    if ( True == self.RETURNING ):
+      self.__sql_cur.execute(sql + ",".join(["(?, ?, ?, ?, ?)"] * len(keys)) + " RETURNING pk_meter, pk_obis, pk_unit, value;", points)
+      return [tuple(row) for row in self.__sql_cur.fetchall()]
+    stored = []
+    for i, key in enumerate(keys):
+      self.__sql_cur.execute(sql + "(?, ?, ?, ?, ?);", points[5*i:5*i+5])
+      if ( 0 < self.__sql_cur.rowcount ): stored.append(key)
+    return stored
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __commit(self):
+    """
+    @brief   Commit the current transaction, creating the views first if the basic tables changed.
+    """
+    tstart = time.time()
+    if ( self.__sql_sve == True ): self.__create_view()
+    self.__cat.flush(self.__sql_cur)
+    if ( None != self.__rol ): self.__rol.flush(self.__sql_cur)
+    self.__sql_con.commit()
+    self.__sql_cnt = 0
+    self.__sql_sve = False
+    self.__mtc.observe("pyhm_commit_duration_seconds", time.time() - tstart, meter=",".join(self.__mtr))
+    for meter, cnt in self.__ins.items():
+      self.__mtc.inc("pyhm_values_inserted_total", cnt, meter=meter)
+    self.__ins = dict()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def trace(self, callback):
+    """
+    @brief   Register a callback called with each executed SQL statement, or None to unregister it.
+    @param   callback   The callback.
+    """
+    self.__sql_con.set_trace_callback(callback)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def insert(self, timestamp, meter, obis, unit, value):
+    """
+    @brief   Insert a data tuple into SQL database.
+    @param   timestamp   The timestamp.
+    @param   meter       The HM meter identifier.
+    @param   obis        The OBIS code.
+    @param   unit        The unit.
+    @param   value       The value.
+    """
+    self.__log.log_callinfo()
+
+    self.__points(timestamp, meter, [(obis, unit, value)])
+
+    # commit
+    self.__sql_cnt = self.__sql_cnt + 1
+    if ( self.__sql_cnt % 10 == 0 or self.__sql_sve == True ):
+      self.__commit()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def insert_telegram(self, timestamp, meter, values):
+    """
+    @brief   Insert the values of a telegram into SQL database within a single transaction.
+    @param   timestamp   The timestamp.
+    @param   meter       The HM meter identifier.
+    @param   values      A list of (obis, unit, value) tuples.
+    """
+    self.insert_many([(timestamp, meter, obis, unit, value) for obis, unit, value in values])
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def insert_many(self, rows):
+    """
+    @brief   Insert data tuples into SQL database within a single transaction. Consecutive data tuples of the same
+             timestamp and meter are inserted as one telegram.
+    @param   rows   An iterable of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    self.__log.log_callinfo()
+    try:
+      key    = None
+      values = []
+      for timestamp, meter, obis, unit, value in rows:
+        if ( (timestamp, meter) != key ):
+          if ( values ): self.__points(key[0], key[1], values)
+          key    = (timestamp, meter)
+          values = []
+        values.append((obis, unit, value))
+      if ( values ): self.__points(key[0], key[1], values)
+      self.__commit()
+    except:
+      # forget primary keys of rolled back rows
+      self.__sql_con.rollback()
+      self.__reload()
+      self.__cat.reset()
+      self.__ins = dict()
+      if ( None != self.__rol ): self.__rol.reset()
+      raise
+
+########################################################################################################################
+
+class HM_DatTrc_SqlWriter(threading.Thread):
+  """
+  @brief   HM data tracing SQL writer thread. Data tuples of all meters storing into the same SQL database are queued and
+           written in batches, each within a single transaction. A batch is flushed when it reaches a configured size
+           or when its oldest data tuple has been waiting for a configured latency. Queueing never blocks the receive
+           threads, data tuples are dropped and counted while the queue is full or after the writer failed.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, mtr, cfg):
+    """
+    @brief   Constructor.
+    @param   mtr   A dictionary of HM meter identifiers and configurations storing into the same SQL database.
+    @param   cfg   A HM writer configuration.
+    """
+    super(HM_DatTrc_SqlWriter, self).__init__(name="HM_DatTrc_SqlWriter({})".format(",".join(mtr)))
+    self.__mtr   = mtr
+    self.__cfg   = cfg
+    self.__log   = pyHM_log.HM_Log(list(self.__mtr.values())[0]["logref"])
+    self.__que   = queue.Queue(self.__cfg.get("qsize", 10000))
+    self.__size  = self.__cfg.get("batch", 500)
+    self.__ltcy  = self.__cfg.get("latency", 2.0)
+    self.__stop  = object()
+    self.__drop  = 0       # values dropped since the last queued data tuples
+    self.stats   = {"rows":0, "flushes":0, "dropped":0, "failed":0, "depth":0, "flush_last":0.0, "flush_max":0.0}
+    self.error   = None    # the error the writer failed with
+    self.__sqldb = list(self.__mtr.values())[0]["sqldb"]
+    self.__mtc   = pyHM_metrics.metrics
+
+    self.__log.log_callinfo()
+
+    self.__mtc.declare("pyhm_writer_queue_depth", "gauge", "Telegrams per SQL database queued for the writer thread after the last flush.")
+    self.__mtc.declare("pyhm_writer_dropped_total", "counter", "Values per SQL database dropped as the writer queue was full.")
+    self.__mtc.declare("pyhm_writer_failed_total", "counter", "Values per SQL database whose writing failed.")
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def put(self, rows):
+    """
+    @brief   Queue data tuples for writing. Called from the receive threads; drops the data tuples if the queue is full
+             or the writer failed, logging the first dropped and, once queueing succeeds again, the number of dropped
+             values.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    if ( None != self.error ):
+      self.stats["failed"] = self.stats["failed"] + len(rows)
+      self.__mtc.inc("pyhm_writer_failed_total", len(rows), sqldb=self.__sqldb)
+      if ( 0 == self.__drop ):
+        self.__log.log(pyLOG.LogLvl.ERROR, "writer failed ({}), dropping all values".format(self.error))
+      self.__drop = self.__drop + len(rows)
+      return
+    try:
+      self.__que.put_nowait(rows)
+    except queue.Full:
+      self.stats["dropped"] = self.stats["dropped"] + len(rows)
+      self.__mtc.inc("pyhm_writer_dropped_total", len(rows), sqldb=self.__sqldb)
+      if ( 0 == self.__drop ):
+        self.__log.log(pyLOG.LogLvl.ERROR, "writer queue full, dropping values")
+      self.__drop = self.__drop + len(rows)
+    else:
+      if ( 0 != self.__drop ):
+        self.__log.log(pyLOG.LogLvl.WARNING, "writer queue accepting again, dropped {} values".format(self.__drop))
+        self.__drop = 0
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def close(self):
+    """
+    @brief   Flush all queued data tuples and exit the writer thread.
+    """
+    self.__log.log_callinfo()
+    # a failed writer does not take from the queue anymore
+    while ( True == self.is_alive() ):
+      try:
+        self.__que.put(self.__stop, timeout=0.5)
+        break
+      except queue.Full:
+        pass
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __flush(self, sql, batch):
+    """
+    @brief   Write a batch of data tuples.
+    @param   sql     The HM_DatTrc_Sql instance.
+    @param   batch   The list of data tuples.
+    """
+    tstart = time.time()
+    try:
+      sql.insert_many(batch)
+    except Exception:
+      self.stats["failed"] = self.stats["failed"] + len(batch)
+      self.__mtc.inc("pyhm_writer_failed_total", len(batch), sqldb=self.__sqldb)
+      self.__log.log(pyLOG.LogLvl.ERROR, "writing {} values failed\n{}".format(len(batch), traceback.format_exc()))
+    else:
+      self.stats["rows"] = self.stats["rows"] + len(batch)
+    tdelta = time.time() - tstart
+    self.stats["flushes"]    = self.stats["flushes"] + 1
+    self.stats["depth"]      = self.__que.qsize()
+    self.stats["flush_last"] = tdelta
+    self.stats["flush_max"]  = max(self.stats["flush_max"], tdelta)
+    self.__mtc.set("pyhm_writer_queue_depth", self.stats["depth"], sqldb=self.__sqldb)
+    if ( 0 == self.stats["flushes"] % 100 ):
+      self.__log.log(pyLOG.LogLvl.INFO, "flushed {} values in {:.1f} ms (max {:.1f} ms), queue depth {}".format(len(batch), tdelta*1e3, self.stats["flush_max"]*1e3, self.stats["depth"]))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def run(self):
+    """
+    @brief   The actual writer loop driven by the thread.
+    """
+    sql = None
+    try:
+      for idf, cfg in self.__mtr.items():
+        if ( None == sql ): sql = HM_DatTrc_Sql(idf, cfg)
+        else              : sql.attach(idf, cfg)
+    except Exception as e:
+      self.__log.log(pyLOG.LogLvl.ERROR, "opening SQL database '{}' failed\n{}".format(self.__sqldb, traceback.format_exc()))
+      self.error = "{}: {}".format(type(e).__name__, e)
+      return
+    run = True
+    while ( True == run ):
+      item = self.__que.get()
+      if ( item is self.__stop ): break
+      batch    = list(item)
+      deadline = time.time() + self.__ltcy
+      while ( len(batch) < self.__size ):
+        try:
+          item = self.__que.get(timeout=max(0.0, deadline - time.time()))
+        except queue.Empty:
+          break
+        if ( item is self.__stop ):
+          run = False
+          break
+        batch.extend(item)
+      self.__flush(sql, batch)
+    del sql
+
+########################################################################################################################
+
+class HM_DatTrc_Compressor:
+  """
+  @brief   HM data tracing per OBIS code compression of data tuples.
+           Mode 'abs' stores a value if it deviates more than deadband from the last stored value, mode 'rel' if it
+           deviates more than deadband times the absolute last stored value. Mode 'sdt' (swinging door) stores a point
+           when no straight line from the last stored point can represent all values since then within deadband anymore;
+           the stored point lies on the middle of the still feasible lines, so the linear interpolation between stored
+           points stays within deadband. A value is stored anyway if the last stored value is older than heartbeat
+           seconds. Non-numeric values are stored on change.
+           Requires the SQL schema version 2: version 1 stores a value only once per meter, OBIS code and unit, so it
+           drops heartbeats and returns to an earlier value.
+  """
+
+  MODES = ("abs", "rel", "sdt")
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg):
+    """
+    @brief   Constructor.
+    @param   cfg   A dictionary of OBIS codes or 'default' and compression configurations, each with the keys 'mode',
+                   'deadband' and 'heartbeat'.
+    """
+    self.__cfg = {}
+    self.__sta = {}
+    self.stats = {"in":0, "out":0}
+    for k,v in cfg.items():
+      if ( v.get("mode", "abs") not in self.MODES ):
+        raise HM_DatTrc_Exception("unknown compression mode '{}' for '{}'".format(v.get("mode"), k))
+      self.__cfg[k] = {"mode":v.get("mode", "abs"), "deadband":float(v.get("deadband", 0.0)), "heartbeat":float(v.get("heartbeat", 0.0))}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def __numeric(value):
+    """
+    @brief   Returns whether a value is numeric or not.
+    @param   value   The value.
+    """
+    return ( isinstance(value, (int, float)) and not isinstance(value, bool) )
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __store(self, out, row):
+    """
+    @brief   Store a data tuple and make it the reference of further compression.
+    @param   out   The list of data tuples to store.
+    @param   row   The data tuple.
+    """
+    out.append(row)
+    self.__sta[row[2]] = {"row":row, "pend":None, "up":float("inf"), "lo":float("-inf")}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __door(self, sta, row, deadband):
+    """
+    @brief   Narrow the swinging door of the last stored data tuple by a data tuple, if it stays open.
+    @param   sta        The OBIS code state.
+    @param   row        The data tuple.
+    @param   deadband   The deadband.
+    @return  Whether the door is still open or not.
+    """
+    dt = (row[0] - sta["row"][0]).total_seconds()
+    if ( 0 >= dt ):
+      return ( abs(row[4] - sta["row"][4]) <= deadband )
+    up = min(sta["up"], (row[4] + deadband - sta["row"][4]) / dt)
+    lo = max(sta["lo"], (row[4] - deadband - sta["row"][4]) / dt)
+    if ( lo > up ):
+      return False
+    sta["up"] = up
+    sta["lo"] = lo
+    return True
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def __pending(sta):
+    """
+    @brief   Return the data tuple held back by the swinging door, moved onto the middle of the feasible lines.
+    @param   sta   The OBIS code state.
+    """
+    row = sta["pend"]
+    dt  = (row[0] - sta["row"][0]).total_seconds()
+    if ( 0 >= dt or sta["up"] == float("inf") or sta["lo"] == float("-inf") ):
+      return row
+    return row[:4] + (sta["row"][4] + dt * (sta["up"] + sta["lo"]) / 2.0,)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def compress(self, rows):
+    """
+    @brief   Compress data tuples.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples in chronological order.
+    @return  The list of data tuples to store.
+    """
+    out = []
+    for row in rows:
+      self.stats["in"] = self.stats["in"] + 1
+      cfg = self.__cfg.get(row[2], self.__cfg.get("default"))
+      sta = self.__sta.get(row[2])
+      if   ( None == cfg ):
+        out.append(row)
+      elif ( None == sta ):
+        self.__store(out, row)
+      elif ( sta["row"][3] != row[3] or not self.__numeric(row[4]) or not self.__numeric(sta["row"][4]) ):
+        # unit change or non-numeric value
+        if ( None != sta["pend"] ): out.append(self.__pending(sta))
+        if ( sta["row"][3:] != row[3:] or (0 < cfg["heartbeat"] and (row[0] - sta["row"][0]).total_seconds() >= cfg["heartbeat"]) ):
+          self.__store(out, row)
+        else:
+          sta["pend"] = None
+      elif ( 0 < cfg["heartbeat"] and (row[0] - sta["row"][0]).total_seconds() >= cfg["heartbeat"] ):
+        if ( None != sta["pend"] ): out.append(self.__pending(sta))
+        self.__store(out, row)
+      elif ( "abs" == cfg["mode"] ):
+        if ( abs(row[4] - sta["row"][4]) > cfg["deadband"] ): self.__store(out, row)
+      elif ( "rel" == cfg["mode"] ):
+        if ( abs(row[4] - sta["row"][4]) > cfg["deadband"] * abs(sta["row"][4]) ): self.__store(out, row)
+      else:
+        if ( self.__door(sta, row, cfg["deadband"]) ):
+          sta["pend"] = row
+        elif ( None == sta["pend"] ):
+          self.__store(out, row)
+        else:
+          # door closed: the last value inside the door becomes the new reference
+          self.__store(out, self.__pending(sta))
+          sta = self.__sta[row[2]]
+          if ( self.__door(sta, row, cfg["deadband"]) ): sta["pend"] = row
+          else                                         : self.__store(out, row)
+    self.stats["out"] = self.stats["out"] + len(out)
+    return out
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def flush(self):
+    """
+    @brief   Return the data tuples held back by the swinging door compression, e.g. before exiting.
+    @return  The list of data tuples to store.
+    """
+    out = []
+    for obis, sta in self.__sta.items():
+      if ( None != sta["pend"] ):
+        out.append(self.__pending(sta))
+        sta["pend"] = None
+    self.stats["out"] = self.stats["out"] + len(out)
+    return out
+
+########################################################################################################################
+
+class HM_DatTrc_CRC16:
+  """
+  @brief   HM data tracing CRC16/X.25 of SML transport frames (polynomial 0x1021 reflected, initial and final XOR
+           value 0xFFFF). The reflected CRC equals the bit reversed CRC-CCITT of binascii.crc_hqx over the bit reversed
+           bytes, so the per byte work is done by bytes.translate with a precomputed table and by binascii.
+  """
+
+  REVERSE = bytes([int("{:08b}".format(i)[::-1], 2) for i in range(256)])
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def compute(cls, data):
+    """
+    @brief   Compute the CRC16/X.25 of data.
+    @param   data   The bytes.
+    @return  The CRC value, transmitted low byte first.
+    """
+    crc = binascii.crc_hqx(bytes(data).translate(cls.REVERSE), 0xFFFF)
+    return ((cls.REVERSE[crc & 0xFF] << 8) | cls.REVERSE[crc >> 8]) ^ 0xFFFF
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def check(cls, frame, order="little"):
+    """
+    @brief   Check the trailing CRC of a SML transport frame over all bytes from the start sequence until the number of
+             padding bytes.
+    @param   frame   A SML transport frame as returned by HM_DatTrc_SMLFramer.
+    @param   order   The byte order the CRC is transmitted in, 'little' (low byte first) as specified or 'big'.
+    @return  whether the CRC matches.
+    """
+    if ( 16 > len(frame) ): return False
+    return ( cls.compute(frame[:-2]) == int.from_bytes(frame[-2:], order) )
+
+########################################################################################################################
+
+class HM_DatTrc_SMLFramer:
+  """
+  @brief   HM data tracing incremental SML transport frame scanner.
+           Only the bytes received since the last call are searched for escape sequences, so the costs per call depend
+           on the size of the received chunk and not on the size of the buffer. Garbage in front of a start sequence is
+           discarded and frames exceeding a maximum length are dropped to resynchronize on the next start sequence.
+  """
+
+  ESC   = b"\x1b\x1b\x1b\x1b"
+  BEGIN = b"\x01\x01\x01\x01"
+  START = ESC + BEGIN
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, maxlen=8192):
+    """
+    @brief   Constructor.
+    @param   maxlen   The maximum length of a frame in bytes.
+    """
+    self.buffer  = bytearray()
+    self.maxlen  = maxlen
+    self.dropped = 0       # discarded byte counter
+    self.__frm   = False   # buffer starts with a start sequence
+    self.__pos   = 0       # buffer position to resume scanning at
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __discard(self, size):
+    """
+    @brief   Discard bytes from the beginning of the buffer.
+    @param   size   The number of bytes to discard.
+    """
+    if ( 0 < size ):
+      del self.buffer[:size]
+      self.dropped = self.dropped + size
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __resync(self):
+    """
+    @brief   Give up the current frame and search for the next start sequence behind its start sequence.
+    """
+    self.__frm = False
+    self.__pos = 1
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def reset(self):
+    """
+    @brief   Discard all buffered bytes.
+    """
+    self.__discard(len(self.buffer))
+    self.__frm = False
+    self.__pos = 0
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def feed(self, data):
+    """
+    @brief   Buffer received data and return all frames completed by it.
+    @param   data   Bytes received via serial port.
+    @return  A list of frames, each from start sequence until end sequence including padding and CRC bytes.
+    """
+    buf = self.buffer
+    buf.extend(data)
+    frames = []
+    while ( True ):
+      if ( False == self.__frm ):
+        # search for a start sequence not preceded by an escape sequence
+        idx = buf.find(self.START, self.__pos)
+        if ( 0 > idx ):
+          # keep a possibly incomplete start sequence only
+          self.__discard(len(buf) - (len(self.START) - 1))
+          self.__pos = 0
+          break
+        if ( 4 <= idx and buf[idx-4:idx] == self.ESC ):
+          self.__pos = idx + 1
+          continue
+        self.__discard(idx)
+        self.__frm = True
+        self.__pos = len(self.START)
+      else:
+        # search for 4 byte aligned escape sequences behind the start sequence
+        idx = buf.find(self.ESC, self.__pos)
+        while ( 0 <= idx and 0 != (idx & 3) ):
+          idx = buf.find(self.ESC, idx + 1)
+        if ( 0 > idx ):
+          if ( len(buf) > self.maxlen ): self.__resync(); continue
+          self.__pos = max(len(self.START), len(buf) & ~3)
+          break
+        if ( len(buf) < idx + 8 ):
+          if ( len(buf) > self.maxlen ): self.__resync(); continue
+          self.__pos = idx
+          break
+        tag = buf[idx+4:idx+8]
+        if   ( tag == self.ESC ):
+          # escaped escape sequence within data
+          self.__pos = idx + 8
+        elif ( tag == self.BEGIN ):
+          # restart within a frame
+          self.__discard(idx)
+          self.__pos = len(self.START)
+        elif ( 0x1A == tag[0] and 3 >= tag[1] ):
+          frames.append(buf[:idx+8])
+          del buf[:idx+8]
+          self.__frm = False
+          self.__pos = 0
+        else:
+          self.__resync()
+    return frames
+
+########################################################################################################################
+
+class HM_DatTrc_SMLDecoder:
+  """
+  @brief   HM data tracing fast SML_GetListRes decoder.
+           Walks the TL encoded bytes of a SML transport frame directly and extracts objName, unit, scaler and value of
+           the list entries of all SML_GetListRes messages, skipping the entries of filtered OBIS codes without decoding
+           them. Other messages are skipped. Frames of an unusual layout, e.g. containing escaped escape sequences, are
+           not decoded, so the caller can fall back to pySML. A broken layout raises a plain ValueError internally,
+           which is cheap to raise in contrast to HM_DatTrc_Exception.
+  """
+
+  ESC   = HM_DatTrc_SMLFramer.ESC
+  START = HM_DatTrc_SMLFramer.START
+  END   = ESC + b"\x1a"
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, filter=[]):
+    """
+    @brief   Constructor.
+    @param   filter   The OBIS codes whose list entries are skipped.
+    """
+    self.__flt = frozenset(filter)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def __tl(buf, i):
+    """
+    @brief   Decode a type length field.
+    @param   buf   The frame.
+    @param   i     The position of the type length field.
+    @return  a tuple of the type (bits 6..4), the length and the size of the type length field.
+    """
+    b = buf[i]
+    if ( 0 == b & 0x80 ): return (b & 0x70, b & 0x0F, 1)
+    typ = b & 0x70
+    ln  = b & 0x0F
+    n   = 1
+    while ( b & 0x80 ):
+      b  = buf[i+n]
+      ln = (ln << 4) | (b & 0x0F)
+      n  = n + 1
+    return (typ, ln, n)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def __skip(cls, buf, i):
+    """
+    @brief   Skip an element.
+    @param   buf   The frame.
+    @param   i     The position of the element.
+    @return  the position behind the element.
+    """
+    b = buf[i]
+    if ( 0x70 > b ):
+      # scalar of a single type length byte, the most common case
+      if ( 0 == b & 0x0F ): raise ValueError("invalid length at {}".format(i))
+      return i + (b & 0x0F)
+    typ, ln, n = cls.__tl(buf, i)
+    if ( 0x70 == typ ):
+      i = i + n
+      for k in range(ln):
+        i = cls.__skip(buf, i)
+      return i
+    if ( ln < n ): raise ValueError("invalid length at {}".format(i))
+    return i + ln
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def __value(cls, buf, i):
+    """
+    @brief   Decode a scalar element the way pySML does, an octet string as bytearray, an integer as int, a boolean as
+             bool and an optional element not present (0x01) as None.
+    @param   buf   The frame.
+    @param   i     The position of the element.
+    @return  a tuple of the value and the position behind the element.
+    """
+    b = buf[i]
+    if ( 0x70 > b ): typ, ln, n = (b & 0x70, b & 0x0F, 1)
+    else           : typ, ln, n = cls.__tl(buf, i)
+    if ( ln < n ): raise ValueError("invalid length at {}".format(i))
+    if   ( 0x00 == typ and n == ln ): return (None, i + ln)
+    elif ( 0x00 == typ ): return (bytearray(buf[i+n:i+ln]), i + ln)
+    elif ( 0x50 == typ ): return (int.from_bytes(buf[i+n:i+ln], "big", signed=True), i + ln)
+    elif ( 0x60 == typ ): return (int.from_bytes(buf[i+n:i+ln], "big"), i + ln)
+    elif ( 0x40 == typ ): return (0 != buf[i+n], i + ln)
+    raise ValueError("unexpected type 0x{:02x} at {}".format(buf[i], i))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __getlist(self, buf, i, vals):
+    """
+    @brief   Decode the list entries of a SML_GetListRes (clientId, serverId, listName, actSensorTime, valList,
+             listSignature, actGatewayTime), each of objName, status, valTime, unit, scaler, value and valueSignature.
+    @param   buf    The frame.
+    @param   i      The position of the SML_GetListRes.
+    @param   vals   The list to append the (obis, unit, scaler, value) tuples of the unfiltered entries to.
+    @return  the position behind the SML_GetListRes.
+    """
+    if ( 0x77 != buf[i] ): raise ValueError("unexpected SML_GetListRes at {}".format(i))
+    i = i + 1
+    for k in range(4):
+      i = self.__skip(buf, i)
+    typ, cnt, n = self.__tl(buf, i)
+    if ( 0x70 != typ ): raise ValueError("unexpected valList at {}".format(i))
+    i     = i + n
+    skip  = self.__skip
+    value = self.__value
+    flt   = self.__flt
+    for k in range(cnt):
+      if ( 0x77 != buf[i] ): raise ValueError("unexpected SML_ListEntry at {}".format(i))
+      typ, ln, n = self.__tl(buf, i + 1)
+      if ( 0x00 != typ or ln < n ): raise ValueError("unexpected objName at {}".format(i + 1))
+      obis = int.from_bytes(buf[i+1+n:i+1+ln], "big")
+      i    = i + 1 + ln
+      if ( obis in flt ):
+        for k in range(6):
+          i = skip(buf, i)
+        continue
+      i = skip(buf, skip(buf, i))
+      vUnit,   i = value(buf, i)
+      vScaler, i = value(buf, i)
+      vValue,  i = value(buf, i)
+      i = skip(buf, i)
+      vals.append((obis, vUnit, vScaler, vValue))
+    i = self.__skip(buf, i)
+    return self.__skip(buf, i)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def decode(self, packet):
+    """
+    @brief   Decode the SML_GetListRes messages of a SML transport frame.
+    @param   packet   A SML transport frame as returned by HM_DatTrc_SMLFramer.
+    @return  a list of lists of (obis, unit, scaler, value) tuples, one per SML_GetListRes, or None if the layout is
+             unusual or broken.
+    """
+    try:
+      buf = packet
+      end = buf.rfind(self.END)
+      if ( 0 != buf.find(self.START) or end < len(self.START) or 0 <= buf.find(self.ESC, len(self.START), end) ):
+        return None
+      msgs = []
+      i    = len(self.START)
+      # messages of transactionId, groupNo, abortOnError, messageBody (tag, body), crc16 and endOfSmlMsg
+      while ( i < end and 0x76 == buf[i] ):
+        i = self.__skip(buf, self.__skip(buf, self.__skip(buf, i + 1)))
+        if ( 0x72 != buf[i] ): return None
+        tag, i = self.__value(buf, i + 1)
+        if ( 0x0701 == tag ):
+          vals = []
+          i    = self.__getlist(buf, i, vals)
+          msgs.append(vals)
+        else:
+          i = self.__skip(buf, i)
+        i = self.__skip(buf, i)
+        if ( 0x00 != buf[i] ): return None
+        i = i + 1
+      # only padding may follow the messages
+      if ( i > end or buf[i:end].strip(b"\x00") ): return None
+      return msgs
+    except (IndexError, ValueError):
+      return None
+
+########################################################################################################################
+
+class HM_DatTrc_Archive:
+  """
+  @brief   HM data tracing append-only archive of the raw SML transport frames of a meter.
+           The frames are appended to a data segment file '<location>/<meter>/<YYYYmmdd_HHMMSS_ffffff>.sml' named by
+           the receive timestamp of its first frame. A new segment is started per process, per day if 'interval' is
+           'day', before a segment exceeds 'segsize' MiB and when the clock went back, so the receive timestamps of each
+           segment ascend. Each segment has an index file '.idx' of fixed width INDEX records (receive timestamp in
+           microseconds since 1970-01-01T00:00:00 local time, offset and length of the frame), which is memory mapped
+           and binary searched when reading. A record is appended after its frame, so a torn tail of either file is
+           ignored.
+  """
+
+  INDEX  = struct.Struct("<qQI")
+  DATA   = ".sml"
+  IDX    = ".idx"
+  NAMING = "%Y%m%d_%H%M%S_%f"
+  EPOCH  = datetime.datetime(1970, 1, 1)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, idf, cfg):
+    """
+    @brief   Constructor.
+    @param   idf   A HM meter identifier.
+    @param   cfg   A HM archive configuration with the keys 'location', 'segsize' and 'interval'.
+    """
+    self.__dir = os.path.join(cfg.get("location", "./archive/"), idf)
+    self.__max = int(cfg.get("segsize", 64) * 1024 * 1024)
+    self.__day = ( "day" == cfg.get("interval", "day") )
+    self.__dat = None
+    self.__idx = None
+    self.__off = 0
+    self.__beg = None   # receive timestamp of the first frame of the segment
+    self.__lst = None   # receive timestamp of the last frame of the segment
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def us(cls, timestamp):
     """
-    @brief   Destructor.
+    @brief   Return a timestamp as integer microseconds since 1970-01-01T00:00:00.
+    @param   timestamp   The (naive) timestamp.
     """
-    self.__log.log_callinfo()
-    self.__sql_con.commit()
-    self.__sql_con.close()
+    return calendar.timegm(timestamp.timetuple()) * 1000000 + timestamp.microsecond
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def __create_view(self):
+  def __rotate(self, timestamp, size):
     """
-    @brief   Create views per meter if not exists.
+    @brief   Return whether a frame has to start a new segment.
+    @param   timestamp   The receive timestamp of the frame.
+    @param   size        The frame length.
     """
-    try:
-      self.__sql_cur.execute("""CREATE VIEW IF NOT EXISTS v_{} AS SELECT mt.value AS timestamp, bo.value AS obis, bo.description AS obis_desc, bu.value AS unit, bu.description AS unit_desc, mp.value AS value
-                                FROM m_POINTS mp
-                                  INNER JOIN m_TIMESTAMPS mt ON (mp.pk_timestamp = mt.pk)
-                                  INNER JOIN b_OBIS       bo ON (mp.pk_obis      = bo.pk)
-                                  INNER JOIN b_UNITS      bu ON (mp.pk_unit      = bu.pk)
-                                WHERE mp.pk_meter=={}
-                                ORDER BY timestamp, obis;
-                             """.format(self.__idf, self.__tab_meters[self.__idf])
-                            )
-    except:
-      pass
+    if ( None == self.__dat ):                                                   return True
+    if ( timestamp < self.__lst ):                                               return True
+    if ( self.__day and timestamp.date() != self.__beg.date() ):                 return True
+    if ( 0 < self.__max and 0 < self.__off and self.__off + size > self.__max ): return True
+    return False
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def insert(self, timestamp, meter, obis, unit, value):
+  def __open(self, timestamp):
     """
-    @brief   Insert a data tuple into SQL database.
-    @param   timestamp   The timestamp.
-    @param   meter       The HM meter identifier.
-    @param   obis        The OBIS code.
-    @param   unit        The unit.
-    @param   value       The value.
+    @brief   Close the current segment and start a new one, creating the directory if necessary.
+    @param   timestamp   The receive timestamp of its first frame.
     """
-    self.__log.log_callinfo()
-
-    if ( unit == None ):
-      unit = 0xFF
-
-    if ( meter != self.__idf ):
-      raise HM_DatTrc_Exception("passed meter != configured meter")
-
-    if ( meter != None and meter not in self.__tab_meters ):
-      self.__sql_sve = True
-      try:
-        self.__sql_cur.execute("INSERT INTO b_METERS (value, description) VALUES (?, ?);", [meter, self.__cfg["note"]])
-        self.__tab_meters[meter] = self.__sql_cur.lastrowid
-      except sqlite3.IntegrityError:
-        self.__sql_cur.execute("SELECT * FROM b_UNITS;")
-        for i, row in enumerate(self.__sql_cur.fetchall()):
-          self.__tab_units[row["value"]] = row["PK"]
+    self.close()
+    os.makedirs(self.__dir, exist_ok=True)
+    name = os.path.join(self.__dir, timestamp.strftime(self.NAMING))
+    while ( os.path.exists(name + self.DATA) ):
+      name = name + "_"
+    self.__dat = open(name + self.DATA, "xb")
+    self.__idx = open(name + self.IDX, "xb")
+    self.__off = 0
+    self.__beg = timestamp
 
-    if ( unit != None and unit not in self.__tab_units ):
-      self.__sql_sve = True
-      try:
-        self.__sql_cur.execute("INSERT INTO b_UNITS (value, description) VALUES (?, ?);", [unit, self.__obs.getUnit(unit)["native"]])
-        self.__tab_units[unit] = self.__sql_cur.lastrowid
-      except sqlite3.IntegrityError:
-        self.__sql_cur.execute("SELECT * FROM b_UNITS;")
-        for i, row in enumerate(self.__sql_cur.fetchall()):
-          self.__tab_units[row["value"]] = row["PK"]
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def append(self, timestamp, frame):
+    """
+    @brief   Append a frame to the archive.
+    @param   timestamp   The receive timestamp.
+    @param   frame       The SML transport frame.
+    """
+    if ( self.__rotate(timestamp, len(frame)) ):
+      self.__open(timestamp)
+    self.__dat.write(frame)
+    self.__dat.flush()
+    self.__idx.write(self.INDEX.pack(self.us(timestamp), self.__off, len(frame)))
+    self.__idx.flush()
+    self.__off = self.__off + len(frame)
+    self.__lst = timestamp
 
-    if ( obis != None and obis not in self.__tab_obis ):
-      self.__sql_sve = True
-      try:
-        self.__sql_cur.execute("INSERT INTO b_OBIS (value, description) VALUES (?, ?);", [obis, self.__obs.getDescr(obis)["descr"]])
-        self.__tab_obis[obis] = self.__sql_cur.lastrowid
-      except sqlite3.IntegrityError:
-        self.__sql_cur.execute("SELECT * FROM b_OBIS;")
-        for i, row in enumerate(self.__sql_cur.fetchall()):
-          self.__tab_obis[row["value"]] = row["PK"]
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def close(self):
+    """
+    @brief   Close the current segment, the next frame starts a new one.
+    """
+    for f in (self.__dat, self.__idx):
+      if ( None != f ): f.close()
+    self.__dat = None
+    self.__idx = None
 
-    pk_tstamp = None
-    pk_meter  = self.__tab_meters[meter]
-    pk_obis   = self.__tab_obis[obis]
-    pk_unit   = self.__tab_units[unit]
-    pk_point  = None
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def segments(cls, location, idf):
+    """
+    @brief   Return the segments of a meter in order of their names.
+    @param   location   The archive directory.
+    @param   idf        A HM meter identifier.
+    @return  A list of segment paths without extension.
+    """
+    path = os.path.join(location, idf)
+    if ( not os.path.isdir(path) ): return []
+    return [os.path.join(path, f[:-len(cls.DATA)]) for f in sorted(os.listdir(path))
+            if ( f.endswith(cls.DATA) and os.path.exists(os.path.join(path, f[:-len(cls.DATA)] + cls.IDX)) )]
 
-    try:
-      pk_tstamp = self.__tab_tstamps[timestamp]
-      self.__sql_cur.execute("INSERT INTO m_POINTS (pk_timestamp, pk_meter, pk_obis, pk_unit, value) VALUES (?, ?, ?, ?, ?);", [pk_tstamp, pk_meter, pk_obis, pk_unit, value])
-    except sqlite3.IntegrityError:
-      pass
-    except KeyError: # => timestamp
-      try:
-        self.__sql_cur.execute("INSERT INTO m_POINTS (pk_timestamp, pk_meter, pk_obis, pk_unit, value) VALUES (?, ?, ?, ?, ?);", [None, pk_meter, pk_obis, pk_unit, value])
-        pk_point = self.__sql_cur.lastrowid
-      except sqlite3.IntegrityError:
-        pass
-      else:
-        try:
-          self.__sql_cur.execute("INSERT INTO m_TIMESTAMPS (value) VALUES (?);", [timestamp.isoformat()])
-          self.__tab_tstamps[timestamp] = self.__sql_cur.lastrowid
-        except sqlite3.IntegrityError:
-          self.__sql_cur.execute("SELECT * FROM b_TIMESTAMPS WHERE value == ?;", [timestamp.isoformat()])
-          for i, row in enumerate(self.__sql_cur.fetchall()):
-            self.__tab_tstamps[row["value"]] = row["PK"]
-        pk_tstamp = self.__tab_tstamps[timestamp]
-        self.__sql_cur.execute("UPDATE m_POINTS SET pk_timestamp=? WHERE PK=?", [pk_tstamp, pk_point])
-
-    # maintain tstamps cache
-    while ( len(self.__tab_tstamps) > self.__max_tstamps ):
-      self.__tab_tstamps.popitem(last=False)
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def __bisect(cls, idx, cnt, us):
+    """
+    @brief   Return the number of the first index record of a segment not received before a timestamp.
+    @param   idx   The memory mapped index.
+    @param   cnt   The number of index records.
+    @param   us    The timestamp in microseconds.
+    """
+    lo, hi = 0, cnt
+    while ( lo < hi ):
+      mid = (lo + hi) // 2
+      if ( cls.INDEX.unpack_from(idx, mid * cls.INDEX.size)[0] < us ): lo = mid + 1
+      else                                                          : hi = mid
+    return lo
 
-    # commit
-    if ( self.__sql_cnt % 10 == 0 or self.__sql_sve == True ):
-      self.__create_view()
-      self.__sql_con.commit()
-      self.__sql_cnt = 0
-      self.__sql_sve = False
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def read(cls, location, idf, dtfrom=None, dtuntil=None):
+    """
+    @brief   Read the archived frames of a meter received within a time range, segment by segment.
+    @param   location   The archive directory.
+    @param   idf        A HM meter identifier.
+    @param   dtfrom     The (naive) timestamp the range starts at, or None.
+    @param   dtuntil    The (naive) timestamp the range ends before, or None.
+    @return  A generator of (receive timestamp, frame bytes) tuples.
+    """
+    usfrom  = None
+    usuntil = None
+    if ( None != dtfrom  ): usfrom  = cls.us(dtfrom)
+    if ( None != dtuntil ): usuntil = cls.us(dtuntil)
+    for seg in cls.segments(location, idf):
+      with ( open(seg + cls.IDX, "rb") ) as fidx, open(seg + cls.DATA, "rb") as fdat:
+        cnt  = os.fstat(fidx.fileno()).st_size // cls.INDEX.size
+        size = os.fstat(fdat.fileno()).st_size
+        if ( 0 == cnt or 0 == size ): continue
+        with ( mmap.mmap(fidx.fileno(), 0, access=mmap.ACCESS_READ) ) as idx, mmap.mmap(fdat.fileno(), 0, access=mmap.ACCESS_READ) as dat:
+          if ( None != usuntil and cls.INDEX.unpack_from(idx, 0)[0] >= usuntil ): continue
+          i = 0
+          if ( None != usfrom ): i = cls.__bisect(idx, cnt, usfrom)
+          for us, off, length in cls.INDEX.iter_unpack(idx[i * cls.INDEX.size : cnt * cls.INDEX.size]):
+            if ( None != usuntil and us >= usuntil ): break
+            if ( off + length > size ): break
+            yield (cls.EPOCH + datetime.timedelta(microseconds=us), dat[off:off+length])
 
 ########################################################################################################################
 
@@ -243,24 +1405,58 @@ class HM_DatTrc_SMLPacket(serial.threaded.Protocol):
   """
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def __init__(self, idf, cfg):
+  def __init__(self, idf, cfg, wrt=None):
     """
     @brief   Constructor.
     @param   idf   A HM meter identifier.
     @param   cfg   A HM meter configuration.
+    @param   wrt   A HM_DatTrc_SqlWriter to pass the data tuples to, or None to insert them directly.
     """
     self.__idf     = idf
     self.__cfg     = cfg
     self.__sql     = None
+    self.__wrt     = wrt
+    self.__cmp     = None
     self.__alv     = None
     self.__deb     = 0     # debunce counter
     self.__cnt     = 0     # received packet counter
-    self.__log     = pyLOG.Log(self.__cfg["logref"])
-    self.buffer    = bytearray()
+    self.__log     = pyHM_log.HM_Log(self.__cfg["logref"])
+    self.__frm     = HM_DatTrc_SMLFramer(self.__cfg.get("frmlen", 8192))
+    self.__flt     = frozenset(self.__cfg["filter"])
+    self.__dec     = None
+    self.__crc     = self.__cfg.get("crc", True)
+    self.__crcord  = self.__cfg.get("crcorder", "little")
+    self.__dmp     = self.__cfg.get("crcdump", 100)
+    self.__bad     = 0     # frames with bad CRC counter
+    self.__stl     = self.__cfg.get("stall", 5.0)
+    self.__rcv     = None  # time of the last receive
+    self.__mtc     = pyHM_metrics.metrics
+    self.__arc     = None
+    self.__are     = False # archive failing
+    self.buffer    = self.__frm.buffer
     self.transport = None
 
     self.__log.log_callinfo()
 
+    if ( "compress" in self.__cfg ):
+      if ( 2 == self.__cfg.get("sqlver", 1) ):
+        self.__cmp = HM_DatTrc_Compressor(self.__cfg["compress"])
+      else:
+        self.__log.log(pyLOG.LogLvl.ERROR, "'compress' of meter '{}' requires 'sqlver: 2', storing all values uncompressed.".format(self.__idf))
+    if ( True == self.__cfg.get("fastdec", True) ):
+      self.__dec = HM_DatTrc_SMLDecoder(self.__flt)
+    if ( "archive" in self.__cfg ):
+      self.__arc = HM_DatTrc_Archive(self.__idf, self.__cfg["archive"])
+
+    self.__mtc.declare("pyhm_telegrams_total", "counter", "SML_GetListRes messages received per meter.")
+    self.__mtc.declare("pyhm_decode_failures_total", "counter", "SML frames per meter whose decoding failed.")
+    self.__mtc.declare("pyhm_crc_errors_total", "counter", "SML frames per meter dropped before decoding as their CRC did not match.")
+    self.__mtc.declare("pyhm_decode_fallbacks_total", "counter", "SML frames per meter of an unusual layout decoded by pySML instead of the fast decoder.")
+    self.__mtc.declare("pyhm_bytes_buffered", "gauge", "Bytes per meter buffered by the framer awaiting the end of a frame.")
+    self.__mtc.declare("pyhm_serial_read_stalls_total", "counter", "Receive gaps per meter longer than the configured stall time.")
+    self.__mtc.declare("pyhm_serial_last_receive_timestamp_seconds", "gauge", "Unix time per meter of the last bytes received.")
+    self.__mtc.declare("pyhm_archive_errors_total", "counter", "SML frames per meter which could not be appended to the archive.")
+
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def connection_made(self, transport):
     """
@@ -284,15 +1480,54 @@ class HM_DatTrc_SMLPacket(serial.threaded.Protocol):
   def data_received(self, data):
     """
     @brief   Buffer receives data and searchs for SML_Telegram terminators, when found, call handle_packet().
+             The search is done incrementally by a HM_DatTrc_SMLFramer.
     @param   data   Bytes received via serial port.
     """
     self.__log.log_callinfo()
-    self.buffer.extend(data)
-    packets = [packet for packet in re.finditer(bytes("(?<!\x1b\x1b\x1b\x1b)\x1b\x1b\x1b\x1b\x01\x01\x01\x01.*?(?<!\x1b\x1b\x1b\x1b)\x1b\x1b\x1b\x1b\x1a(\x00|\x01|\x02|\x03)..".encode("ascii")), self.buffer, re.DOTALL)]
-    if ( packets != [] ):
-      for packet in packets:
-        self.handle_packet(self.buffer[packet.start():packet.end()])
-      del self.buffer[:packets[-1].end()]
+    now = time.time()
+    if ( None != self.__rcv and self.__stl < now - self.__rcv ):
+      self.__mtc.inc("pyhm_serial_read_stalls_total", meter=self.__idf)
+    self.__rcv = now
+    self.__mtc.set("pyhm_serial_last_receive_timestamp_seconds", now, meter=self.__idf)
+    for packet in self.__frm.feed(data):
+      ts = datetime.datetime.now()
+      if ( None != self.__arc ):
+        self.__archive(ts, packet)
+      if ( False == self.__crc or HM_DatTrc_CRC16.check(packet, self.__crcord) ):
+        self.handle_packet(packet, ts)
+      else:
+        self.__reject(packet)
+    self.__mtc.set("pyhm_bytes_buffered", len(self.__frm.buffer), meter=self.__idf)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __archive(self, timestamp, packet):
+    """
+    @brief   Append a packet to the archive. A failure is logged once until appending succeeds again, the packet is
+             processed anyway.
+    @param   timestamp   The receive timestamp.
+    @param   packet      A SML_Telegram.
+    """
+    try:
+      self.__arc.append(timestamp, packet)
+      self.__are = False
+    except OSError as e:
+      self.__mtc.inc("pyhm_archive_errors_total", meter=self.__idf)
+      if ( False == self.__are ):
+        self.__log.log(pyLOG.LogLvl.ERROR, "archiving failed: {}".format(e))
+      self.__are = True
+      try   : self.__arc.close()
+      except: pass
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __reject(self, packet):
+    """
+    @brief   Count and drop a packet with bad CRC, dumping the first and then every nth one as configured by 'crcdump'.
+    @param   packet   A SML_Telegram.
+    """
+    self.__bad = self.__bad + 1
+    self.__mtc.inc("pyhm_crc_errors_total", meter=self.__idf)
+    if ( 0 < self.__dmp and 0 == (self.__bad - 1) % self.__dmp ):
+      self.__log.log(pyLOG.LogLvl.WARNING, "dropped packet with bad CRC ({} so far)\n{}".format(self.__bad, bytes(packet).hex()))
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def prepare(self):
@@ -300,8 +1535,9 @@ class HM_DatTrc_SMLPacket(serial.threaded.Protocol):
     @brief   Prepare the processing of completely received packest. This is firstly called in a threads run method.
     """
     self.__log.log_callinfo()
-    self.__sql = HM_DatTrc_Sql(self.__idf, self.__cfg)
-    self.__sql.insert(datetime.datetime.now(), self.__idf, 0xFFFFFFFFFFFF, 0xFF, "RESET")
+    if ( None == self.__wrt ):
+      self.__sql = HM_DatTrc_Sql(self.__idf, self.__cfg)
+    self.store([(datetime.datetime.now(), self.__idf, 0xFFFFFFFFFFFF, 0xFF, "RESET")])
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def disperse(self):
@@ -309,45 +1545,89 @@ class HM_DatTrc_SMLPacket(serial.threaded.Protocol):
     @brief   Disperse the processing of completely received packest. This is lastly called in a threads run method.
     """
     self.__log.log_callinfo()
+    if ( None != self.__cmp ):
+      rows = self.__cmp.flush()
+      if ( rows ): self.store(rows)
+    if ( None != self.__arc ):
+      self.__arc.close()
     del self.__sql
+    self.__sql = None
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def store(self, rows):
+    """
+    @brief   Store data tuples either via the SQL writer thread or directly into the SQL database.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    if ( None != self.__wrt ):
+      self.__wrt.put(rows)
+    else:
+      self.__sql.insert_many(rows)
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def handle_packet(self, packet):
+  def __getlist(self, packet):
     """
-    @brief   Process a completely received packet. This is repetitive called in a threads run method.
+    @brief   Decode the SML_GetListRes messages of a packet by pySML.
     @param   packet   A SML_Telegram.
+    @return  a list of lists of (obis, unit, scaler, value) tuples of the unfiltered OBIS codes, one per SML_GetListRes.
+    """
+    telegram      = pySML.SML_Telegram()
+    telegram.data = packet
+    msgs          = []
+    for msg in telegram.msg:
+      if ( isinstance(msg.MessageBody.Element, pySML.SML_GetListRes) ):
+        vals = []
+        for val in msg.MessageBody.Element.ValList.valu:
+          #vStatus = val.Status.Element.valu
+          vObis = int(val.ObjName.valu.hex(), 16)
+          if ( vObis not in self.__flt ):
+            vals.append((vObis, val.Unit.valu, val.Scaler.valu, val.Value.Element.valu))
+        msgs.append(vals)
+    return msgs
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def handle_packet(self, packet, timestamp=None):
+    """
+    @brief   Process a completely received packet. This is repetitive called in a threads run method. The packet is
+             decoded by the HM_DatTrc_SMLDecoder if enabled, else or if its layout is unusual by pySML.
+    @param   packet      A SML_Telegram.
+    @param   timestamp   The receive timestamp of the packet, now if None.
     """
     self.__log.log_callinfo()
     try:
-      telegram      = pySML.SML_Telegram()
-      telegram.data = packet
-      dat           = {}
-      ts            = datetime.datetime.now()
-      for msg in telegram.msg:
-        if ( isinstance(msg.MessageBody.Element, pySML.SML_GetListRes) ):
-          self.__deb = self.__deb + 1
-          self.__cnt = self.__cnt + 1
-          for i,val in enumerate(msg.MessageBody.Element.ValList.valu):
-            #vStatus = val.Status.Element.valu
-            vObis   = int(val.ObjName.valu.hex(), 16)
-            vUnit   = val.Unit.valu
-            vScaler = val.Scaler.valu
-            vValue  = val.Value.Element.valu
-            if ( vObis not in self.__cfg["filter"] ):
-              if ( None == self.__alv ):
-                self.__alv = vObis
-              if ( vObis == self.__alv and 10 == self.__deb ):
-                self.__log.log(pyLOG.LogLvl.INFO, "received packet ({:010})".format(self.__cnt))
-                self.__deb = 0
-              if ( None != vValue and isinstance(vValue, bytearray) ):
-                try   : vValue = "\""+vValue.decode("utf-8")+"\""
-                except: vValue = bytes(vValue)
-              else:
-                if ( None != vScaler ):
-                  if   ( 0 > vScaler ): vValue = vValue / (10*(-vScaler))
-                  else                : vValue = vValue * (10**vScaler)
-              self.__sql.insert(ts, self.__idf, vObis, vUnit, vValue)
+      msgs = None
+      if ( None != self.__dec ):
+        msgs = self.__dec.decode(packet)
+        if ( None == msgs ): self.__mtc.inc("pyhm_decode_fallbacks_total", meter=self.__idf)
+      if ( None == msgs ):
+        msgs = self.__getlist(packet)
+      rows = []
+      ts   = timestamp
+      if ( None == ts ): ts = datetime.datetime.now()
+      for vals in msgs:
+        self.__deb = self.__deb + 1
+        self.__cnt = self.__cnt + 1
+        self.__mtc.inc("pyhm_telegrams_total", meter=self.__idf)
+        for vObis, vUnit, vScaler, vValue in vals:
+          if ( None == self.__alv ):
+            self.__alv = vObis
+          if ( vObis == self.__alv and 10 == self.__deb ):
+            self.__log.log(pyLOG.LogLvl.INFO, "received packet ({:010})".format(self.__cnt))
+            self.__deb = 0
+          if ( None != vValue and isinstance(vValue, bytearray) ):
+            try   : vValue = "\""+vValue.decode("utf-8")+"\""
+            except: vValue = bytes(vValue)
+          else:
+            if ( None != vScaler ):
+              if   ( 0 > vScaler ): vValue = vValue / (10**(-vScaler))
+              else                : vValue = vValue * (10**vScaler)
+          rows.append((ts, self.__idf, vObis, vUnit, vValue))
+      if ( None != self.__cmp ):
+        rows = self.__cmp.compress(rows)
+      if ( rows ):
+        self.store(rows)
     except Exception as e:
+      self.__mtc.inc("pyhm_decode_failures_total", meter=self.__idf)
       self.__log.log(pyLOG.LogLvl.ERROR, "\n{}\n{}".format(e, packet))
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -427,11 +1707,370 @@ class HM_DatTrc_ReaderThread(serial.threaded.ReaderThread):
 
 ########################################################################################################################
 
+class HM_DatTrc_AsyncReader(threading.Thread):
+  """
+  @brief   Serial receive thread for many meters. A single asyncio event loop watches the file descriptors of all serial
+           ports and calls the same protocol methods as HM_DatTrc_ReaderThread, only when data is available. POSIX
+           only, as it relies on the serial ports being selectable.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, logref):
+    """
+    @brief   Constructor.
+    @param   logref   A HM logger reference.
+    """
+    super(HM_DatTrc_AsyncReader, self).__init__(name="HM_DatTrc_AsyncReader", daemon=True)
+    self.__log   = pyHM_log.HM_Log(logref)
+    self.__port  = OrderedDict()
+    self.__loop  = None
+    self.__ready = threading.Event()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def add(self, idf, serial_instance, protocol_factory):
+    """
+    @brief   Add a meter, before the thread is started.
+    @param   idf                A HM meter identifier.
+    @param   serial_instance    Serial port instance (opened) to be used.
+    @param   protocol_factory   A callable that returns a Protocol instance.
+    """
+    self.__port[idf] = [serial_instance, protocol_factory, None]
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def close(self):
+    """
+    @brief   Close all serial ports and exit the receive thread.
+    """
+    self.__ready.wait()
+    try:
+      self.__loop.call_soon_threadsafe(self.__loop.stop)
+    except RuntimeError:
+      pass # loop already closed
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __open(self, idf):
+    """
+    @brief   Create and prepare the protocol of a meter and start watching its serial port.
+    @param   idf   A HM meter identifier.
+    """
+    port    = self.__port[idf]
+    port[2] = port[1]()
+    port[2].prepare()
+    port[2].connection_made(self)
+    self.__loop.add_reader(port[0].fileno(), self.__read, idf)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __drop(self, idf, error):
+    """
+    @brief   Stop watching the serial port of a meter and close it, the other meters are not affected.
+    @param   idf     A HM meter identifier.
+    @param   error   The exception that caused the drop, or None on a regular close.
+    """
+    port = self.__port.pop(idf)
+    self.__loop.remove_reader(port[0].fileno())
+    try:
+      if ( None == error ):
+        port[2].disperse()
+      port[2].connection_lost(error)
+    except Exception:
+      self.__log.log(pyLOG.LogLvl.ERROR, "receiving meter '{}' stopped\n{}".format(idf, traceback.format_exc()))
+    port[0].close()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __read(self, idf):
+    """
+    @brief   Event loop reader callback, reads all available bytes of a serial port and passes them to the protocol.
+    @param   idf   A HM meter identifier.
+    """
+    port = self.__port[idf]
+    try:
+      data = port[0].read(port[0].in_waiting or 1)
+    except (serial.SerialException, OSError) as e:
+      # probably some I/O problem such as disconnected USB serial adapters
+      self.__drop(idf, e)
+      return
+    if ( data ):
+      try:
+        port[2].data_received(data)
+      except Exception as e:
+        self.__drop(idf, e)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def run(self):
+    """
+    @brief   The actual event loop driven by the thread.
+    """
+    self.__loop = asyncio.SelectorEventLoop()
+    asyncio.set_event_loop(self.__loop)
+    self.__ready.set()
+    for idf in list(self.__port):
+      try:
+        self.__open(idf)
+        self.__log.log(pyLOG.LogLvl.INFO, "  receiving meter '{}' started".format(idf))
+      except Exception:
+        self.__port.pop(idf)[0].close()
+        self.__log.log(pyLOG.LogLvl.ERROR, "receiving meter '{}' failed\n{}".format(idf, traceback.format_exc()))
+    try:
+      self.__loop.run_forever()
+    finally:
+      for idf in list(self.__port):
+        self.__drop(idf, None)
+      self.__loop.close()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @property
+  def meters(self):
+    """
+    @brief   The identifiers of the meters still received.
+    """
+    return list(self.__port)
+
+########################################################################################################################
+
+class HM_DatTrc_Channel:
+  """
+  @brief   HM data tracing IPC channel. Sends the data tuples of one meter compactly encoded through the sending end of
+           a multiprocessing pipe; the meter identifier is implied by the pipe, timestamps are passed as integer
+           microseconds and the tuples are serialized by marshal. The encoded data tuples are queued and sent by a
+           thread, so a full pipe, e.g. while the writer process restarts, never blocks the receive thread; data tuples
+           are dropped and counted while the queue is full.
+  """
+
+  EPOCH = datetime.datetime(1970, 1, 1)
+  USEC  = datetime.timedelta(microseconds=1)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, conn, idf=None, cfg=None, qsize=10000):
+    """
+    @brief   Constructor.
+    @param   conn    The sending end of a multiprocessing pipe.
+    @param   idf     A HM meter identifier, labelling the dropped data tuples.
+    @param   cfg     A HM meter configuration, for logging, or None.
+    @param   qsize   The maximum number of queued telegrams.
+    """
+    self.__conn = conn
+    self.__idf  = idf
+    self.__log  = None
+    self.__que  = queue.Queue(max(1, qsize))
+    self.__stop = object()
+    self.__drop = 0       # values dropped since the last queued data tuples
+    self.__mtc  = pyHM_metrics.metrics
+    self.__thd  = threading.Thread(target=self.__run, name="HM_DatTrc_Channel({})".format(idf), daemon=True)
+
+    if ( None != cfg ):
+      self.__log = pyHM_log.HM_Log(cfg["logref"])
+
+    self.__mtc.declare("pyhm_channel_dropped_total", "counter", "Values per meter dropped as the queue to the writer process was full.")
+
+    self.__thd.start()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def encode(cls, rows):
+    """
+    @brief   Encode data tuples.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    @return  The encoded bytes.
+    """
+    return marshal.dumps([((r[0] - cls.EPOCH) // cls.USEC, r[2], r[3], r[4]) for r in rows])
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def decode(cls, idf, data):
+    """
+    @brief   Decode data tuples.
+    @param   idf    The HM meter identifier the bytes were received for.
+    @param   data   The encoded bytes.
+    @return  A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    return [(cls.EPOCH + datetime.timedelta(microseconds=r[0]), idf, r[1], r[2], r[3]) for r in marshal.loads(data)]
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def put(self, rows):
+    """
+    @brief   Queue data tuples for sending, same interface as HM_DatTrc_SqlWriter.put(). Drops the data tuples if the
+             queue is full, logging the first dropped and, once queueing succeeds again, the number of dropped values.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    try:
+      self.__que.put_nowait(self.encode(rows))
+    except queue.Full:
+      self.__mtc.inc("pyhm_channel_dropped_total", len(rows), meter=self.__idf)
+      if ( 0 == self.__drop and None != self.__log ):
+        self.__log.log(pyLOG.LogLvl.ERROR, "queue to the writer process full, dropping values")
+      self.__drop = self.__drop + len(rows)
+    else:
+      if ( 0 != self.__drop and None != self.__log ):
+        self.__log.log(pyLOG.LogLvl.WARNING, "queue to the writer process accepting again, dropped {} values".format(self.__drop))
+      self.__drop = 0
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __run(self):
+    """
+    @brief   The thread function, sends the queued data tuples until stopped.
+    """
+    while ( True ):
+      data = self.__que.get()
+      if ( data is self.__stop ): break
+      self.__conn.send_bytes(data)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def close(self, timeout=10.0):
+    """
+    @brief   Send the queued data tuples and exit the thread, waiting at most the timeout, e.g. if the writer process
+             is down. Data tuples not sent by then are lost with the exiting process.
+    @param   timeout   The time to wait in seconds.
+    @return  whether all queued data tuples were sent.
+    """
+    deadline = time.time() + timeout
+    try:
+      self.__que.put(self.__stop, timeout=timeout)
+    except queue.Full:
+      return False
+    self.__thd.join(max(0.0, deadline - time.time()))
+    return ( False == self.__thd.is_alive() )
+
+########################################################################################################################
+
+class HM_DatTrc_MeterProcess(multiprocessing.Process):
+  """
+  @brief   HM data tracing meter process. Runs the serial receive thread and the SML decoding of one meter and sends
+           the data tuples to the HM_DatTrc_WriterProcess via a HM_DatTrc_Channel.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg, idf, conn, stop):
+    """
+    @brief   Constructor.
+    @param   cfg    HM configuration.
+    @param   idf    A HM meter identifier.
+    @param   conn   The sending end of the meter's multiprocessing pipe.
+    @param   stop   A multiprocessing.Event set to exit the process.
+    """
+    super(HM_DatTrc_MeterProcess, self).__init__(name="HM_DatTrc_MeterProcess({})".format(idf))
+    self.__cfg  = cfg
+    self.__idf  = idf
+    self.__conn = conn
+    self.__stop = stop
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def run(self):
+    """
+    @brief   The actual process function. Exits with 1 if the receive thread died, so the process gets restarted.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if ( hasattr(signal, "SIGUSR1") ):
+      signal.signal(signal.SIGUSR1, trace_handler)
+    if ( "fork" != multiprocessing.get_start_method() ):
+      pyHM_log.LogInit(self.__cfg["general"])
+    try:
+      cfg_meter = self.__cfg["meters"][self.__idf]
+      log       = pyHM_log.HM_Log(cfg_meter["logref"])
+      chn       = HM_DatTrc_Channel(self.__conn, self.__idf, cfg_meter, self.__cfg.get("dattrc", {}).get("writer", {}).get("qsize", 10000))
+      thd       = HM_DatTrc_ReaderThread(HM_DatTrc.port(cfg_meter), HM_DatTrc_SMLPacket(self.__idf, cfg_meter, chn))
+      thd.start()
+      log.log(pyLOG.LogLvl.INFO, "receive process '{}' started (pid {})".format(self.name, os.getpid()))
+      # polled instead of waited on, a process killed while waiting on a multiprocessing.Event blocks its set()
+      while ( False == self.__stop.is_set() ):
+        time.sleep(1.0)
+        if ( False == thd.alive ):
+          log.log(pyLOG.LogLvl.ERROR, "receive thread of process '{}' died".format(self.name))
+          sys.exit(1)
+      thd.close()
+      # within the time the process is given to exit
+      if ( False == chn.close(self.__cfg.get("dattrc", {}).get("process", {}).get("timeout", 10.0) / 2) ):
+        log.log(pyLOG.LogLvl.WARNING, "receive process '{}' could not pass all values to the writer process".format(self.name))
+      log.log(pyLOG.LogLvl.INFO, "receive process '{}' stopped".format(self.name))
+    finally:
+      pyHM_log.LogExit()
+
+########################################################################################################################
+
+class HM_DatTrc_WriterProcess(multiprocessing.Process):
+  """
+  @brief   HM data tracing writer process. Receives the data tuples of all HM_DatTrc_MeterProcess and writes them via one
+           HM_DatTrc_SqlWriter thread per SQL database.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg, conn, stop):
+    """
+    @brief   Constructor.
+    @param   cfg    HM configuration.
+    @param   conn   A dictionary of HM meter identifiers and the receiving ends of their multiprocessing pipes.
+    @param   stop   A multiprocessing.Event set to exit the process, after all pending data tuples have been written.
+    """
+    super(HM_DatTrc_WriterProcess, self).__init__(name="HM_DatTrc_WriterProcess")
+    self.__cfg  = cfg
+    self.__conn = conn
+    self.__stop = stop
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __receive(self, wrt, idf, timeout):
+    """
+    @brief   Receive and queue the data tuples of all pipes ready within the timeout.
+    @param   wrt       A dictionary of HM meter identifiers and their HM_DatTrc_SqlWriter.
+    @param   idf       A dictionary of pipe receiving ends and their HM meter identifiers.
+    @param   timeout   The maximum time to wait for a pipe to become ready, in seconds.
+    @return  The number of received messages.
+    """
+    cnt = 0
+    for conn in multiprocessing.connection.wait(list(idf), timeout):
+      try:
+        data = conn.recv_bytes()
+      except EOFError:
+        del idf[conn]
+        continue
+      wrt[idf[conn]].put(HM_DatTrc_Channel.decode(idf[conn], data))
+      cnt = cnt + 1
+    return cnt
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def run(self):
+    """
+    @brief   The actual process function.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if ( hasattr(signal, "SIGUSR1") ):
+      signal.signal(signal.SIGUSR1, trace_handler)
+    if ( "fork" != multiprocessing.get_start_method() ):
+      pyHM_log.LogInit(self.__cfg["general"])
+    try:
+      log        = pyHM_log.HM_Log(self.__cfg["general"]["logref"])
+      cfg_writer = self.__cfg.get("dattrc", {}).get("writer", {})
+      mtr        = OrderedDict()
+      for idf_meter, cfg_meter in self.__cfg["meters"].items():
+        mtr.setdefault(cfg_meter["sqldb"], OrderedDict())[idf_meter] = cfg_meter
+      wrt = {}
+      for sqldb, cfg_meters in mtr.items():
+        thd = HM_DatTrc_SqlWriter(cfg_meters, cfg_writer)
+        thd.start()
+        for idf_meter in cfg_meters:
+          wrt[idf_meter] = thd
+      idf = {conn:idf_meter for idf_meter, conn in self.__conn.items()}
+      log.log(pyLOG.LogLvl.INFO, "writer process '{}' started (pid {})".format(self.name, os.getpid()))
+      while ( idf and False == self.__stop.is_set() ):
+        self.__receive(wrt, idf, 0.5)
+      while ( idf and 0 != self.__receive(wrt, idf, 0.0) ):
+        pass
+      for thd in set(wrt.values()):
+        thd.close()
+        thd.join()
+      log.log(pyLOG.LogLvl.INFO, "writer process '{}' stopped".format(self.name))
+    finally:
+      pyHM_log.LogExit()
+
+########################################################################################################################
+
 class HM_DatTrc:
   """
   @brief   HM data tracing main class.
   """
 
+  map_bytesize = {5:serial.FIVEBITS, 6:serial.SIXBITS, 7:serial.SEVENBITS, 8:serial.EIGHTBITS}
+  map_stopbits = {1:serial.STOPBITS_ONE, 15:serial.STOPBITS_ONE_POINT_FIVE, 2:serial.STOPBITS_TWO}
+  map_parity   = {"none":serial.PARITY_NONE, "even":serial.PARITY_EVEN, "odd":serial.PARITY_ODD, "mark":serial.PARITY_MARK, "space":serial.PARITY_SPACE}
+
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def __init__(self, cfg):
     """
@@ -439,41 +2078,164 @@ class HM_DatTrc:
     @param   cfg   HM configuration.
     """
     self.__cfg        = cfg
-    self.__log        = pyLOG.Log(self.__cfg["general"]["logref"])
+    self.__log        = pyHM_log.HM_Log(self.__cfg["general"]["logref"])
     self.__thd        = {}
-
-    self.map_bytesize = {5:serial.FIVEBITS, 6:serial.SIXBITS, 7:serial.SEVENBITS, 8:serial.EIGHTBITS}
-    self.map_stopbits = {1:serial.STOPBITS_ONE, 15:serial.STOPBITS_ONE_POINT_FIVE, 2:serial.STOPBITS_TWO}
-    self.map_parity   = {"none":serial.PARITY_NONE, "even":serial.PARITY_EVEN, "odd":serial.PARITY_ODD, "mark":serial.PARITY_MARK, "space":serial.PARITY_SPACE}
+    self.__wrt        = {}
+    self.__prc        = OrderedDict()
+    self.__lck        = threading.Lock()
+    self.__halt       = threading.Event()
+    self.__sup        = None
+    self.__cfgp       = {}
+    self.__aio        = None
+    self.__mtc        = None
 
     self.__log.log_callinfo()
 
+    pyHM_metrics.metrics.declare("pyhm_process_restarts_total", "counter", "Restarts of crashed meter and writer processes.")
+
+    # sidecar listener serving the metrics of this process
+    cfg_metrics = self.__cfg.get("dattrc", {}).get("metrics", {})
+    if ( True == cfg_metrics.get("enable", False) ):
+      try:
+        self.__mtc = pyHM_metrics.HM_Metrics_Server((cfg_metrics.get("address", "127.0.0.1"), cfg_metrics.get("port", 9451)), pyHM_metrics.metrics)
+        self.__mtc.start()
+        self.__log.log(pyLOG.LogLvl.INFO, "metrics listener '{}/{}' started".format(*self.__mtc.server_address[:2]))
+      except Exception:
+        self.__log.log(pyLOG.LogLvl.ERROR, "starting metrics listener failed\n{}".format(traceback.format_exc()))
+
+    cfg_process = self.__cfg.get("dattrc", {}).get("process", {})
+    if ( True == cfg_process.get("enable", False) ):
+      self.__spawn(cfg_process)
+      return
+
+    # one writer thread per SQL database
+    cfg_writer = self.__cfg.get("dattrc", {}).get("writer", {})
+    if ( True == cfg_writer.get("enable", False) ):
+      mtr = OrderedDict()
+      for idf_meter, cfg_meter in self.__cfg["meters"].items():
+        mtr.setdefault(cfg_meter["sqldb"], OrderedDict())[idf_meter] = cfg_meter
+      for sqldb, cfg_meters in mtr.items():
+        self.__wrt[sqldb] = HM_DatTrc_SqlWriter(cfg_meters, cfg_writer)
+        self.__wrt[sqldb].start()
+        self.__log.log(pyLOG.LogLvl.INFO, "writer thread '{}' started".format(self.__wrt[sqldb].name))
+
+    # one event loop thread for all meters, or one receive thread per meter
+    cfg_asyncio = self.__cfg.get("dattrc", {}).get("asyncio", {})
+    if ( True == cfg_asyncio.get("enable", False) ):
+      if ( "posix" == os.name ):
+        self.__aio = HM_DatTrc_AsyncReader(self.__cfg["general"]["logref"])
+      else:
+        self.__log.log(pyLOG.LogLvl.WARNING, "asyncio receiving requires selectable serial ports, using receive threads")
+
     for idf_meter, cfg_meter in self.__cfg["meters"].items():
       self.__log.log(pyLOG.LogLvl.INFO, "configuring meter '{}' started".format(idf_meter))
       try:
-        self.__thd[idf_meter] = HM_DatTrc_ReaderThread(serial.Serial(port    =    cfg_meter["serial"][0],
-                                                                     baudrate=    cfg_meter["serial"][1],
-                                                                     bytesize=self.map_bytesize[cfg_meter["serial"][2]],
-                                                                     parity  =self.map_parity[cfg_meter["serial"][4]],
-                                                                     stopbits=self.map_stopbits[cfg_meter["serial"][3]],
-                                                                     timeout =0),
-                                                       HM_DatTrc_SMLPacket(idf_meter, cfg_meter)
-                                                      )
-        self.__thd[idf_meter].start()
-        for tk,tv in self.__thd.items():
-          self.__log.log(pyLOG.LogLvl.INFO, "  receive thread '{}' started".format(tv))
+        if ( None != self.__aio ):
+          self.__aio.add(idf_meter, self.port(cfg_meter), HM_DatTrc_SMLPacket(idf_meter, cfg_meter, self.__wrt.get(cfg_meter["sqldb"])))
+        else:
+          self.__thd[idf_meter] = HM_DatTrc_ReaderThread(self.port(cfg_meter),
+                                                         HM_DatTrc_SMLPacket(idf_meter, cfg_meter, self.__wrt.get(cfg_meter["sqldb"]))
+                                                        )
+          self.__thd[idf_meter].start()
+          for tk,tv in self.__thd.items():
+            self.__log.log(pyLOG.LogLvl.INFO, "  receive thread '{}' started".format(tv))
         self.__log.log(pyLOG.LogLvl.INFO, "configuring meter '{}' done".format(idf_meter))
       except:
         self.__log.log(pyLOG.LogLvl.ERROR, "configuring meter '{}' failed".format(idf_meter))
         self.__log.log(pyLOG.LogLvl.ERROR, "{}".format(traceback.format_exc()))
 
+    if ( None != self.__aio ):
+      self.__aio.start()
+      self.__log.log(pyLOG.LogLvl.INFO, "receive thread '{}' started".format(self.__aio.name))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def port(cls, cfg_meter):
+    """
+    @brief   Open the serial port of a meter.
+    @param   cfg_meter   A HM meter configuration.
+    @return  The opened serial.Serial instance.
+    """
+    return serial.Serial(port    =    cfg_meter["serial"][0],
+                         baudrate=    cfg_meter["serial"][1],
+                         bytesize=cls.map_bytesize[cfg_meter["serial"][2]],
+                         parity  =cls.map_parity[cfg_meter["serial"][4]],
+                         stopbits=cls.map_stopbits[cfg_meter["serial"][3]],
+                         timeout =0)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __spawn(self, cfg_process):
+    """
+    @brief   Start one HM_DatTrc_MeterProcess per meter, the HM_DatTrc_WriterProcess and the supervisor thread. The pipes
+             are owned by this process, so restarted processes continue to use them.
+    @param   cfg_process   A HM process configuration.
+    """
+    self.__cfgp = cfg_process
+    stop_meter  = multiprocessing.Event()
+    stop_writer = multiprocessing.Event()
+    conn_recv   = OrderedDict()
+    for idf_meter in self.__cfg["meters"]:
+      conn_recv[idf_meter], conn_send = multiprocessing.Pipe(duplex=False)
+      self.__prc[idf_meter] = {"factory":(lambda idf=idf_meter, conn=conn_send: HM_DatTrc_MeterProcess(self.__cfg, idf, conn, stop_meter)),
+                               "stop":stop_meter, "process":None, "started":0.0, "failures":0, "due":0.0}
+    self.__prc["__writer__"] = {"factory":(lambda: HM_DatTrc_WriterProcess(self.__cfg, conn_recv, stop_writer)),
+                                "stop":stop_writer, "process":None, "started":0.0, "failures":0, "due":0.0}
+    # the writer process has to be started first and stopped last
+    self.__prc.move_to_end("__writer__", last=False)
+    self.__supervise_once()
+    self.__sup = threading.Thread(target=self.__supervise, name="HM_DatTrc_Supervisor", daemon=True)
+    self.__sup.start()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __supervise_once(self):
+    """
+    @brief   Start processes that are due and schedule the restart of exited ones. The restart delay doubles per
+             consecutive failure up to the configured backoff and is reset once a process ran longer than the backoff.
+    """
+    with ( self.__lck ):
+      if ( True == self.__halt.is_set() ): return
+      now = time.time()
+      for name, ent in self.__prc.items():
+        prc = ent["process"]
+        if ( None != prc and True == prc.is_alive() ):
+          if ( 0 != ent["failures"] and self.__cfgp.get("backoff", 60.0) < now - ent["started"] ):
+            ent["failures"] = 0
+          continue
+        if ( None != prc ):
+          ent["failures"] = ent["failures"] + 1
+          ent["due"]      = now + min(self.__cfgp.get("restart", 1.0) * 2**(ent["failures"] - 1), self.__cfgp.get("backoff", 60.0))
+          ent["process"]  = None
+          pyHM_metrics.metrics.inc("pyhm_process_restarts_total", process=name)
+          self.__log.log(pyLOG.LogLvl.ERROR, "process '{}' exited with {}, restarting in {:.1f} s".format(prc.name, prc.exitcode, ent["due"] - now))
+        elif ( ent["due"] <= now ):
+          ent["process"] = ent["factory"]()
+          ent["started"] = now
+          try:
+            ent["process"].start()
+            self.__log.log(pyLOG.LogLvl.INFO, "process '{}' started".format(ent["process"].name))
+          except Exception:
+            self.__log.log(pyLOG.LogLvl.ERROR, "starting process '{}' failed\n{}".format(name, traceback.format_exc()))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __supervise(self):
+    """
+    @brief   The supervisor thread function.
+    """
+    while ( False == self.__halt.wait(0.5) ):
+      self.__supervise_once()
+
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def isalive(self):
     """
-    @brief   Returns whether a HM_DatTrc_ReaderThread is running or not.
+    @brief   Returns whether a HM_DatTrc_ReaderThread, a HM_DatTrc_AsyncReader, a HM_DatTrc_SqlWriter or a process is running or not.
     """
+    for tk,tv in self.__prc.items():
+      if ( None != tv["process"] and True == tv["process"].is_alive() ): return True
     for tk,tv in self.__thd.items():
       if ( True == tv.alive ): return True
+    if ( None != self.__aio and True == self.__aio.is_alive() ): return True
+    for tk,tv in self.__wrt.items():
+      if ( True == tv.is_alive() ): return True
     return False
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -487,6 +2249,30 @@ class HM_DatTrc:
       tv.close()
       self.__log.log(pyLOG.LogLvl.INFO, "  receive thread '{}' stopped".format(tv))
       self.__log.log(pyLOG.LogLvl.INFO, "deconfiguring meter '{}' done".format(tk))
+    if ( None != self.__aio ):
+      # stopped before the writer threads, as it disperses the protocols
+      self.__aio.close()
+      self.__aio.join()
+      self.__log.log(pyLOG.LogLvl.INFO, "receive thread '{}' stopped".format(self.__aio.name))
+    for tk,tv in self.__wrt.items():
+      tv.close()
+      self.__log.log(pyLOG.LogLvl.INFO, "writer thread '{}' stopping".format(tv.name))
+    self.__halt.set()
+    with ( self.__lck ):
+      # meter processes first, so their last data tuples reach the writer process
+      for tk,tv in reversed(self.__prc.items()):
+        prc = tv["process"]
+        tv["stop"].set()
+        if ( None == prc ): continue
+        prc.join(self.__cfgp.get("timeout", 10.0))
+        if ( True == prc.is_alive() ):
+          self.__log.log(pyLOG.LogLvl.ERROR, "process '{}' did not exit, terminating".format(prc.name))
+          prc.terminate()
+          prc.join()
+        self.__log.log(pyLOG.LogLvl.INFO, "process '{}' stopped".format(prc.name))
+    if ( None != self.__mtc ):
+      self.__mtc.stop()
+      self.__mtc = None
 
 ########################################################################################################################
 
@@ -498,8 +2284,18 @@ def signal_handler(signal, frame):
   o_dattrc.stop()
   while ( True == o_dattrc.isalive() ):
     time.sleep(0.1)
+  pyHM_log.LogExit()
   os._exit(1)
 
+########################################################################################################################
+
+def trace_handler(signal, frame):
+  """
+  @brief   Application call info tracing handler function, switches the call info tracing of the loggers as
+           configured by 'trace' in the currently saved configuration.
+  """
+  pyHM_log.HM_Log.reload("pyHM.cfg")
+
 ########################################################################################################################
 ########################################################################################################################
 ########################################################################################################################
@@ -507,10 +2303,12 @@ def signal_handler(signal, frame):
 if ( __name__ == '__main__' ):
 
   with ( open("pyHM.cfg", "r") ) as fhdl:
-    cfg = yaml.load(fhdl.read())
+    cfg = yaml.safe_load(fhdl.read())
 
   signal.signal(signal.SIGINT, signal_handler)
-  pyLOG.LogInit(cfg["general"]["logger"])
+  if ( hasattr(signal, "SIGUSR1") ):
+    signal.signal(signal.SIGUSR1, trace_handler)
+  pyHM_log.LogInit(cfg["general"])
   o_dattrc = HM_DatTrc(cfg)
 
   while ( True ):
@@ -0,0 +1,328 @@
+# pyHM
+# Copyright (C) 2017  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+import pyHM_dattrc
+import pyHM_metrics
+import argparse
+import datetime
+import sqlite3
+import sys
+import time
+import yaml
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+def tables(con):
+  """
+  @brief   Return the names of all tables and views of a SQL database.
+  @param   con   The SQL database connection.
+  """
+  return [row[0] for row in con.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view');")]
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def timestamp(text):
+  """
+  @brief   Parse a command line timestamp, e.g. '2017-06-01' or '2017-06-01T12:00:00'.
+  @param   text   The text.
+  """
+  for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+    try   : return datetime.datetime.strptime(text, fmt)
+    except: pass
+  raise argparse.ArgumentTypeError("invalid timestamp '{}'".format(text))
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def cmd_migrate(args):
+  """
+  @brief   Migrate a SQL database from schema version 1 to schema version 2.
+  @param   args   The parsed command line arguments.
+  """
+  con = sqlite3.connect(args.sqldb)
+  tab = tables(con)
+  if ( "m_POINTS" not in tab or "m_TIMESTAMPS" not in tab ):
+    print("'{}' contains no schema version 1 tables".format(args.sqldb))
+    return 1
+  if ( "m_POINTS2" in tab and None != con.execute("SELECT 1 FROM m_POINTS2 LIMIT 1;").fetchone() and not args.force ):
+    print("'{}' already contains schema version 2 points, use --force to merge".format(args.sqldb))
+    return 1
+
+  tstart = time.time()
+  total  = con.execute("SELECT COUNT(*) FROM m_POINTS;").fetchone()[0]
+  for sql in pyHM_dattrc.HM_DatTrc_Sql.TABLES[2]:
+    con.execute(sql)
+  cur = con.execute("""INSERT OR IGNORE INTO m_POINTS2 (pk_meter, pk_obis, ts, pk_unit, value)
+                         SELECT mp.pk_meter, mp.pk_obis, {}, mp.pk_unit, mp.value
+                         FROM m_POINTS mp
+                           INNER JOIN m_TIMESTAMPS mt ON (mp.pk_timestamp = mt.PK);
+                    """.format(pyHM_dattrc.HM_DatTrc_Sql.SQL_MS.format("mt.value")))
+  moved = cur.rowcount
+  for pk, idf in con.execute("SELECT PK, value FROM b_METERS;").fetchall():
+    con.execute("DROP VIEW IF EXISTS v_{};".format(idf))
+    con.execute(pyHM_dattrc.HM_DatTrc_Sql.VIEWS[2].format(idf, pk))
+  if ( args.drop ):
+    con.execute("DROP TABLE m_POINTS;")
+    con.execute("DROP TABLE m_TIMESTAMPS;")
+  con.commit()
+  if ( args.drop ):
+    con.execute("VACUUM;")
+  con.close()
+
+  print("migrated {} of {} points in {:.1f} s, {} points without or with duplicate timestamp skipped".format(moved, total, time.time() - tstart, total - moved))
+  print("set 'sqlver: 2' for all meters and the web server in pyHM.cfg")
+  return 0
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def cmd_rollup(args):
+  """
+  @brief   Rebuild the rollup tables from the stored points.
+  @param   args   The parsed command line arguments.
+  """
+  con = sqlite3.connect(args.sqldb)
+  cur = con.cursor()
+  tab = tables(con)
+  if   ( "m_POINTS2" in tab and 2 == args.sqlver ):
+    src = "SELECT pk_meter, pk_obis, pk_unit, ts, value FROM m_POINTS2;"
+  elif ( "m_POINTS" in tab and 1 == args.sqlver ):
+    src = """SELECT mp.pk_meter, mp.pk_obis, mp.pk_unit, {}, mp.value
+             FROM m_POINTS mp
+               INNER JOIN m_TIMESTAMPS mt ON (mp.pk_timestamp = mt.PK);
+          """.format(pyHM_dattrc.HM_DatTrc_Sql.SQL_MS.format("mt.value"))
+  else:
+    print("'{}' contains no schema version {} points".format(args.sqldb, args.sqlver))
+    return 1
+
+  tstart = time.time()
+  rol    = pyHM_dattrc.HM_DatTrc_Rollup()
+  rol.create(cur)
+  for t in rol.TABLES:
+    cur.execute("DELETE FROM {};".format(t))
+  count  = 0
+  rows   = con.cursor().execute(src)
+  while ( True ):
+    chunk = rows.fetchmany(args.chunk)
+    if ( not chunk ): break
+    for row in chunk:
+      rol.add(*row)
+    count = count + len(chunk)
+    if ( len(rol) >= args.chunk ):
+      rol.flush(cur)
+      print("  {} points".format(count))
+  rol.flush(cur)
+  con.commit()
+  con.close()
+
+  print("rebuilt rollups of {} points in {:.1f} s".format(count, time.time() - tstart))
+  print("set 'rollup: yes' for all meters in pyHM.cfg to maintain them further")
+  return 0
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def cmd_catalog(args):
+  """
+  @brief   Rebuild the catalog of series from the stored points.
+  @param   args   The parsed command line arguments.
+  """
+  con = sqlite3.connect(args.sqldb)
+  cur = con.cursor()
+  tab = tables(con)
+  if ( {1:"m_POINTS", 2:"m_POINTS2"}.get(args.sqlver) not in tab ):
+    print("'{}' contains no schema version {} points".format(args.sqldb, args.sqlver))
+    return 1
+
+  tstart = time.time()
+  pyHM_dattrc.HM_DatTrc_Catalog.create(cur)
+  count  = pyHM_dattrc.HM_DatTrc_Catalog.rebuild(cur, args.sqlver)
+  con.commit()
+  con.close()
+
+  print("rebuilt catalog of {} series in {:.1f} s".format(count, time.time() - tstart))
+  return 0
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def delete_points(sqldb, sqlver, meter, dtfrom, dtuntil):
+  """
+  @brief   Delete the points of a meter within a time range, but the RESET markers, and the timestamps of schema version 1
+           no longer referenced, then rebuild the catalog of series.
+  @param   sqldb     The SQL database file.
+  @param   sqlver    The SQL schema version.
+  @param   meter     The HM meter identifier.
+  @param   dtfrom    The timestamp the range starts at, or None.
+  @param   dtuntil   The timestamp the range ends before, or None.
+  @return  The number of deleted points.
+  """
+  con = sqlite3.connect(sqldb)
+  tab = tables(con)
+  if ( "b_METERS" not in tab or {1:"m_POINTS", 2:"m_POINTS2"}.get(sqlver) not in tab ):
+    con.close()
+    return 0
+  col, fmt = {True:("ts", pyHM_dattrc.HM_DatTrc_Sql.ms), False:("value", datetime.datetime.isoformat)}[2 == sqlver]
+  rng, par = "", []
+  if ( None != dtfrom  ):
+    rng = rng + " AND {} >= ?".format(col)
+    par.append(fmt(dtfrom))
+  if ( None != dtuntil ):
+    rng = rng + " AND {} < ?".format(col)
+    par.append(fmt(dtuntil))
+  cur = con.cursor()
+  if ( 2 == sqlver ):
+    count = cur.execute("DELETE FROM m_POINTS2 WHERE pk_meter IN (SELECT PK FROM b_METERS WHERE value == ?) AND value IS NOT 'RESET'" + rng + ";", [meter] + par).rowcount
+  else:
+    count = cur.execute("DELETE FROM m_POINTS WHERE pk_meter IN (SELECT PK FROM b_METERS WHERE value == ?) AND value IS NOT 'RESET' AND pk_timestamp IN (SELECT PK FROM m_TIMESTAMPS WHERE 1" + rng + ");", [meter] + par).rowcount
+    cur.execute("DELETE FROM m_TIMESTAMPS WHERE PK NOT IN (SELECT pk_timestamp FROM m_POINTS)" + rng + ";", par)
+  pyHM_dattrc.HM_DatTrc_Catalog.create(cur)
+  pyHM_dattrc.HM_DatTrc_Catalog.rebuild(cur, sqlver)
+  con.commit()
+  con.close()
+  return count
+
+########################################################################################################################
+
+class HM_DbTool_Writer:
+  """
+  @brief   HM database tool writer collecting the data tuples of reprocessed packets, in place of a
+           HM_DatTrc_SqlWriter, and inserting them in chunks.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, sql, chunk):
+    """
+    @brief   Constructor.
+    @param   sql     The HM_DatTrc_Sql.
+    @param   chunk   The number of data tuples inserted at once.
+    """
+    self.__sql = sql
+    self.__chk = chunk
+    self.__buf = []
+    self.count = 0
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def put(self, rows):
+    """
+    @brief   Collect data tuples, insert them if a chunk is full.
+    @param   rows   A list of (timestamp, meter, obis, unit, value) data tuples.
+    """
+    self.__buf.extend(rows)
+    if ( len(self.__buf) >= self.__chk ):
+      self.flush()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def flush(self):
+    """
+    @brief   Insert the collected data tuples.
+    """
+    if ( self.__buf ):
+      self.__sql.insert_many(self.__buf)
+      self.count = self.count + len(self.__buf)
+      self.__buf = []
+
+########################################################################################################################
+
+def cmd_reprocess(args):
+  """
+  @brief   Decode the archived SML transport frames of meters received within a time range again and insert their
+           values into the SQL database with their original receive timestamps, e.g. after a decoding bug was fixed.
+  @param   args   The parsed command line arguments.
+  """
+  with ( open(args.cfg, "r") ) as fhdl:
+    cfg = yaml.safe_load(fhdl.read())
+  meters = args.meter or [idf for idf, mcfg in cfg["meters"].items() if "archive" in mcfg]
+  for idf in meters:
+    if ( idf not in cfg["meters"] ):
+      print("unknown meter '{}'".format(idf))
+      return 1
+    if ( None == args.archive and "archive" not in cfg["meters"][idf] ):
+      print("meter '{}' has no archive configured, use --archive".format(idf))
+      return 1
+  if ( not meters ):
+    print("no meter has an archive configured")
+    return 1
+
+  mtc = pyHM_metrics.metrics
+  for idf in meters:
+    mcfg = dict(cfg["meters"][idf])
+    arc  = mcfg.pop("archive", {})
+    loc  = args.archive or arc.get("location", "./archive/")
+    if ( None != args.sqldb ): mcfg["sqldb"] = args.sqldb
+    if ( args.replace ):
+      print("deleted {} points of '{}'".format(delete_points(mcfg["sqldb"], mcfg.get("sqlver", 1), idf, args.dtfrom, args.dtuntil), idf))
+
+    tstart = time.time()
+    sql    = pyHM_dattrc.HM_DatTrc_Sql(idf, mcfg)
+    wrt    = HM_DbTool_Writer(sql, args.chunk)
+    prt    = pyHM_dattrc.HM_DatTrc_SMLPacket(idf, mcfg, wrt)
+    crc    = mcfg.get("crc", True)
+    crcord = mcfg.get("crcorder", "little")
+    count  = 0
+    bad    = 0
+    for ts, frame in pyHM_dattrc.HM_DatTrc_Archive.read(loc, idf, args.dtfrom, args.dtuntil):
+      count = count + 1
+      if ( False == crc or pyHM_dattrc.HM_DatTrc_CRC16.check(frame, crcord) ): prt.handle_packet(frame, ts)
+      else                                                           : bad = bad + 1
+    prt.disperse()
+    wrt.flush()
+    values = wrt.count
+    del prt, wrt, sql
+    tdelta = max(time.time() - tstart, 1e-9)
+
+    print("reprocessed {} frames of '{}' into {} values in {:.1f} s ({:.0f} frames/s), {} with bad CRC, {} failed to decode".format(
+          count, idf, values, tdelta, count / tdelta, bad, mtc.value("pyhm_decode_failures_total", meter=idf)))
+  if ( args.replace ):
+    print("rebuild the rollups, if maintained, by 'pyHM_dbtool.py rollup', they still count the deleted points")
+  return 0
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+if ( __name__ == '__main__' ):
+
+  parser = argparse.ArgumentParser(description="pyHM database maintenance")
+  subpar = parser.add_subparsers(dest="cmd")
+
+  p = subpar.add_parser("migrate", help="migrate from schema version 1 to schema version 2")
+  p.add_argument("--sqldb", default="./pyHM.sqlite", help="SQL database file")
+  p.add_argument("--drop",  action="store_true",     help="drop the schema version 1 tables afterwards")
+  p.add_argument("--force", action="store_true",     help="merge into already existing schema version 2 points")
+  p.set_defaults(func=cmd_migrate)
+
+  p = subpar.add_parser("rollup", help="rebuild the minute, hour and day rollup tables")
+  p.add_argument("--sqldb",  default="./pyHM.sqlite", help="SQL database file")
+  p.add_argument("--sqlver", default=1, type=int,     help="SQL schema version")
+  p.add_argument("--chunk",  default=100000, type=int, help="number of points read and buckets written at once")
+  p.set_defaults(func=cmd_rollup)
+
+  p = subpar.add_parser("catalog", help="rebuild the catalog of series")
+  p.add_argument("--sqldb",  default="./pyHM.sqlite", help="SQL database file")
+  p.add_argument("--sqlver", default=1, type=int,     help="SQL schema version")
+  p.set_defaults(func=cmd_catalog)
+
+  p = subpar.add_parser("reprocess", help="decode archived SML frames again into the SQL database")
+  p.add_argument("--cfg",     default="./pyHM.cfg",   help="configuration file")
+  p.add_argument("--meter",   action="append",        help="meter to reprocess, repeatable, default all meters with an archive")
+  p.add_argument("--from",    dest="dtfrom",  type=timestamp, help="first receive timestamp, e.g. 2017-06-01T12:00:00")
+  p.add_argument("--until",   dest="dtuntil", type=timestamp, help="receive timestamp to stop before")
+  p.add_argument("--archive", default=None,           help="archive directory, default 'location' of the meter archive")
+  p.add_argument("--sqldb",   default=None,           help="SQL database file, default 'sqldb' of the meter")
+  p.add_argument("--replace", action="store_true",    help="delete the stored points of the range first, else already stored points are kept")
+  p.add_argument("--chunk",   default=100000, type=int, help="number of values inserted at once")
+  p.set_defaults(func=cmd_reprocess)
+
+  args = parser.parse_args()
+  if ( not hasattr(args, "func") ):
+    parser.print_help()
+  else:
+    sys.exit(args.func(args))
@@ -0,0 +1,307 @@
+# pyHM
+# Copyright (C) 2017  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+import pyLOG
+import logging, logging.handlers
+import multiprocessing.util
+import queue
+import threading
+import traceback
+import weakref
+import yaml
+
+from collections import OrderedDict
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+class HM_Log(pyLOG.Log):
+  """
+  @brief   pyLOG.Log whose call info tracing is switched per logger at runtime. While switched off, log_callinfo is an
+           instance attribute doing nothing, so the caller neither inspects its frame nor formats a record; while
+           switched on, the instance attribute is removed and pyLOG.Log.log_callinfo is called without a further frame.
+  """
+
+  __trace  = set()               # logger references with call info tracing switched on
+  __insts  = {}                  # logger reference -> weakref.WeakSet of instances
+  __lock   = threading.Lock()
+  __logref = None                # logger reference of the last configured general configuration
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, logref):
+    """
+    @brief   Constructor.
+    @param   logref   A logger reference, e.g. '__LOGGER__WEBSRV__'.
+    """
+    super(HM_Log, self).__init__(logref)
+    with ( HM_Log.__lock ):
+      HM_Log.__insts.setdefault(logref, weakref.WeakSet()).add(self)
+      self.__switch(logref in HM_Log.__trace)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def __nop():
+    """
+    @brief   The log_callinfo of instances with call info tracing switched off.
+    """
+    pass
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __switch(self, enable):
+    """
+    @brief   Switch the call info tracing of this instance.
+    @param   enable   Whether to trace call infos.
+    """
+    if ( enable ): self.__dict__.pop("log_callinfo", None)
+    else         : self.log_callinfo = HM_Log.__nop
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def trace(cls, logref, enable):
+    """
+    @brief   Switch the call info tracing of all present and future instances of a logger.
+    @param   logref   A logger reference.
+    @param   enable   Whether to trace call infos.
+    """
+    with ( cls.__lock ):
+      if ( enable ): cls.__trace.add(logref)
+      else         : cls.__trace.discard(logref)
+      for inst in list(cls.__insts.get(logref, ())):
+        inst.__switch(enable)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def configure(cls, cfg_general):
+    """
+    @brief   Switch the call info tracing on for the loggers listed by 'trace' and off for all others.
+    @param   cfg_general   A HM general configuration.
+    """
+    trace = set(cfg_general.get("trace", None) or [])
+    for logref in set(cls.__insts) | cls.__trace | trace:
+      cls.trace(logref, logref in trace)
+    cls.__logref = cfg_general.get("logref", cls.__logref)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def reload(cls, fname):
+    """
+    @brief   Switch the call info tracing as configured by 'trace' in a saved configuration file, see configure. Called
+             by signal handlers, so errors of reading the file are logged by the general logger instead of raised.
+    @param   fname   The configuration file name, e.g. 'pyHM.cfg'.
+    """
+    try:
+      with ( open(fname, "r") ) as fhdl:
+        cls.configure(yaml.safe_load(fhdl.read())["general"])
+    except Exception:
+      if ( None != cls.__logref ):
+        HM_Log(cls.__logref).log(pyLOG.LogLvl.ERROR, "reloading the call info tracing from '{}' failed\n{}".format(fname, traceback.format_exc()))
+
+########################################################################################################################
+
+class HM_Log_QueueHandler(logging.handlers.QueueHandler):
+  """
+  @brief   Logging queue handler passing the records of a logger unformatted, together with the logger name, to the
+           queue of a HM_Log_Queue. If the queue is full, records are dropped and counted instead of waiting.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, que, name):
+    """
+    @brief   Constructor.
+    @param   que    The queue.Queue.
+    @param   name   The name of the logger whose handlers shall handle the records.
+    """
+    super(HM_Log_QueueHandler, self).__init__(que)
+    self.logger  = name
+    self.dropped = 0
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def prepare(self, record):
+    """
+    @brief   Pass the record unformatted, the handlers of the logger format it by the background thread.
+    @param   record   The logging.LogRecord.
+    """
+    return record
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def enqueue(self, record):
+    """
+    @brief   Queue a record, or drop and count it if the queue is full.
+    @param   record   The logging.LogRecord.
+    """
+    try:
+      self.queue.put_nowait((self.logger, record))
+    except queue.Full:
+      self.dropped = self.dropped + 1
+
+########################################################################################################################
+
+class HM_Log_QueueListener(logging.handlers.QueueListener):
+  """
+  @brief   Logging queue listener passing the queued records of HM_Log_QueueHandler to the handlers of their logger and
+           reporting the records dropped by the queue handlers once the queue ran empty.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, que, hdl, qhd):
+    """
+    @brief   Constructor.
+    @param   que   The queue.Queue.
+    @param   hdl   A dictionary of logger names and their handlers.
+    @param   qhd   The list of HM_Log_QueueHandler queueing the records.
+    """
+    super(HM_Log_QueueListener, self).__init__(que)
+    self.__hdl = hdl
+    self.__qhd = qhd
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __dispatch(self, name, record):
+    """
+    @brief   Pass a record to the handlers of a logger.
+    @param   name     The name of the logger.
+    @param   record   The logging.LogRecord.
+    """
+    for h in self.__hdl.get(name, []):
+      if ( record.levelno >= h.level ):
+        h.handle(record)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def handle(self, item):
+    """
+    @brief   Handle a queued record.
+    @param   item   The (logger name, logging.LogRecord) tuple.
+    """
+    self.__dispatch(*item)
+    if ( self.queue.empty() ):
+      self.report()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def report(self):
+    """
+    @brief   Report the records dropped by each queue handler since the last report to the handlers of its logger.
+    """
+    for q in self.__qhd:
+      if ( 0 != q.dropped ):
+        drop, q.dropped = q.dropped, 0
+        self.__dispatch(q.logger, logging.makeLogRecord({"name":q.logger, "levelno":logging.WARNING, "levelname":"WARNING",
+                                                         "msg":"log queue full, dropped {} records".format(drop)}))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def enqueue_sentinel(self):
+    """
+    @brief   Queue the sentinel exiting the thread, waiting for space if the queue is full.
+    """
+    self.queue.put(self._sentinel)
+
+########################################################################################################################
+
+class HM_Log_Queue(object):
+  """
+  @brief   Queued logging. The handlers configured for the loggers are replaced by a HM_Log_QueueHandler each and called
+           by the thread of a HM_Log_QueueListener, so formatting and I/O never block the logging thread. Children forked
+           by multiprocessing get a queue and thread of their own.
+  """
+
+  instance = None
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg_general):
+    """
+    @brief   Constructor, moves the handlers of the root logger and of the loggers configured by 'logger'.
+    @param   cfg_general   A HM general configuration.
+    """
+    self.__size = cfg_general.get("logqueue", {}).get("qsize", 10000)
+    self.__que  = queue.Queue(self.__size)
+    self.__hdl  = OrderedDict()   # logger name -> handlers
+    self.__qhd  = []
+    self.__run  = False
+    for name in [None] + list(cfg_general["logger"].get("loggers", {})):
+      lgr = logging.getLogger(name)
+      hdl = list(lgr.handlers)
+      if ( not hdl ): continue
+      self.__hdl[lgr.name] = hdl
+      for h in hdl:
+        lgr.removeHandler(h)
+      self.__qhd.append(HM_Log_QueueHandler(self.__que, lgr.name))
+      lgr.addHandler(self.__qhd[-1])
+    self.__lsn  = HM_Log_QueueListener(self.__que, self.__hdl, self.__qhd)
+    multiprocessing.util.register_after_fork(self, HM_Log_Queue.__forked)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __forked(self):
+    """
+    @brief   Replace the queue and the listener inherited by a forked child, the parent's thread does not exist in it.
+    """
+    self.__que = queue.Queue(self.__size)
+    for q in self.__qhd:
+      q.queue   = self.__que
+      q.dropped = 0
+    self.__lsn = HM_Log_QueueListener(self.__que, self.__hdl, self.__qhd)
+    if ( True == self.__run ):
+      self.__lsn.start()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def start(self):
+    """
+    @brief   Start the thread.
+    """
+    self.__lsn.start()
+    self.__run = True
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def close(self):
+    """
+    @brief   Handle all queued records, exit the thread and give the handlers back to their loggers.
+    """
+    if ( True == self.__run ):
+      self.__lsn.stop()
+      self.__run = False
+    self.__lsn.report()
+    for name, hdl in self.__hdl.items():
+      lgr = logging.getLogger({True:None, False:name}["root" == name])
+      for h in list(lgr.handlers):
+        if ( isinstance(h, HM_Log_QueueHandler) ): lgr.removeHandler(h)
+      for h in hdl:
+        lgr.addHandler(h)
+        h.flush()
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+def LogInit(cfg_general):
+  """
+  @brief   Configure the logging by pyLOG.LogInit, switch the call info tracing per logger and start the queued logging
+           if enabled by 'logqueue'.
+  @param   cfg_general   A HM general configuration.
+  """
+  pyLOG.LogInit(cfg_general["logger"])
+  HM_Log.configure(cfg_general)
+  if ( True == cfg_general.get("logqueue", {}).get("enable", False) ):
+    HM_Log_Queue.instance = HM_Log_Queue(cfg_general)
+    HM_Log_Queue.instance.start()
+
+########################################################################################################################
+
+def LogExit():
+  """
+  @brief   Stop the queued logging, if started, after all queued records have been handled.
+  """
+  if ( None != HM_Log_Queue.instance ):
+    HM_Log_Queue.instance.close()
+    HM_Log_Queue.instance = None
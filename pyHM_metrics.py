@@ -0,0 +1,235 @@
+# pyHM
+# Copyright (C) 2017  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+import bisect
+import http.server
+import math
+import socketserver
+import threading
+
+from collections import OrderedDict
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+class HM_Metrics:
+  """
+  @brief   HM metrics registry of counters, gauges and histograms rendered in the Prometheus text exposition format.
+           A metric family is declared once by name, type and help text; its samples are distinguished by labels.
+           All methods are thread safe.
+  """
+
+  CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+  BUCKETS      = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self):
+    """
+    @brief   Constructor.
+    """
+    self.__lck = threading.Lock()
+    self.__fam = OrderedDict()   # name -> {"type", "help", "buckets", "samples":{labels:value}}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def declare(self, name, type, help, buckets=None):
+    """
+    @brief   Declare a metric family, a further declaration of the same name is ignored.
+    @param   name      The metric name, e.g. 'pyhm_telegrams_total'.
+    @param   type      The metric type, 'counter', 'gauge' or 'histogram'.
+    @param   help      The help text.
+    @param   buckets   The ascending upper bounds of a histogram, BUCKETS if None.
+    """
+    with ( self.__lck ):
+      if ( name not in self.__fam ):
+        self.__fam[name] = {"type":type, "help":help, "buckets":tuple(buckets or self.BUCKETS), "samples":OrderedDict()}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def inc(self, name, value=1, **labels):
+    """
+    @brief   Increase a counter or gauge.
+    @param   name     The metric name.
+    @param   value    The increment.
+    @param   labels   The labels of the sample.
+    """
+    key = tuple(sorted(labels.items()))
+    with ( self.__lck ):
+      smp      = self.__fam[name]["samples"]
+      smp[key] = smp.get(key, 0) + value
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def set(self, name, value, **labels):
+    """
+    @brief   Set a gauge.
+    @param   name     The metric name.
+    @param   value    The value.
+    @param   labels   The labels of the sample.
+    """
+    key = tuple(sorted(labels.items()))
+    with ( self.__lck ):
+      self.__fam[name]["samples"][key] = value
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def observe(self, name, value, **labels):
+    """
+    @brief   Add an observation to a histogram.
+    @param   name     The metric name.
+    @param   value    The observed value, e.g. a latency in seconds.
+    @param   labels   The labels of the sample.
+    """
+    key = tuple(sorted(labels.items()))
+    with ( self.__lck ):
+      fam = self.__fam[name]
+      smp = fam["samples"].get(key)
+      if ( None == smp ):
+        # counts per bucket plus +Inf, then sum
+        smp = fam["samples"][key] = [0] * (len(fam["buckets"]) + 1) + [0.0]
+      smp[bisect.bisect_left(fam["buckets"], value)] += 1
+      smp[-1] = smp[-1] + value
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def value(self, name, **labels):
+    """
+    @brief   Returns the value of a counter or gauge sample, or the observation count of a histogram sample.
+    @param   name     The metric name.
+    @param   labels   The labels of the sample.
+    """
+    with ( self.__lck ):
+      fam = self.__fam.get(name)
+      if ( None == fam ): return 0
+      smp = fam["samples"].get(tuple(sorted(labels.items())))
+      if ( None == smp ): return 0
+      if ( "histogram" == fam["type"] ): return sum(smp[:-1])
+      return smp
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def __number(value):
+    """
+    @brief   Format a sample value.
+    @param   value   The value.
+    """
+    if ( isinstance(value, float) ):
+      if ( math.isinf(value) ): return {True:"+Inf", False:"-Inf"}[0 < value]
+      if ( math.isnan(value) ): return "NaN"
+      return repr(value)
+    return str(value)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def __labels(labels):
+    """
+    @brief   Format the labels of a sample, e.g. '{meter="1ESY1160123456"}'.
+    @param   labels   A tuple of (label, value) tuples.
+    """
+    if ( not labels ): return ""
+    return "{" + ",".join(['{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")) for k,v in labels]) + "}"
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def render(self):
+    """
+    @brief   Render all metric families in the Prometheus text exposition format.
+    @return  the exposition as bytes.
+    """
+    lines = []
+    with ( self.__lck ):
+      for name, fam in self.__fam.items():
+        lines.append("# HELP {} {}".format(name, fam["help"].replace("\\", "\\\\").replace("\n", "\\n")))
+        lines.append("# TYPE {} {}".format(name, fam["type"]))
+        for key, smp in fam["samples"].items():
+          if ( "histogram" == fam["type"] ):
+            cnt = 0
+            for le, n in zip(fam["buckets"] + (float("inf"),), smp[:-1]):
+              cnt = cnt + n
+              lines.append("{}_bucket{} {}".format(name, self.__labels(key + (("le", self.__number(float(le))),)), cnt))
+            lines.append("{}_sum{} {}".format(name, self.__labels(key), self.__number(float(smp[-1]))))
+            lines.append("{}_count{} {}".format(name, self.__labels(key), cnt))
+          else:
+            lines.append("{}{} {}".format(name, self.__labels(key), self.__number(smp)))
+    return bytes("\n".join(lines) + "\n", "utf8")
+
+########################################################################################################################
+
+class HM_Metrics_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+  """
+  @brief   HM metrics HTTP request handler serving the exposition of a HM_Metrics registry at '/metrics'.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def do_GET(self):
+    """
+    @brief   Handler for GET requests.
+    """
+    if ( "/metrics" != self.path.split("?")[0] ):
+      self.send_error(404)
+      return
+    body = self.server.metrics.render()
+    self.send_response(200)
+    self.send_header('Content-type', HM_Metrics.CONTENT_TYPE)
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def log_message(self, format, *args):
+    """
+    @brief   Suppress the access log of the scrapes.
+    """
+    pass
+
+########################################################################################################################
+
+class HM_Metrics_Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+  """
+  @brief   HM metrics sidecar listener, a plain HTTP server serving a HM_Metrics registry by a daemon thread.
+  """
+
+  daemon_threads = True
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, server_address, metrics):
+    """
+    @brief   Constructor.
+    @param   server_address   The (address, port) tuple to listen on.
+    @param   metrics          The HM_Metrics registry.
+    """
+    super(HM_Metrics_Server, self).__init__(server_address, HM_Metrics_HTTPRequestHandler)
+    self.metrics = metrics
+    self.__thd   = threading.Thread(target=self.serve_forever, name="HM_Metrics_Server", daemon=True)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def start(self):
+    """
+    @brief   Start serving.
+    """
+    self.__thd.start()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def stop(self):
+    """
+    @brief   Stop serving and close the listening socket.
+    """
+    if ( self.__thd.is_alive() ):
+      self.shutdown()
+      self.__thd.join()
+    self.server_close()
+
+########################################################################################################################
+
+# the registry of the running process
+metrics = HM_Metrics()
@@ -17,28 +17,129 @@
 
 import pyLOG
 import pyOBIS
+import pyHM_log
+import pyHM_metrics
+import array
+import asyncio
+import concurrent.futures
 import datetime
+import email.utils
 import http.server
+import io
+import json
 import os
+import queue
 import random
 import signal
+import socket
 import ssl
 import sqlite3
+import struct
 import sys
+import tempfile
 import threading
 import traceback
 import time
 import yaml
 import urllib.parse
 import pprint
+import zlib
+from collections import OrderedDict
 
 ########################################################################################################################
 ########################################################################################################################
 ########################################################################################################################
 
-class HM_WebSrv_Sql:
+class HM_WebSrv_LTTB:
   """
-  @brief   HM web server SQL access class.
+  @brief   HM web server streaming Largest-Triangle-Three-Buckets downsampling of one series. The time range is split
+           into equally sized buckets and of each bucket the point spanning the largest triangle with the point selected
+           of the previous bucket and the average of the next bucket is kept. Only two buckets are held in memory.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, t0, t1, npt):
+    """
+    @brief   Constructor.
+    @param   t0    start of the time range in milliseconds.
+    @param   t1    end of the time range in milliseconds.
+    @param   npt   number of points.
+    """
+    self.__t0  = t0
+    self.__wdt = max(1, (t1 - t0) // max(1, npt - 2) + 1)
+    self.__sel = None   # point selected of the previous bucket
+    self.__pnd = []     # points of the bucket awaiting selection
+    self.__cur = []     # points of the bucket being filled
+    self.__bkt = None   # index of the bucket being filled
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __select(self, nxt):
+    """
+    @brief   Select the point of the bucket awaiting selection.
+    @param   nxt   the points of the next bucket.
+    @return  a list of the selected point or an empty list.
+    """
+    if ( not self.__pnd ):
+      return []
+    cx  = sum([p[0] for p in nxt]) / len(nxt)
+    cy  = sum([p[2] for p in nxt]) / len(nxt)
+    ax  = self.__sel[0]
+    ay  = self.__sel[2]
+    sel = max(self.__pnd, key=lambda p: abs((ax - cx) * (p[2] - ay) - (ax - p[0]) * (cy - ay)))
+    self.__sel = sel
+    self.__pnd = []
+    return [sel]
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def feed(self, ts, x, y, u):
+    """
+    @brief   Feed the next point of the series; non-numeric values are passed through.
+    @param   ts   timestamp in milliseconds.
+    @param   x    timestamp.
+    @param   y    value.
+    @param   u    unit.
+    @return  a list of (ts, x, y, u) of the points selected so far.
+    """
+    if ( not isinstance(y, (int, float)) ):
+      return [(ts, x, y, u)]
+    pnt = (ts, x, y, u)
+    if ( None == self.__sel ):
+      # the first point is always kept
+      self.__sel = pnt
+      return [pnt]
+    out = []
+    bkt = (ts - self.__t0) // self.__wdt
+    if ( bkt != self.__bkt and self.__cur ):
+      out = self.__select(self.__cur)
+      self.__pnd = self.__cur
+      self.__cur = []
+    self.__bkt = bkt
+    self.__cur.append(pnt)
+    return out
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def finish(self):
+    """
+    @brief   Finish the series; the last point is always kept.
+    @return  a list of (ts, x, y, u) of the remaining selected points.
+    """
+    if ( not self.__cur ):
+      return []
+    out = self.__select(self.__cur[-1:])
+    if ( 1 < len(self.__cur) ):
+      self.__pnd = self.__cur[:-1]
+      out = out + self.__select(self.__cur[-1:])
+    out.append(self.__cur[-1])
+    self.__cur = []
+    return out
+
+########################################################################################################################
+
+class HM_WebSrv_Cache:
+  """
+  @brief   HM web server LRU cache of extracted series shared by the request handlers. An entry whose time range ended
+           before the last stored timestamp when it was extracted is immutable; other entries expire after a time to
+           live. The least recently used entries are evicted to keep the estimated memory usage within a budget.
   """
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -47,17 +148,125 @@ class HM_WebSrv_Sql:
     @brief   Constructor.
     @param   cfg   A HM web server configuration.
     """
+    self.__cfg = cfg
+    self.__log = pyHM_log.HM_Log(self.__cfg["logref"])
+    self.__lck = threading.Lock()
+    self.__ent = OrderedDict()
+    self.budget = int(self.__cfg.get("cache", 32) * 1024 * 1024)
+    self.ttl    = self.__cfg.get("cachettl", 10.0)
+    self.stats  = {"hits":0, "misses":0, "merges":0, "evictions":0, "entries":0, "bytes":0}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @classmethod
+  def create(cls, cfg):
+    """
+    @brief   Return a cache as configured by 'cache', or None if caching is disabled by a budget of 0.
+    @param   cfg   A HM web server configuration.
+    """
+    if ( 0 >= cfg.get("cache", 32) ): return None
+    return cls(cfg)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def sizeof(dat):
+    """
+    @brief   Return the estimated memory usage of a {"t":[...], "x":[...], "y":[...], "u":[...]} series chunk.
+    @param   dat   The series chunk.
+    """
+    if ( not dat["x"] ): return 256
+    return 256 + len(dat["x"]) * (4*8 + 32 + 24 + sys.getsizeof(dat["x"][0]))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def get(self, key):
+    """
+    @brief   Return the entry of a key as dictionary {"data":..., "done":..., "time":..., "size":...}, or None if not
+             cached or expired, and count the hit or miss.
+    @param   key   The key.
+    """
+    with self.__lck:
+      ent = self.__ent.get(key)
+      if ( None != ent and not ent["done"] and self.ttl < time.time() - ent["time"] ):
+        ent = None
+      if ( None != ent ):
+        self.__ent.move_to_end(key)
+      self.stats[{True:"misses", False:"hits"}[None == ent]] += 1
+      if ( 0 == (self.stats["hits"] + self.stats["misses"]) % 100 ):
+        self.__log.log(pyLOG.LogLvl.INFO, "Series cache {}".format(self.stats))
+      return ent
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def peek(self, key):
+    """
+    @brief   Return the entry of a key even if expired, or None, without counting it.
+    @param   key   The key.
+    """
+    with self.__lck:
+      return self.__ent.get(key)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def put(self, key, data, done, merged=False, phase=None):
+    """
+    @brief   Store the series of a key and evict the least recently used entries exceeding the memory budget.
+    @param   key      The key.
+    @param   data     The dictionary of OBIS codes and {"t":[...], "x":[...], "y":[...], "u":[...]}.
+    @param   done     Whether the series are immutable.
+    @param   merged   Whether the series were merged from a cached entry and its re-extracted tail.
+    @param   phase    The every nth point phase of the series to merge the tail with, see HM_WebSrv_Sql.__query, or
+                      None if the series cannot be merged.
+    """
+    ent = {"data":data, "done":done, "time":time.time(), "size":sum([self.sizeof(v) for v in data.values()]), "phase":phase}
+    if ( ent["size"] > self.budget ):
+      return
+    with self.__lck:
+      if ( key in self.__ent ):
+        self.stats["bytes"] -= self.__ent.pop(key)["size"]
+      self.__ent[key] = ent
+      self.stats["bytes"] += ent["size"]
+      self.stats["merges"] += int(merged)
+      while ( self.stats["bytes"] > self.budget ):
+        self.stats["bytes"] -= self.__ent.popitem(last=False)[1]["size"]
+        self.stats["evictions"] += 1
+      self.stats["entries"] = len(self.__ent)
+
+########################################################################################################################
+
+class HM_WebSrv_Sql:
+  """
+  @brief   HM web server SQL access class.
+  """
+
+  ROLLUPS = [("r_DAYS", 86400000), ("r_HOURS", 3600000), ("r_MINUTES", 60000)]
+  SQL_MS  = "CAST(ROUND((julianday({}) - 2440587.5) * 86400000.0) AS INTEGER)"
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg, cache=None):
+    """
+    @brief   Constructor.
+    @param   cfg     A HM web server configuration.
+    @param   cache   A HM_WebSrv_Cache of extracted series or None.
+    """
     self.__cfg                 = cfg
-    self.__log                 = pyLOG.Log(self.__cfg["logref"])
-    self.__sql_con             = sqlite3.connect(self.__cfg["sqldb"])
+    self.__log                 = pyHM_log.HM_Log(self.__cfg["logref"])
+    self.__cache               = cache
+    if ( self.__cfg.get("readonly", False) ):
+      self.__sql_con           = sqlite3.connect("file:{}?mode=ro".format(urllib.parse.quote(self.__cfg["sqldb"])), uri=True)
+    else:
+      self.__sql_con           = sqlite3.connect(self.__cfg["sqldb"])
     self.__sql_con.row_factory = sqlite3.Row
     self.__sql_cur             = self.__sql_con.cursor()
     self.__tab_meters          = dict()
     self.__tab_units           = dict()
     self.__tab_obis            = dict()
     self.__tab_obisunits       = dict()
+    self.__tab_series          = dict()
+    self.__chg                 = None
+    self.__ver                 = self.__cfg.get("sqlver", 1)
+    self.__rollups             = []
+    self.__mtc                 = pyHM_metrics.metrics
 
     self.__log.log_callinfo()
+    self.__mtc.declare("pyhm_extract_points", "histogram", "Points per meter returned by an extraction.", buckets=(10, 100, 1000, 10000, 100000, 1000000))
+    self.__mtc.declare("pyhm_extract_duration_seconds", "histogram", "Duration per meter of an extraction, including the streaming of its chunks.")
     self.update()
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -71,60 +280,423 @@ class HM_WebSrv_Sql:
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def update(self):
     """
-    @brief   Update lists of basic informations.
+    @brief   Update lists of basic informations and the catalog of series, if the change counter of the catalog changed
+             or the SQL database has no catalog.
     """
     self.__log.log_callinfo()
+    try:
+      self.__sql_cur.execute("SELECT counter FROM c_CHANGES WHERE PK == 1;")
+      chg = self.__sql_cur.fetchone()["counter"]
+    except:
+      chg = None
+    if ( None != chg and chg == self.__chg ):
+      return
+    # rollup tables, coarsest resolution first
+    self.__sql_cur.execute("SELECT name FROM sqlite_master WHERE type == 'table';")
+    tables = [row["name"] for row in self.__sql_cur.fetchall()]
+    self.__rollups = [(k,v) for k,v in self.ROLLUPS if k in tables]
     # read basic tables
     # - meters
     self.__sql_cur.execute("SELECT * FROM b_METERS;")
     for i, row in enumerate(self.__sql_cur.fetchall()):
-      self.__tab_meters[row["value"]] = {"key":i, "dsc":row["description"]}
+      self.__tab_meters[row["value"]] = {"key":row["PK"], "dsc":row["description"]}
     # - units
     self.__sql_cur.execute("SELECT * FROM b_UNITS;")
     for i, row in enumerate(self.__sql_cur.fetchall()):
-      self.__tab_units[row["value"]] = {"key":i, "dsc":row["description"].decode("ascii", "ignore")}
+      self.__tab_units[row["value"]] = {"key":row["PK"], "dsc":row["description"].decode("ascii", "ignore")}
     # - obis
     self.__sql_cur.execute("SELECT * FROM b_OBIS;")
     for i, row in enumerate(self.__sql_cur.fetchall()):
-      self.__tab_obis[row["value"]] = {"key":i, "dsc":row["description"].decode("ascii", "ignore")}
-    for k,v in self.__tab_obis.items():
-      self.__sql_cur.execute("SELECT DISTINCT description FROM m_POINTS INNER JOIN b_UNITS ON (b_UNITS.PK=m_POINTS.pk_unit) WHERE m_POINTS.pk_obis == {};".format(v["key"]))
-      self.__tab_obis[k]["unit"] = "---"
-      for i, row in enumerate(self.__sql_cur.fetchall()):
-        if   i == 0: self.__tab_obis[k]["unit"] = row["description"].decode("ascii", "ignore")
-        else       : self.__log.log(pyLOG.LogLvl.ERROR, "Multiple units found for OBIS ''{}.".format(k))
+      self.__tab_obis[row["value"]] = {"key":row["PK"], "dsc":row["description"].decode("ascii", "ignore"), "unit":"---"}
+    # - series
+    if ( None != chg ):
+      self.__sql_cur.execute("""SELECT bm.value AS meter, bo.value AS obis, bu.description AS unit, cs.tfirst AS tfirst, cs.tlast AS tlast, cs.count AS count
+                                FROM c_SERIES cs
+                                  INNER JOIN b_METERS bm ON (cs.pk_meter = bm.PK)
+                                  INNER JOIN b_OBIS   bo ON (cs.pk_obis  = bo.PK)
+                                  INNER JOIN b_UNITS  bu ON (cs.pk_unit  = bu.PK);
+                             """)
+      self.__tab_series.clear()
+      units = {}
+      for row in self.__sql_cur.fetchall():
+        self.__tab_series[(row["meter"], row["obis"])] = {"unit":row["unit"].decode("ascii", "ignore"), "tfirst":row["tfirst"], "tlast":row["tlast"], "count":row["count"]}
+        units.setdefault(row["obis"], set()).add(self.__tab_series[(row["meter"], row["obis"])]["unit"])
+      for k,v in units.items():
+        if ( k not in self.__tab_obis ): continue
+        self.__tab_obis[k]["unit"] = sorted(v)[0]
+        if ( 1 < len(v) ): self.__log.log(pyLOG.LogLvl.ERROR, "Multiple units found for OBIS ''{}.".format(k))
+    else:
+      for k,v in self.__tab_obis.items():
+        self.__sql_cur.execute("SELECT DISTINCT description FROM {tab} INNER JOIN b_UNITS ON (b_UNITS.PK={tab}.pk_unit) WHERE {tab}.pk_obis == {};".format(v["key"], tab={1:"m_POINTS", 2:"m_POINTS2"}[self.__ver]))
+        for i, row in enumerate(self.__sql_cur.fetchall()):
+          if   i == 0: self.__tab_obis[k]["unit"] = row["description"].decode("ascii", "ignore")
+          else       : self.__log.log(pyLOG.LogLvl.ERROR, "Multiple units found for OBIS ''{}.".format(k))
+    self.__chg = chg
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  @staticmethod
+  def ms(timestamp):
+    """
+    @brief   Return an ISO timestamp as integer milliseconds since 1970-01-01T00:00:00.
+    @param   timestamp   The ISO timestamp.
+    """
+    try   : ts = datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%f")
+    except: ts = datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S")
+    return (ts - datetime.datetime(1970, 1, 1)) // datetime.timedelta(milliseconds=1)
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def extract(self, meter, dtf, dtu, enp, obis=[]):
+  def rollup(self, dtf, dtu, npt):
     """
-    @brief   Insert a data tuple into SQL database.
-    @param   dtf   datetime from
+    @brief   Return the coarsest rollup table still providing a number of points within a time range, or None.
+    @param   dtf   datetime from.
     @param   dtu   datetime until.
-    @param   enp   every nth point.
+    @param   npt   number of points.
+    """
+    if ( None == npt or 0 >= npt ):
+      return None
+    span = self.ms(dtu) - self.ms(dtf)
+    for tab, res in self.__rollups:
+      if ( span // res >= npt ):
+        return tab
+    return None
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __source(self, meter, dtf, dtu, obis, npt):
+    """
+    @brief   Return the SQL FROM and WHERE clauses, their parameters and the column expressions of the points, or of
+             the coarsest rollup buckets still providing a number of points, of a meter within a time range.
+    @param   meter   meter.
+    @param   dtf     datetime from.
+    @param   dtu     datetime until.
+    @param   obis    list of OBIS codes.
+    @param   npt     number of points per OBIS code or None.
+    """
+    tab = self.rollup(dtf, dtu, npt)
+    obs = ",".join(["?"]*len(obis))
+    if ( None != tab ):
+      return {"obis":"bo.value", "unit":"bu.value", "ts":"r.bucket", "val":"r.vsum/r.vcnt", "min":"r.vmin", "max":"r.vmax",
+              "x"   :"strftime('%Y-%m-%dT%H:%M:%f', r.bucket/1000.0, 'unixepoch')",
+              "sql" :"""FROM {tab} r
+                          INNER JOIN b_OBIS  bo ON (r.pk_obis = bo.PK)
+                          INNER JOIN b_UNITS bu ON (r.pk_unit = bu.PK)
+                        WHERE r.pk_meter == (SELECT PK FROM b_METERS WHERE value == ?)
+                          AND r.pk_obis IN (SELECT PK FROM b_OBIS WHERE value IN ({obs}))
+                          AND r.bucket BETWEEN {ms} AND {ms}""".format(tab=tab, obs=obs, ms=self.SQL_MS.format("?")),
+              "par" :[meter] + [int(o) for o in obis] + [dtf, dtu]}
+    elif ( 2 == self.__ver ):
+      # seek the (meter, obis, ts) primary key of each requested OBIS code instead of scanning the view
+      return {"obis":"bo.value", "unit":"bu.value", "ts":"mp.ts", "val":"mp.value", "min":"mp.value", "max":"mp.value",
+              "x"   :"strftime('%Y-%m-%dT%H:%M:%f', mp.ts/1000.0, 'unixepoch')",
+              "sql" :"""FROM m_POINTS2 mp
+                          INNER JOIN b_OBIS  bo ON (mp.pk_obis = bo.PK)
+                          INNER JOIN b_UNITS bu ON (mp.pk_unit = bu.PK)
+                        WHERE mp.pk_meter == (SELECT PK FROM b_METERS WHERE value == ?)
+                          AND mp.pk_obis IN (SELECT PK FROM b_OBIS WHERE value IN ({obs}))
+                          AND mp.ts BETWEEN {ms} AND {ms}""".format(obs=obs, ms=self.SQL_MS.format("?")),
+              "par" :[meter] + [int(o) for o in obis] + [dtf, dtu]}
+    else:
+      return {"obis":"v.obis", "unit":"v.unit", "ts":self.SQL_MS.format("v.timestamp"), "val":"v.value", "min":"v.value", "max":"v.value",
+              "x"   :"v.timestamp",
+              "sql" :"FROM v_{} v WHERE (v.timestamp BETWEEN ? AND ?) AND (v.obis IN ({}))".format(meter, obs),
+              "par" :[dtf, dtu] + [int(o) for o in obis]}
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def extract_iter(self, meter, dtf, dtu, enp, obis=[], npt=None, dsm=None, size=1000):
+    """
+    @brief   Extract the points of a meter within a time range chunk by chunk, see __extract_iter. The number of points
+             and the duration of each completed extraction are recorded as metrics.
+    @param   dtf    datetime from
+    @param   dtu    datetime until.
+    @param   enp    every nth point.
+    @param   obis   list of OBIS codes.
+    @param   npt    number of points per OBIS code.
+    @param   dsm    downsampling method, 'lttb', 'minmax' or None.
+    @param   size   number of rows fetched at once.
+    @return  a generator of (obis, {"t":[...], "x":[...], "y":[...], "u":[...]}) chunks.
+    """
+    tstart = time.time()
+    count  = 0
+    for k,v in self.__extract_iter(meter, dtf, dtu, enp, obis, npt, dsm, size):
+      count = count + len(v["t"])
+      yield (k, v)
+    self.__mtc.observe("pyhm_extract_points", count, meter=meter)
+    self.__mtc.observe("pyhm_extract_duration_seconds", time.time() - tstart, meter=meter)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __last(self, meter, obis):
+    """
+    @brief   Return the earliest of the last stored timestamps of the series of a meter and OBIS codes by the catalog,
+             as a point held back by compression (mode sdt) is stored later than newer points of other OBIS codes;
+             without catalog the last stored timestamp of the meter.
+    @param   meter   meter.
+    @param   obis    list of OBIS codes.
+    """
+    self.update()
+    obis = set([int(o) for o in obis])
+    last = [v["tlast"] for k,v in self.__tab_series.items() if meter == k[0] and k[1] in obis]
+    if ( None == self.__chg or not last ):
+      return self.getLastTimestamp(meter)
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=min(last))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __extract_iter(self, meter, dtf, dtu, enp, obis=[], npt=None, dsm=None, size=1000):
+    """
+    @brief   Extract the points of a meter within a time range chunk by chunk, see __query, by the series cache if
+             available. Of a cached entry which expired, only the points following the last row counted of each OBIS
+             code are extracted and merged, continuing every nth point; downsampled series are extracted again.
+    @param   dtf    datetime from
+    @param   dtu    datetime until.
+    @param   enp    every nth point.
+    @param   obis   list of OBIS codes.
+    @param   npt    number of points per OBIS code.
+    @param   dsm    downsampling method, 'lttb', 'minmax' or None.
+    @param   size   number of rows fetched at once.
+    @return  a generator of (obis, {"t":[...], "x":[...], "y":[...], "u":[...]}) chunks.
+    """
+    if ( None == self.__cache ):
+      for k,v in self.__query(meter, dtf, dtu, enp, obis, npt, dsm, size):
+        yield (k, v)
+      return
+
+    key = (meter, dtf, dtu, enp, tuple(sorted([int(o) for o in obis])), npt, dsm)
+    ent = self.__cache.get(key)
+    if ( None != ent ):
+      for k,v in ent["data"].items():
+        yield (k, v)
+      return
+
+    # the range is immutable if it ended before the last stored timestamp of each requested series
+    last = self.__last(meter, obis)
+    done = ( None != last and dtu < last.isoformat() )
+    data = {}
+    ent  = self.__cache.peek(key)
+    if ( None != ent and None != ent["phase"] ):
+      # re-extract the tail following the last row counted of each OBIS code and merge it
+      data  = {k:{"t":list(v["t"]), "x":list(v["x"]), "y":list(v["y"]), "u":list(v["u"])} for k,v in ent["data"].items()}
+      phase = dict(ent["phase"])
+      # OBIS codes without rows counted yet are extracted from the start of the range again
+      tail  = min([phase.get(int(o), (0, self.ms(dtf) - 1))[1] + 1 for o in obis] or [self.ms(dtf)])
+      tail  = (datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=tail)).isoformat()
+      for k,v in data.items():
+        yield (k, v)
+      for k,v in self.__query(meter, tail, dtu, enp, obis, npt, dsm, size, phase):
+        dat = data.setdefault(k, {"t":[], "x":[], "y":[], "u":[]})
+        for c in ("t", "x", "y", "u"):
+          dat[c].extend(v[c])
+        yield (k, v)
+      self.__cache.put(key, data, done, merged=True, phase=phase)
+      return
+
+    # accumulate the chunks for the cache until they exceed its budget
+    size_ = 0
+    phase = {True:{}, False:None}[None == npt or 0 >= npt]
+    for k,v in self.__query(meter, dtf, dtu, enp, obis, npt, dsm, size, phase):
+      if ( None != data ):
+        dat = data.setdefault(k, {"t":[], "x":[], "y":[], "u":[]})
+        for c in ("t", "x", "y", "u"):
+          dat[c].extend(v[c])
+        size_ = size_ + HM_WebSrv_Cache.sizeof(v)
+        if ( size_ > self.__cache.budget ): data = None
+      yield (k, v)
+    if ( None != data ):
+      self.__cache.put(key, data, done, phase=phase)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def tail(self, meter, obis, ts, size=1000):
+    """
+    @brief   Extract the points of a meter following a timestamp chunk by chunk, bypassing the series cache.
+    @param   meter   meter.
+    @param   obis    list of OBIS codes.
+    @param   ts      timestamp in milliseconds.
+    @param   size    number of rows fetched at once.
+    @return  a generator of (obis, {"t":[...], "x":[...], "y":[...], "u":[...]}) chunks.
+    """
+    dtf = (datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=ts + 1)).isoformat()
+    for k,v in self.__query(meter, dtf, "9999-12-31T23:59:59", 1, obis, None, None, size):
+      yield (k, v)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __query(self, meter, dtf, dtu, enp, obis=[], npt=None, dsm=None, size=1000, phase=None):
+    """
+    @brief   Extract the points of a meter within a time range chunk by chunk, reading the cursor by fetchmany, so
+             memory usage does not depend on the size of the time range.
+    @param   dtf    datetime from
+    @param   dtu    datetime until.
+    @param   enp    every nth point.
+    @param   obis   list of OBIS codes.
+    @param   npt    number of points per OBIS code; the averages of the coarsest rollup providing them are extracted
+                    instead of the points if available.
+    @param   dsm    downsampling method to reduce the points to about npt per OBIS code, 'lttb' (largest triangle
+                    three buckets) or 'minmax' (minimum and maximum per bucket, aggregated by the SQL database), or
+                    None to use every nth point.
+    @param   size   number of rows fetched at once.
+    @param   phase  a dictionary of OBIS codes and (number of rows counted, timestamp of the last row counted) to continue
+                    every nth point from, rows up to that timestamp are skipped; updated in place. Or None.
+    @return  a generator of (obis, {"t":[...], "x":[...], "y":[...], "u":[...]}) chunks, chronological per OBIS
+             code, with the timestamps in milliseconds (t) and as ISO string (x).
+    """
+    self.__log.log_callinfo()
+
+    cur = self.__sql_con.cursor()
+    src = self.__source(meter, dtf, dtu, obis, npt)
+    if ( None != npt and 0 < npt and "minmax" == dsm ):
+      # one bucket per two points; the bare columns of the aggregate queries are taken from the min/max rows
+      t0  = self.ms(dtf)
+      wdt = max(1, (self.ms(dtu) - t0) // max(1, npt // 2) + 1)
+      pnt = {}
+      for agg in ("min", "max"):
+        cur.execute("SELECT {obis} AS obis, {unit} AS unit, ({ts} - ?) / ? AS b, {agg}({col}) AS value, {x} AS timestamp, {ts} AS ts {sql} GROUP BY {obis}, b;".format(agg=agg, col=src[agg], **src), [t0, wdt] + src["par"])
+        for row in cur.fetchall():
+          pnt.setdefault(row["obis"], {}).setdefault(row["b"], {})[row["ts"]] = (row["timestamp"], row["value"], row["unit"])
+      for o, v in pnt.items():
+        dat = {"t":[], "x":[], "y":[], "u":[]}
+        for b in sorted(v):
+          for ts in sorted(v[b]):
+            dat["t"].append(ts)
+            dat["x"].append(v[b][ts][0])
+            dat["y"].append(v[b][ts][1])
+            dat["u"].append(v[b][ts][2])
+        yield (o, dat)
+      return
+
+    if ( None != npt and 0 < npt and "lttb" == dsm ):
+      lttb = {}
+      cur.execute("SELECT {obis} AS obis, {unit} AS unit, {x} AS timestamp, {ts} AS ts, {val} AS value {sql} ORDER BY {ts};".format(**src), src["par"])
+      while ( True ):
+        rows = cur.fetchmany(size)
+        if ( not rows ): break
+        dat = {}
+        for row in rows:
+          if ( row["obis"] not in lttb ):
+            lttb[row["obis"]] = HM_WebSrv_LTTB(self.ms(dtf), self.ms(dtu), npt)
+          for ts, x, y, u in lttb[row["obis"]].feed(row["ts"], row["timestamp"], row["value"], row["unit"]):
+            d = dat.setdefault(row["obis"], {"t":[], "x":[], "y":[], "u":[]})
+            d["t"].append(ts)
+            d["x"].append(x)
+            d["y"].append(y)
+            d["u"].append(u)
+        for k,v in dat.items():
+          yield (k, v)
+      for k,v in lttb.items():
+        dat = {"t":[], "x":[], "y":[], "u":[]}
+        for ts, x, y, u in v.finish():
+          dat["t"].append(ts)
+          dat["x"].append(x)
+          dat["y"].append(y)
+          dat["u"].append(u)
+        yield (k, dat)
+      return
+
+    cnt = {True:{}, False:phase}[None == phase]
+    cur.execute("SELECT {obis} AS obis, {unit} AS unit, {x} AS timestamp, {ts} AS ts, {val} AS value {sql} ORDER BY {ts};".format(**src), src["par"])
+    while ( True ):
+      rows = cur.fetchmany(size)
+      if ( not rows ): break
+      dat = {}
+      for row in rows:
+        # keep the first and then every nth point per OBIS code
+        c, t = cnt.get(row["obis"], (0, None))
+        if ( None != t and row["ts"] <= t ): continue
+        if ( 0 == c % enp ):
+          d = dat.setdefault(row["obis"], {"t":[], "x":[], "y":[], "u":[]})
+          d["t"].append(row["ts"])
+          d["x"].append(row["timestamp"])
+          d["y"].append(row["value"])
+          d["u"].append(row["unit"])
+        cnt[row["obis"]] = (c + 1, row["ts"])
+      for k,v in dat.items():
+        yield (k, v)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def extract(self, meter, dtf, dtu, enp, obis=[], npt=None, dsm=None):
+    """
+    @brief   Extract the points of a meter within a time range, see extract_iter.
+    @param   dtf    datetime from
+    @param   dtu    datetime until.
+    @param   enp    every nth point.
+    @param   obis   list of OBIS codes.
+    @param   npt    number of points per OBIS code.
+    @param   dsm    downsampling method, 'lttb', 'minmax' or None.
+    @return  a dictionary of OBIS codes and {"t":[...], "x":[...], "y":[...], "u":[...]} or None on error.
     """
     self.__log.log_callinfo()
 
     data = {}
     try:
-      self.__sql_cur.execute("SELECT * FROM v_{} WHERE (timestamp BETWEEN '{}' AND '{}' ) AND (OBIS IN ({})) ORDER BY timestamp;".format(meter, dtf, dtu, ",".join(obis)))
-      for i, row in enumerate(self.__sql_cur.fetchall()):
-        if ( row["obis"] not in data ):
-          data[row["obis"]] = {"x":[row["timestamp"]], "y":[row["value"]], "u":[row["unit"]], "c":1}
-        else:
-          if ( (data[row["obis"]]["c"] % enp) == 0 ):
-            data[row["obis"]]["x"].append(row["timestamp"])
-            data[row["obis"]]["y"].append(row["value"])
-            data[row["obis"]]["u"].append(row["unit"])
-            data[row["obis"]]["c"] = 1
-          else:
-            data[row["obis"]]["c"] = data[row["obis"]]["c"] + 1
-      for k in data:
-        del(data[k]["c"])
+      for k,v in self.extract_iter(meter, dtf, dtu, enp, obis, npt, dsm):
+        dat = data.setdefault(k, {"t":[], "x":[], "y":[], "u":[]})
+        dat["t"].extend(v["t"])
+        dat["x"].extend(v["x"])
+        dat["y"].extend(v["y"])
+        dat["u"].extend(v["u"])
       return data
     except:
       self.__log.log(pyLOG.LogLvl.ERROR, "Could not extract data from database.\n{}".format(traceback.format_exc()))
       return None
 
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def snapshot(self, path, meter=[], dtf=None, dtu=None):
+    """
+    @brief   Write a consistent snapshot of the SQL database to a new SQL database file. Unfiltered, it is copied by the
+             backup API in a single step; filtered to meters and/or a time range, the schema is copied and the rows are
+             copied within a single read transaction. The catalog of a filtered snapshot still covers all points of
+             its meters, see pyHM_dbtool.py catalog. Readers do not block writing in the 'wal' journal mode only.
+    @param   path    The file of the snapshot.
+    @param   meter   list of meters or an empty list for all meters.
+    @param   dtf     datetime from or None.
+    @param   dtu     datetime until or None.
+    """
+    self.__log.log_callinfo()
+
+    if ( not meter and None == dtf and None == dtu ):
+      dst = sqlite3.connect(path)
+      try    : self.__sql_con.backup(dst)
+      finally: dst.close()
+      return
+
+    # schema
+    self.__sql_cur.execute("SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY type == 'view';")
+    schema = self.__sql_cur.fetchall()
+    dst    = sqlite3.connect(path)
+    try:
+      for row in schema:
+        dst.execute(row["sql"])
+      dst.commit()
+    finally:
+      dst.close()
+
+    # rows
+    t0  = -2**62
+    t1  =  2**62
+    if ( None == dtf ): dtf = "0000"
+    else              : t0  = self.ms(dtf)
+    if ( None == dtu ): dtu = "9999"
+    else              : t1  = self.ms(dtu)
+    mtr = "(SELECT PK FROM main.b_METERS WHERE {})".format({True:"1", False:"value IN ({})".format(",".join(["?"]*len(meter)))}[not meter])
+    flt = {"b_METERS"    : ("PK IN {}".format(mtr), list(meter)),
+           "c_SERIES"    : ("pk_meter IN {}".format(mtr), list(meter)),
+           "m_TIMESTAMPS": ("value BETWEEN ? AND ?", [dtf, dtu]),
+           "m_POINTS"    : ("pk_meter IN {} AND pk_timestamp IN (SELECT PK FROM main.m_TIMESTAMPS WHERE value BETWEEN ? AND ?)".format(mtr), list(meter) + [dtf, dtu]),
+           "m_POINTS2"   : ("pk_meter IN {} AND ts BETWEEN ? AND ?".format(mtr), list(meter) + [t0, t1])}
+    for k in self.ROLLUPS:
+      flt[k[0]] = ("pk_meter IN {} AND bucket BETWEEN ? AND ?".format(mtr), list(meter) + [t0, t1])
+    if ( self.__cfg.get("readonly", False) ):
+      self.__sql_con.execute("ATTACH DATABASE ? AS snap;", ["file:{}?mode=rw".format(urllib.parse.quote(path))])
+    else:
+      self.__sql_con.execute("ATTACH DATABASE ? AS snap;", [path])
+    try:
+      self.__sql_con.execute("BEGIN;")
+      for row in schema:
+        if ( "table" != row["type"] ): continue
+        whr, par = flt.get(row["name"], ("1", []))
+        self.__sql_con.execute("INSERT INTO snap.{tab} SELECT * FROM main.{tab} WHERE {whr};".format(tab=row["name"], whr=whr), par)
+      self.__sql_con.commit()
+    except:
+      self.__sql_con.rollback()
+      raise
+    finally:
+      self.__sql_con.execute("DETACH DATABASE snap;")
+
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def getMeters(self):
     return self.__tab_meters
@@ -139,11 +711,28 @@ class HM_WebSrv_Sql:
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def getLastTimestamp(self, meter=None, format=None):
-    if ( None != meter ):
+    ts = None
+    self.update()
+    if ( None != self.__chg ):
+      # maximum of the last timestamps of the catalog
+      last = [v["tlast"] for k,v in self.__tab_series.items() if None == meter or meter == k[0]]
+      if ( last ): ts = datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=max(last))
+    elif ( 2 == self.__ver ):
+      # maximum of the per (meter, obis) primary key seeks
+      try:
+        self.__sql_cur.execute("""SELECT MAX((SELECT MAX(ts) FROM m_POINTS2 WHERE pk_meter == bm.PK AND pk_obis == bo.PK)) AS ts
+                                  FROM b_METERS bm, b_OBIS bo
+                                  WHERE (? IS NULL OR bm.value == ?);
+                               """, [meter, meter])
+        row = self.__sql_cur.fetchone()
+        ts  = datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=row["ts"])
+      except:
+        ts  = None
+    elif ( None != meter ):
       try:
         self.__sql_cur.execute("SELECT * FROM v_{} ORDER BY timestamp DESC LIMIT 1;".format(meter))
         row = self.__sql_cur.fetchone()
-        try   : ts = datetime.datetime.strptime(row["timestamp"], "%Y-%m-%dT%H:%M:%S.%f")
+        try   : ts = datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=self.ms(row["timestamp"]))
         except: ts = None
       except:
         row = None
@@ -151,79 +740,532 @@ class HM_WebSrv_Sql:
       try:
         self.__sql_cur.execute("SELECT * FROM m_TIMESTAMPS ORDER BY value DESC LIMIT 1;")
         row = self.__sql_cur.fetchone()
-        try   : ts = datetime.datetime.strptime(row["value"], "%Y-%m-%dT%H:%M:%S.%f")
+        try   : ts = datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=self.ms(row["value"]))
         except: ts = None
       except:
         row = None
     try:
-      if   ( None != format and None != ts ): return ts.strftime(frmat)
+      if   ( None != format and None != ts ): return ts.strftime(format)
       else                                  : return ts
     except:
       return None
 
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def getSeries(self):
+    return self.__tab_series
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def getChanges(self):
+    return self.__chg
+
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   meters    = property(getMeters)
   units     = property(getUnits)
   obis      = property(getObis)
+  series    = property(getSeries)
+  changes   = property(getChanges)
+
+########################################################################################################################
+
+class HM_WebSrv_LiveStream(object):
+  """
+  @brief   HM web server live update stream of a '/api/live' request as Server-Sent Events, whose headers are sent by
+           the request handler. Polled by the server outside of the request workers until websrv livetime seconds
+           passed, the client then reconnects.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg, meter, obis, wm, chunked):
+    """
+    @brief   Constructor.
+    @param   cfg       A HM web server configuration.
+    @param   meter     The meter.
+    @param   obis      The list of OBIS codes.
+    @param   wm        The last timestamp already sent in milliseconds.
+    @param   chunked   Whether the response body is chunked.
+    """
+    self.meter     = meter
+    self.obis      = obis
+    self.poll      = cfg.get("livepoll", 1.0)
+    self.__wm      = {o:wm for o in obis}
+    self.__chg     = None
+    self.__tend    = time.time() + cfg.get("livetime", 300.0)
+    self.__tpng    = time.time()
+    self.__chunked = chunked
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __frame(self, data):
+    """
+    @brief   Frame a part of the response body.
+    @param   data   The data.
+    """
+    if ( not data or not self.__chunked ): return data
+    return b"%X\r\n" % len(data) + data + b"\r\n"
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def expired(self):
+    """
+    @brief   Returns whether the stream is to be ended.
+    """
+    return ( time.time() >= self.__tend )
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def begin(self):
+    """
+    @brief   Returns the framed start of the response body, the reconnection time of the client.
+    """
+    return self.__frame(bytes("retry: {}\n\n".format(int(self.poll*1000)), "utf8"))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def update(self, sql):
+    """
+    @brief   Query the new points, if the change counter of the catalog changed, as events carrying the points of an
+             OBIS code as JSON {"obis": ..., "t": [...], "x": [...], "y": [...]} and the last timestamp in milliseconds
+             as event id, from which a reconnecting client (Last-Event-ID) resumes.
+    @param   sql   A HM_WebSrv_Sql, updated by the caller.
+    @return  the framed events or a ping every 15 seconds without events, maybe empty.
+    """
+    data = b""
+    if ( None == sql.changes or self.__chg != sql.changes ):
+      self.__chg = sql.changes
+      for k,v in sql.tail(self.meter, self.obis, min(self.__wm.values())):
+        idx = [i for i,t in enumerate(v["t"]) if t > self.__wm.get(k, 0)]
+        if ( not idx ): continue
+        self.__wm[k] = v["t"][idx[-1]]
+        evt  = {"obis":k, "t":[v["t"][i] for i in idx], "x":[v["x"][i] for i in idx], "y":[v["y"][i] for i in idx]}
+        data = data + bytes("id: {}\ndata: {}\n\n".format(min(self.__wm.values()), json.dumps(evt, separators=(",", ":"), default=str)), "utf8")
+    if ( data ):
+      self.__tpng = time.time()
+    elif ( 15.0 < time.time() - self.__tpng ):
+      # keep proxies from closing the connection and detect closed connections
+      data        = b": ping\n\n"
+      self.__tpng = time.time()
+    return self.__frame(data)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def end(self):
+    """
+    @brief   Returns the framed end of the response body.
+    """
+    return {True:b"0\r\n\r\n", False:b""}[self.__chunked]
+
+########################################################################################################################
+
+class HM_WebSrv_Live(object):
+  """
+  @brief   HM web server live update streams of a server, capped at websrv livemax streams, further requests are
+           answered by '503 Service Unavailable'. The streams of the pool server are served by a broadcaster thread
+           with its own read-only connection to the SQL database, those of the asyncio server by the event loop.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg):
+    """
+    @brief   Constructor.
+    @param   cfg   A HM web server configuration.
+    """
+    self.__cfg  = cfg
+    self.__log  = pyHM_log.HM_Log(self.__cfg["logref"])
+    self.__max  = self.__cfg.get("livemax", 32)
+    self.__cnt  = 0
+    self.__lck  = threading.Lock()
+    self.__sub  = []     # (stream, socket) tuples served by the broadcaster thread
+    self.__stop = threading.Event()
+    self.__thd  = None
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def acquire(self):
+    """
+    @brief   Reserve a stream.
+    @return  whether a stream is available.
+    """
+    with ( self.__lck ):
+      if ( self.__cnt >= self.__max ):
+        self.__log.log(pyLOG.LogLvl.ERROR, "{} live update streams open, rejecting further.".format(self.__cnt))
+        return False
+      self.__cnt = self.__cnt + 1
+      return True
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def release(self):
+    """
+    @brief   Release a stream reserved by acquire.
+    """
+    with ( self.__lck ):
+      self.__cnt = self.__cnt - 1
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def add(self, stream, request):
+    """
+    @brief   Pass a stream reserved by acquire to the broadcaster thread, which closes the request socket at its end.
+    @param   stream    A HM_WebSrv_LiveStream.
+    @param   request   The request socket.
+    """
+    with ( self.__lck ):
+      self.__sub.append((stream, request))
+      if ( None == self.__thd ):
+        self.__thd = threading.Thread(target=self.__run, name="HM_WebSrv_Live", daemon=True)
+        self.__thd.start()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def close(self):
+    """
+    @brief   Stop the broadcaster thread and close the streams.
+    """
+    self.__stop.set()
+    if ( None != self.__thd ):
+      self.__thd.join(timeout=5.0)
+    with ( self.__lck ):
+      sub, self.__sub = self.__sub, []
+    for s,r in sub:
+      self.__drop(s, r)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __drop(self, stream, request):
+    """
+    @brief   Close the request socket of a stream and release the stream.
+    @param   stream    A HM_WebSrv_LiveStream.
+    @param   request   The request socket.
+    """
+    try   : request.shutdown(socket.SHUT_WR)
+    except: pass
+    request.close()
+    self.release()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __run(self):
+    """
+    @brief   Broadcaster thread polling the SQL database for all streams every websrv livepoll seconds. A write blocks
+             at most websrv keepalive seconds, the timeout of the request sockets, before the stream is dropped.
+    """
+    try:
+      sql = HM_WebSrv_Sql(dict(self.__cfg, readonly=True))
+    except:
+      self.__log.log(pyLOG.LogLvl.ERROR, "Could not create live update broadcaster.\n{}".format(traceback.format_exc()))
+      with ( self.__lck ):
+        sub, self.__sub, self.__thd = self.__sub, [], None
+      for s,r in sub:
+        self.__drop(s, r)
+      return
+    while ( not self.__stop.wait(self.__cfg.get("livepoll", 1.0)) ):
+      with ( self.__lck ):
+        sub = list(self.__sub)
+      if ( not sub ): continue
+      sql.update()
+      for s,r in sub:
+        try:
+          data = s.update(sql)
+          done = s.expired()
+          if ( done ): data = data + s.end()
+          if ( data ): r.sendall(data)
+        except (ConnectionError, OSError):
+          done = True
+        except:
+          self.__log.log(pyLOG.LogLvl.ERROR, "Could not update live stream of '{}'.\n{}".format(s.meter, traceback.format_exc()))
+          done = True
+        if ( done ):
+          with ( self.__lck ):
+            self.__sub.remove((s, r))
+          self.__drop(s, r)
 
 ########################################################################################################################
 
-class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
-  """
-  @brief   HM web server HTTP request handler for python http.server.
-  """
+class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+  """
+  @brief   HM web server HTTP request handler for python http.server. Connections are kept alive (HTTP/1.1), responses
+           are gzip encoded if accepted and data responses carry validators derived from the last stored timestamp.
+  """
+
+  protocol_version = "HTTP/1.1"
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, cfg, cache=None):
+    """
+    @brief   Constructor.
+    @param   cfg     A HM web server configuration.
+    @param   cache   A HM_WebSrv_Cache of extracted series or None.
+    """
+    self.__cfg     = cfg
+    self.__log     = pyHM_log.HM_Log(self.__cfg["logref"])
+    self.__sql     = HM_WebSrv_Sql(self.__cfg, cache)
+    self.__gzip    = None    # compressor of the response body being sent
+    self.__chunked = False   # whether the response body being sent is chunked
+    self.stream    = None    # live update stream of the request left to the server
+    self.__mtc     = pyHM_metrics.metrics
+    self.timeout   = self.__cfg.get("keepalive", 5.0)
+
+    self.__mtc.declare("pyhm_http_request_duration_seconds", "histogram", "Duration of GET requests per route, including the streaming of the response.")
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __accepts(self, encoding):
+    """
+    @brief   Returns whether the client accepts a content encoding.
+    @param   encoding   The content encoding, e.g. 'gzip'.
+    """
+    return ( None != self.headers and encoding in self.headers.get("Accept-Encoding", "") )
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __begin(self, code, ctype, length=None, gzip=False, headers=[]):
+    """
+    @brief   Send the status and the headers of a response. Without length, the body is chunked (HTTP/1.1) or ends by
+             closing the connection (HTTP/1.0).
+    @param   code      The HTTP status code.
+    @param   ctype     The content type.
+    @param   length    The length of the body or None.
+    @param   gzip      Whether to gzip encode the body on the fly.
+    @param   headers   A list of further (header, value) tuples.
+    """
+    self.__gzip    = {True:zlib.compressobj(6, zlib.DEFLATED, 31), False:None}[gzip]
+    self.__chunked = ( None == length and "HTTP/1.1" == self.request_version )
+    self.send_response(code)
+    self.send_header('Content-type', ctype)
+    for k,v in headers:
+      self.send_header(k, v)
+    if ( gzip ):
+      self.send_header('Content-Encoding', 'gzip')
+      self.send_header('Vary', 'Accept-Encoding')
+    if   ( None != length ): self.send_header('Content-Length', str(length))
+    elif ( self.__chunked ): self.send_header('Transfer-Encoding', 'chunked')
+    else                   : self.send_header('Connection', 'close'); self.close_connection = True
+    self.end_headers()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __write(self, data, raw=False):
+    """
+    @brief   Write a part of the body of a response begun by __begin.
+    @param   data   The data.
+    @param   raw    Whether the data is already encoded.
+    """
+    if ( None != self.__gzip and not raw ): data = self.__gzip.compress(data)
+    if ( not data ): return
+    if ( self.__chunked ): self.wfile.write(b"%X\r\n" % len(data) + data + b"\r\n")
+    else                 : self.wfile.write(data)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __end(self):
+    """
+    @brief   End the body of a response begun by __begin.
+    """
+    if ( None != self.__gzip ): self.__write(self.__gzip.flush(), raw=True)
+    if ( self.__chunked ): self.wfile.write(b"0\r\n\r\n")
+    self.__gzip    = None
+    self.__chunked = False
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __send(self, code, ctype, body, headers=[]):
+    """
+    @brief   Send a complete response, gzip encoded if accepted and worthwhile.
+    @param   code      The HTTP status code.
+    @param   ctype     The content type.
+    @param   body      The body.
+    @param   headers   A list of further (header, value) tuples.
+    """
+    if ( 1024 < len(body) and self.__accepts("gzip") ):
+      cmp     = zlib.compressobj(6, zlib.DEFLATED, 31)
+      body    = cmp.compress(body) + cmp.flush()
+      headers = headers + [('Content-Encoding', 'gzip'), ('Vary', 'Accept-Encoding')]
+    self.__begin(code, ctype, len(body), False, headers)
+    self.wfile.write(body)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __conditional(self, meter):
+    """
+    @brief   Return the validators of a data response, an ETag of the request and the last stored timestamp and a
+             Last-Modified of the last stored timestamp, and answer the request by '304 Not Modified' if it matches.
+    @param   meter   The meter of the request or None.
+    @return  a tuple of whether the request was answered and the list of (header, value) tuples of the validators.
+    """
+    last    = self.__sql.getLastTimestamp(meter or None)
+    headers = [('Cache-Control', 'no-cache'),
+               ('ETag', 'W/"{:08x}"'.format(zlib.crc32(bytes("{}|{}|{}".format(self.path, last, self.__sql.changes), "utf8"))))]
+    if ( None != last ):
+      headers.append(('Last-Modified', email.utils.formatdate(time.mktime(last.timetuple()), usegmt=True)))
+    match = False
+    if ( None != self.headers.get("If-None-Match") ):
+      match = headers[1][1] in [e.strip() for e in self.headers["If-None-Match"].split(",")]
+    elif ( None != self.headers.get("If-Modified-Since") and None != last ):
+      try   : match = int(time.mktime(last.timetuple())) <= email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"]).timestamp()
+      except: match = False
+    if ( match ):
+      self.send_response(304)
+      for k,v in headers:
+        self.send_header(k, v)
+      self.end_headers()
+    return (match, headers)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def do_GET(self):
+    """
+    @brief   Handler for GET requests, recording the duration per route and serving the metrics at '/metrics' if
+             enabled.
+    """
+    tstart = time.time()
+    path   = urllib.parse.urlparse(self.path).path
+    route  = {"/api/series":"api_series", "/api/live":"api_live", "/metrics":"metrics", "/pyHM.cfg":"cfg",
+              "/"+self.__cfg["sqldb"].replace("\\", "/").strip(".").lstrip("/"):"download"}.get(path, "page")
+    try:
+      if ( "metrics" == route and True == self.__cfg.get("metrics", False) ):
+        self.__send(200, pyHM_metrics.HM_Metrics.CONTENT_TYPE, pyHM_metrics.metrics.render())
+      else:
+        self.__get()
+    finally:
+      self.__mtc.observe("pyhm_http_request_duration_seconds", time.time() - tstart, route=route)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __get(self):
+    """
+    @brief   Serve a GET request.
+    """
+    pCFG = "pyHM.cfg"
+    pDBF = self.__cfg["sqldb"].replace("\\", "/").strip(".").lstrip("/")
+
+    if ( "images2" in self.path ):
+      self.send_error(404)
+      return
+
+    if ( "/"+pCFG  == self.path ):
+      f = open(pCFG, "rb")
+      self.__send(200, 'text/plain', f.read())
+      f.close()
+      return
+
+    if ( "/"+pDBF  == urllib.parse.urlparse(self.path).path ):
+      return self.__download(pDBF, urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query))
+
+    self.__log.log_callinfo()
+
+    # parse url
+    pURL = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+
+    # route the data api
+    if ( "/api/series" == urllib.parse.urlparse(self.path).path ):
+      return self.__api_series(pURL)
+    if ( "/api/live"   == urllib.parse.urlparse(self.path).path ):
+      return self.__api_live(pURL)
+
+    pMeter, pDTF, pDTU, pENP, pNPT, pDSM, pObis, eError = self.__params(pURL)
+
+    # answer unchanged data by '304 Not Modified'
+    hdrs = []
+    if ( not eError ):
+      done, hdrs = self.__conditional(pMeter)
+      if ( done ): return
+
+    # send response status code and headers
+    self.__begin(200, 'text/html', gzip=self.__accepts("gzip"), headers=hdrs)
+
+    # create html head
+    if ( not eError ):
+      html_head = """
+  <head>
+    <meta charset="utf-8"/>
+    <style type="text/css">
+      * {font: normal 10px Verdana, Arial, 'sans-serif' !important;}
+    </style>
+    <script src="https://www.rainforestnet.com/datetimepicker/javascript/datetimepicker_css.js"></script>
+    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+  </head>
+"""
+    else:
+      html_head = """
+  <head>
+    <meta charset="utf-8"/>
+    <style type="text/css">* {font: normal 10px Verdana, Arial, 'sans-serif' !important;}</style>
+    <script src="https://www.rainforestnet.com/datetimepicker/javascript/datetimepicker_css.js"></script>
+  </head>
+"""
+    # create html
+    self.__write(bytes("<html>\n" + html_head + "  <body>\n", "utf8"))
+
+    # create html plot, the points are written chunk by chunk while the database cursor is read
+    if ( not eError ):
+      for html_plot in self.__plot(pMeter, pDTF, pDTU, pENP, pObis, pNPT, pDSM):
+        self.__write(bytes(html_plot, "utf8"))
+    else:
+      self.__write(bytes("{tx}".format(tx="\n".join(["{sp}<p>{ms}</p>".format(sp=" "*4, ms=e) for e in eError])), "utf8"))
+
+    # create html form
+    html_form = """
+    <form method="get">
+      <input type='submit' value='Submit'/>
+      <fieldset>
+        <legend>
+          Intervall
+        </legend>
+        <input type="text"   name="dtf" id="id_dtf" maxlength="25" size="25" value="{dtf}" required/> <img src="https://www.rainforestnet.com/datetimepicker/images2/cal.gif" onclick="javascript:NewCssCal('id_dtf', 'yyyyMMdd', 'arrow', 'true', '24', false, 'past')" style="cursor:pointer"/> <label for="id_dtf">Start date & time</label>
+        <span style="display:inline-block; width:75;"></span>
+        <input type="text"   name="dtu" id="id_dtu" maxlength="25" size="25" value="{dtu}" required/> <img src="https://www.rainforestnet.com/datetimepicker/images2/cal.gif" onclick="javascript:NewCssCal('id_dtu', 'yyyyMMdd', 'arrow', 'true', '24', false, 'past')" style="cursor:pointer"/> <label for="id_dtu">End date & time</label>
+        <span style="display:inline-block; width:75;"></span>
+        <input type="number" name="enp" id="id_enp" min="1" max="1000" value="{enp}" required> <label for="id_exp">only use every Nth point</label>
+        <span style="display:inline-block; width:75;"></span>
+        <input type="number" name="npt" id="id_npt" min="0" max="100000" value="{npt}" required> <label for="id_npt">points per indicator (0: every Nth point)</label>
+        <select name="dsm" id="id_dsm">
+          <option value="lttb"   {lttb}>largest triangle three buckets</option>
+          <option value="minmax" {minmax}>minimum and maximum</option>
+        </select> <label for="id_dsm">downsampling</label>
+      </fieldset>
+      <fieldset>
+        <legend>
+          Meters
+        </legend>
+{mtr}
+      </fieldset>
+      <fieldset>
+        <legend>
+          Indicators
+        </legend>
+{ind}
+      </fieldset>
+    </form>
+""".format( dtf=pDTF.strftime("%Y-%m-%d %H:%M"),
+            dtu=pDTU.strftime("%Y-%m-%d %H:%M"),
+            enp=pENP,
+            npt={True:1000, False:pNPT}[None == pNPT],
+            lttb={True:"selected", False:""}["minmax" != pDSM],
+            minmax={True:"selected", False:""}["minmax" == pDSM],
+            mtr="\n".join(["{sp}<input type=\"radio\"    name=\"meter\" id=\"id_{id}\" value=\"{id}\" {chk}><label for=\"id_{id}\">{id} ({ds})</label><br/>".format(         sp=" "*8, id=k, ds=v["dsc"],               chk={True:"checked", False:" "*7}[    k  in pMeter]) for k,v in sorted(self.__sql.meters.items())]),
+            ind="\n".join(["{sp}<input type=\"checkbox\" name=\"obis\"  id=\"id_{id}\" value=\"{id}\" {chk}><label for=\"id_{id}\">{id:X}   [{un}]   ({ds})</label><br/>".format(sp=" "*8, id=k, ds=v["dsc"], un=v["unit"], chk={True:"checked", False:" "*7}[str(k) in pObis ]) for k,v in sorted(self.__sql.obis.items())  ]),
+          )
+
+    # create link
+    html_link = """
+    <a href="{cfg}">download configuration</a></br>
+    <a href="{dbf}">download database</a>
+    """.format(cfg=pCFG, dbf=pDBF)
+
+    self.__write(bytes(html_form + html_link + "  </body>\n" + "</html>", "utf8"))
+    self.__end()
+    return
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def __init__(self, cfg):
+  @staticmethod
+  def __datetime(value):
     """
-    @brief   Constructor.
-    @param   cfg   A HM web server configuration.
+    @brief   Parse a date time URL query parameter, either 'YYYY-MM-DD HH:MM' or ISO 'YYYY-MM-DDTHH:MM:SS'.
+    @param   value   The URL query parameter value.
     """
-    self.__cfg = cfg
-    self.__log = pyLOG.Log(self.__cfg["logref"])
-    self.__sql = HM_WebSrv_Sql(self.__cfg)
+    try   : return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M")
+    except: return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S")
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def do_GET(self):
+  def __params(self, pURL):
     """
-    @brief   Handler for GET requests.
+    @brief   Check the URL query parameters of a data request.
+    @param   pURL   The parsed URL query parameters.
+    @return  a tuple of meter, datetime from, datetime until, every nth point, number of points, downsampling method,
+             list of OBIS codes and list of error messages.
     """
-    pCFG = "pyHM.cfg"
-    pDBF = self.__cfg["sqldb"].replace("\\", "/").strip(".").lstrip("/")
-
-    if ( "images2" in self.path ): return
-
-    if ( "/"+pCFG  == self.path ):
-      f = open(pCFG, "rb")
-      self.send_response(200)
-      self.send_header('Content-type', 'text/plain')
-      self.end_headers()
-      self.wfile.write(f.read())
-      f.close()
-      return
-
-    if ( "/"+pDBF  == self.path ):
-      f = open(pDBF, "rb")
-      self.send_response(200)
-      self.send_header('Content-type', 'application/octet-stream')
-      self.end_headers()
-      self.wfile.write(f.read())
-      f.close()
-      return
-
-    self.__log.log_callinfo()
-
     pDTF   = None # date time from
     pDTU   = None # date time until
     pENP   = None # every nth point
+    pNPT   = None # number of points
+    pDSM   = None # downsampling method
     pMeter = []   # meter
     pObis  = []   # obis
     eError = []   # list of error messages
 
     self.__log.log(pyLOG.LogLvl.INFO, "Received request for url:{}".format(self.path))
 
-    # parse url
-    pURL = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
     self.__log.log(pyLOG.LogLvl.INFO, "Received request for parameters:\n{}".format(pprint.pformat(pURL)))
 
     # check url query parameters
@@ -245,7 +1287,7 @@ class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
       if ( 1 != len(pURL["dtf"]) ):
         eError.append("URL query parameter 'dtf' is not a single value.")
       else:
-        try   : pDTF = datetime.datetime.strptime(pURL["dtf"][0], "%Y-%m-%d %H:%M")
+        try   : pDTF = self.__datetime(pURL["dtf"][0])
         except: pDTF = datetime.datetime(1900, 1, 1); eError.append("URL query parameter 'dtf' is not of expected format.")
     # - dtu
     if ( "dtu" not in pURL ):
@@ -255,7 +1297,7 @@ class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
       if ( 1 != len(pURL["dtu"]) ):
         eError.append("URL query parameter 'dtu' is not a single value.")
       else:
-        try   : pDTU = datetime.datetime.strptime(pURL["dtu"][0], "%Y-%m-%d %H:%M")
+        try   : pDTU = self.__datetime(pURL["dtu"][0])
         except: pDTU = datetime.datetime(1900, 1, 2); eError.append("URL query parameter 'dtu' is not of expected format.")
     # - enp
     if ( "enp" not in pURL ):
@@ -267,6 +1309,20 @@ class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
       else:
         try   : pENP = int(pURL["enp"][0])
         except: pENP = 300; eError.append("URL query parameter 'enp' is not of expected data type 'integer'.")
+    # - npt (optional)
+    if ( "npt" in pURL ):
+      if ( 1 != len(pURL["npt"]) ):
+        eError.append("URL query parameter 'npt' is not a single value.")
+      else:
+        try   : pNPT = int(pURL["npt"][0])
+        except: eError.append("URL query parameter 'npt' is not of expected data type 'integer'.")
+    # - dsm (optional)
+    if ( "dsm" in pURL ):
+      if   ( 1 != len(pURL["dsm"]) )                 : eError.append("URL query parameter 'dsm' is not a single value.")
+      elif ( pURL["dsm"][0] not in ("lttb", "minmax") ): eError.append("URL query parameter 'dsm' is not one of 'lttb' or 'minmax'.")
+      else                                           : pDSM = pURL["dsm"][0]
+    elif ( None != pNPT ):
+      pDSM = "lttb"
     # - obis
     if ( "obis" not in pURL ):
       eError.append("URL query parameter 'obis' is not present.")
@@ -293,59 +1349,212 @@ class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
     if pDTF > pDTU:
       pDTF, pDTU = pDTU, pDTF
 
-    # send response status code
-    self.send_response(200)
+    return (pMeter, pDTF, pDTU, pENP, pNPT, pDSM, pObis, eError)
 
-    # send headers
-    self.send_header('Content-type','text/html')
-    self.end_headers()
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __api_series(self, pURL):
+    """
+    @brief   Handler for data api requests '/api/series?meter=&obis=&dtf=&dtu=[&enp=][&npt=][&dsm=][&fmt=]'. The
+             points are returned columnar per OBIS code, either as JSON (fmt=json, default)
 
-    # create html head
+               {"meter": "...", "dtf": "...", "dtu": "...", "series": [{"obis": ..., "unit": "...", "t": [...], "y": [...]}]}
+
+             or packed little endian (fmt=bin)
+
+               header : magic b"PYHM", version uint16, number of series uint16
+               series : obis int64, unit length uint16, number of points uint32, unit utf8,
+                        timestamps int64[number of points], values float64[number of points]
+
+             with the timestamps in milliseconds since 1970-01-01T00:00:00 and non-numeric values as NaN.
+    @param   pURL   The parsed URL query parameters.
+    """
+    # every point unless requested otherwise
+    pURL.setdefault("enp", ["1"])
+    pFMT = pURL.pop("fmt", ["json"])
+    pMeter, pDTF, pDTU, pENP, pNPT, pDSM, pObis, eError = self.__params(pURL)
+    if ( 1 != len(pFMT) or pFMT[0] not in ("json", "bin") ):
+      eError.append("URL query parameter 'fmt' is not one of 'json' or 'bin'.")
+
+    data = None
+    hdrs = []
     if ( not eError ):
-      html_head = """
-  <head>
-    <meta charset="utf-8"/>
-    <style type="text/css">
-      * {font: normal 10px Verdana, Arial, 'sans-serif' !important;}
-    </style>
-    <script src="https://www.rainforestnet.com/datetimepicker/javascript/datetimepicker_css.js"></script>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-  </head>
-"""
+      done, hdrs = self.__conditional(pMeter)
+      if ( done ): return
+      data = self.__sql.extract(pMeter, pDTF.isoformat(), pDTU.isoformat(), pENP, pObis, pNPT, pDSM)
+      if ( None == data ): eError.append("Could not extract data from database.")
+
+    if ( eError ):
+      body = bytes(json.dumps({"error": eError}, separators=(",", ":")), "utf8")
+      ctyp = "application/json"
+    elif ( "json" == pFMT[0] ):
+      body = bytes(json.dumps({"meter" : pMeter,
+                               "dtf"   : pDTF.isoformat(),
+                               "dtu"   : pDTU.isoformat(),
+                               "series": [{"obis": k,
+                                           "unit": self.__sql.units[v["u"][0]]["dsc"],
+                                           "t"   : v["t"],
+                                           "y"   : v["y"]} for k,v in sorted(data.items()) if v["t"]]},
+                              separators=(",", ":"), default=lambda o: {True:o.hex(), False:str(o)}[isinstance(o, bytes)]), "utf8")
+      ctyp = "application/json"
     else:
-      html_head = """
-  <head>
-    <meta charset="utf-8"/>
-    <style type="text/css">* {font: normal 10px Verdana, Arial, 'sans-serif' !important;}</style>
-    <script src="https://www.rainforestnet.com/datetimepicker/javascript/datetimepicker_css.js"></script>
-  </head>
-"""
-    # create html plot
-    if ( not eError ):
+      body = [struct.pack("<4sHH", b"PYHM", 1, len([k for k,v in data.items() if v["t"]]))]
+      for k,v in sorted(data.items()):
+        if ( not v["t"] ): continue
+        unit = bytes(self.__sql.units[v["u"][0]]["dsc"], "utf8")
+        t    = array.array("q", v["t"])
+        y    = array.array("d", [{True:e, False:float("nan")}[isinstance(e, (int, float))] for e in v["y"]])
+        if ( "big" == sys.byteorder ):
+          t.byteswap()
+          y.byteswap()
+        body.extend([struct.pack("<qHI", k, len(unit), len(t)), unit, t.tobytes(), y.tobytes()])
+      body = b"".join(body)
+      ctyp = "application/octet-stream"
+
+    self.__send({True:400, False:200}[bool(eError)], ctyp, body, {True:[], False:hdrs}[bool(eError)])
+    return
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __api_live(self, pURL):
+    """
+    @brief   Handler for live update requests '/api/live?meter=&obis=[&obis=...]' as Server-Sent Events. Sends the
+             headers only and leaves the HM_WebSrv_LiveStream in stream to the server, which serves it outside of the
+             request workers, see HM_WebSrv_Live.
+    @param   pURL   The parsed URL query parameters.
+    """
+    self.__log.log_callinfo()
+
+    eError = []
+    pMeter = None
+    pObis  = []
+    if ( "meter" not in pURL or 1 != len(pURL["meter"]) ):
+      eError.append("URL query parameter 'meter' is not a single value.")
+    else:
+      if ( pURL["meter"][0] not in self.__sql.meters ): self.__sql.update()
+      if ( pURL["meter"][0] not in self.__sql.meters ): eError.append("URL query parameter 'meter' is not included in DB.")
+      else                                            : pMeter = pURL["meter"][0]
+    for o in pURL.get("obis", []):
+      try   : pObis.append(int(o))
+      except: eError.append("URL query parameter 'obis = {}' is of expected data type 'integer'.".format(o))
+    if ( not pObis ):
+      eError.append("URL query parameter 'obis' is not present.")
+    if ( eError ):
+      for e in eError:
+        self.__log.log(pyLOG.LogLvl.ERROR, e)
+      self.__send(400, "application/json", bytes(json.dumps({"error": eError}, separators=(",", ":")), "utf8"))
+      return
+
+    # the last timestamp already sent
+    try   : wm = int(self.headers.get("Last-Event-ID"))
+    except: wm = None
+    if ( None == wm ):
+      last = self.__sql.getLastTimestamp(pMeter)
+      if ( None == last ): wm = 0
+      else               : wm = (last - datetime.datetime(1970, 1, 1)) // datetime.timedelta(milliseconds=1)
+
+    # live updates are served by the server outside of the request workers, not in mode single
+    live = getattr(self.server, "live", None)
+    if ( None == live or not live.acquire() ):
+      self.__send(503, "application/json", bytes(json.dumps({"error": ["Live updates are not available."]}, separators=(",", ":")), "utf8"), [('Retry-After', '60')])
+      return
+    try:
+      self.__begin(200, "text/event-stream", headers=[('Cache-Control', 'no-cache')])
+      stream = HM_WebSrv_LiveStream(self.__cfg, pMeter, pObis, wm, self.__chunked)
+      self.wfile.write(stream.begin())
+    except:
+      live.release()
+      raise
+    self.__chunked        = False
+    self.stream           = stream
+    self.close_connection = True
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def poll(self, stream):
+    """
+    @brief   Update a live update stream by the SQL database connection of this request handler.
+    @param   stream   A HM_WebSrv_LiveStream.
+    @return  the framed data to send, maybe empty.
+    """
+    self.__sql.update()
+    return stream.update(self.__sql)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __download(self, pDBF, pURL):
+    """
+    @brief   Handler for database download requests '/<sqldb>[?meter=][&dtf=][&dtu=]'. A consistent snapshot, optionally
+             filtered to meters and a time range, is written to a temporary file, which is streamed in chunks, with
+             Content-Length or gzip encoded on the fly if the client accepts it.
+    @param   pDBF   The file name of the SQL database.
+    @param   pURL   The parsed URL query parameters.
+    """
+    self.__log.log_callinfo()
+
+    eError = []
+    pMeter = pURL.get("meter", [])
+    pDTF   = None
+    pDTU   = None
+    for m in pMeter:
+      if ( m not in self.__sql.meters ): self.__sql.update()
+      if ( m not in self.__sql.meters ): eError.append("URL query parameter 'meter = {}' is not included in DB.".format(m))
+    if ( "dtf" in pURL ):
+      try   : pDTF = self.__datetime(pURL["dtf"][0]).isoformat()
+      except: eError.append("URL query parameter 'dtf' is not of expected format.")
+    if ( "dtu" in pURL ):
+      try   : pDTU = self.__datetime(pURL["dtu"][0]).isoformat()
+      except: eError.append("URL query parameter 'dtu' is not of expected format.")
+    if ( eError ):
+      for e in eError:
+        self.__log.log(pyLOG.LogLvl.ERROR, e)
+      self.send_error(400, " ".join(eError))
+      return
+
+    fd, path = tempfile.mkstemp(suffix=".sqlite", dir=self.__cfg.get("tmpdir", os.path.dirname(os.path.abspath(self.__cfg["sqldb"]))))
+    os.close(fd)
+    try:
       try:
-        data_plot = ""
-        axis_plot = ""
-        color     = 0x00FF00
-        for i,(k,v) in enumerate(self.__sql.extract(pMeter, pDTF.isoformat(), pDTU.isoformat(), pENP, pObis).items()):
-          random.seed(color)
-          color = (random.randint(0,255)<<16) + (random.randint(0,255)<<8) + (random.randint(0,255))
-          v["x"] = ["\""+str(i)+"\"" for i in v["x"]]
-          v["y"] = [     str(i)      for i in v["y"]]
-          nl     = {True:"\n", False:""}[i!=(len(pObis)-1)]
-          yax_f  = {False:"yaxis     ", True:"yaxis{:<5}".format(i+1)}[bool(i)]
-          yax_s  = {False:"", True:",\n{sp2}yaxis: 'y{}'".format(i+1, sp2=" "*6)}[bool(i)]
-          axis_plot = axis_plot + "{sp1}{}: {{title: '{:X}', zeroline: false, titlefont: {{color: '#{col:X}'}}, tickfont: {{color: '#{col:X}'}}{}}},{}".format(yax_f, k, {True:", overlaying: 'y', position: {}, anchor: 'free'".format((len(pObis)*0.05)-(0.05*i)), False:""}[bool(i)], nl, col=color, sp1=" "*4)
-          data_plot = data_plot + "{sp1}{{\n{sp2}x    : [{}],\n{sp2}y    : [{}],\n{sp2}type : 'scatter',\n{sp2}line : {{color: '#{col:X}', shape: 'vh'}}, \n{sp2}name : '{:X} [{}] ({} points)'{}\n{sp1}}},{}".format(",".join(v["x"]), ",".join(v["y"]), k, self.__sql.units[v["u"][0]]["dsc"], len(v["x"]), yax_s, nl, col=color, sp1=" "*4, sp2=" "*6)
+        self.__sql.snapshot(path, pMeter, pDTF, pDTU)
       except:
-        self.__log.log(pyLOG.LogLvl.ERROR, "Could not create html plot data.\n{}".format(traceback.format_exc()))
-        data_plot = "{x:[0], y:[0], type:'scatter', name:'dummy'}"
-      else:
-        if ( not data_plot ):
-          self.__log.log(pyLOG.LogLvl.ERROR, "No data to plot.")
-          data_plot = "{x:[0], y:[0], type:'scatter', name:'dummy'}"
+        self.__log.log(pyLOG.LogLvl.ERROR, "Could not create database snapshot.\n{}".format(traceback.format_exc()))
+        self.send_error(500, "Could not create database snapshot.")
+        return
+      gzip = self.__accepts("gzip")
+      self.__begin(200, 'application/octet-stream', {True:None, False:os.path.getsize(path)}[gzip], gzip,
+                   [('Content-Disposition', 'attachment; filename="{}"'.format(os.path.basename(pDBF)))])
+      with open(path, "rb") as f:
+        while ( True ):
+          chunk = f.read(65536)
+          if ( not chunk ): break
+          self.__write(chunk)
+      self.__end()
+    finally:
+      os.remove(path)
 
-      try:
-        html_plot = """
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __plot(self, pMeter, pDTF, pDTU, pENP, pObis, pNPT, pDSM):
+    """
+    @brief   Create the html plot of a meter piece by piece. One trace per OBIS code is declared first, the points are
+             then pushed to the traces by one script per extracted chunk and the plot is drawn at last.
+    @param   pMeter    meter.
+    @param   pDTF      datetime from.
+    @param   pDTU      datetime until.
+    @param   pENP      every nth point.
+    @param   pObis     list of OBIS codes.
+    @param   pNPT      number of points per OBIS code.
+    @param   pDSM      downsampling method.
+    @return  a generator of html strings.
+    """
+    axis_plot = ""
+    data_plot = ""
+    color     = 0x00FF00
+    for i,k in enumerate(pObis):
+      random.seed(color)
+      color = (random.randint(0,255)<<16) + (random.randint(0,255)<<8) + (random.randint(0,255))
+      nl    = {True:"\n", False:""}[i!=(len(pObis)-1)]
+      yax_f = {False:"yaxis     ", True:"yaxis{:<5}".format(i+1)}[bool(i)]
+      yax_s = {False:"", True:",\n{sp2}yaxis: 'y{}'".format(i+1, sp2=" "*6)}[bool(i)]
+      axis_plot = axis_plot + "{sp1}{}: {{title: '{:X}', zeroline: false, titlefont: {{color: '#{col:X}'}}, tickfont: {{color: '#{col:X}'}}{}}},{}".format(yax_f, int(k), {True:", overlaying: 'y', position: {}, anchor: 'free'".format((len(pObis)*0.05)-(0.05*i)), False:""}[bool(i)], nl, col=color, sp1=" "*4)
+      data_plot = data_plot + "{sp1}{{\n{sp2}x    : [],\n{sp2}y    : [],\n{sp2}type : 'scatter',\n{sp2}line : {{color: '#{col:X}', shape: 'vh'}}, \n{sp2}name : '{:X}'{}\n{sp1}}},{}".format(int(k), yax_s, nl, col=color, sp1=" "*4, sp2=" "*6)
+
+    yield """
         <div id="id_{mtr}" style="width:90%;height:250px;"></div>
         <script>
           var selectorOptions = {{
@@ -387,61 +1596,49 @@ class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
   [
 {dat}
   ];
-          Plotly.plot(fig_{mtr}, dat_{mtr}, lay_{mtr}, modebar);
         </script>
-    """.format(mtr=pMeter, xax=(len(pObis)*0.05), yax=axis_plot, dat=data_plot, tit="{} ({})".format(pMeter, self.__sql.meters[pMeter]["dsc"]))
-      except:
-        traceback.print_exc()
-        html_plot = ""
+""".format(mtr=pMeter, xax=(len(pObis)*0.05), yax=axis_plot, dat=data_plot, tit="{} ({})".format(pMeter, self.__sql.meters[pMeter]["dsc"]))
 
-    else:
-      html_plot = "{tx}".format(tx="\n".join(["{sp}<p>{ms}</p>".format(sp=" "*4, ms=e) for e in eError]))
-
-    # create html form
-    html_form = """
-    <form method="get">
-      <input type='submit' value='Submit'/>
-      <fieldset>
-        <legend>
-          Intervall
-        </legend>
-        <input type="text"   name="dtf" id="id_dtf" maxlength="25" size="25" value="{dtf}" required/> <img src="https://www.rainforestnet.com/datetimepicker/images2/cal.gif" onclick="javascript:NewCssCal('id_dtf', 'yyyyMMdd', 'arrow', 'true', '24', false, 'past')" style="cursor:pointer"/> <label for="id_dtf">Start date & time</label>
-        <span style="display:inline-block; width:75;"></span>
-        <input type="text"   name="dtu" id="id_dtu" maxlength="25" size="25" value="{dtu}" required/> <img src="https://www.rainforestnet.com/datetimepicker/images2/cal.gif" onclick="javascript:NewCssCal('id_dtu', 'yyyyMMdd', 'arrow', 'true', '24', false, 'past')" style="cursor:pointer"/> <label for="id_dtu">End date & time</label>
-        <span style="display:inline-block; width:75;"></span>
-        <input type="number" name="enp" id="id_enp" min="1" max="1000" value="{enp}" required> <label for="id_exp">only use every Nth point</label>
-      </fieldset>
-      <fieldset>
-        <legend>
-          Meters
-        </legend>
-{mtr}
-      </fieldset>
-      <fieldset>
-        <legend>
-          Indicators
-        </legend>
-{ind}
-      </fieldset>
-    </form>
-""".format( dtf=pDTF.strftime("%Y-%m-%d %H:%M"),
-            dtu=pDTU.strftime("%Y-%m-%d %H:%M"),
-            enp=pENP,
-            mtr="\n".join(["{sp}<input type=\"radio\"    name=\"meter\" id=\"id_{id}\" value=\"{id}\" {chk}><label for=\"id_{id}\">{id} ({ds})</label><br/>".format(         sp=" "*8, id=k, ds=v["dsc"],               chk={True:"checked", False:" "*7}[    k  in pMeter]) for k,v in sorted(self.__sql.meters.items())]),
-            ind="\n".join(["{sp}<input type=\"checkbox\" name=\"obis\"  id=\"id_{id}\" value=\"{id}\" {chk}><label for=\"id_{id}\">{id:X}   [{un}]   ({ds})</label><br/>".format(sp=" "*8, id=k, ds=v["dsc"], un=v["unit"], chk={True:"checked", False:" "*7}[str(k) in pObis ]) for k,v in sorted(self.__sql.obis.items())  ]),
-          )
+    # live updates if the time range is not ended before the last stored timestamp, not in mode single
+    last  = self.__sql.getLastTimestamp(pMeter)
+    live  = ( None != getattr(self.server, "live", None) and None != last and pDTU >= last )
 
-    # create link
-    html_link = """
-    <a href="{cfg}">download configuration</a></br>
-    <a href="{dbf}">download database</a>
-    """.format(cfg=pCFG, dbf=pDBF)
+    # index of the trace, unit and number of points per OBIS code
+    trace = {int(k):[i, None, 0] for i,k in enumerate(pObis)}
+    try:
+      for k,v in self.__sql.extract_iter(pMeter, pDTF.isoformat(), pDTU.isoformat(), pENP, pObis, pNPT, pDSM):
+        if ( k not in trace or not v["x"] ): continue
+        trace[k][1] = {True:v["u"][0], False:trace[k][1]}[None == trace[k][1]]
+        trace[k][2] = trace[k][2] + len(v["x"])
+        yield "{sp}<script>dat_{mtr}[{i}].x.push({x});dat_{mtr}[{i}].y.push({y});</script>\n".format(mtr=pMeter, i=trace[k][0], x=",".join(["\""+str(e)+"\"" for e in v["x"]]), y=",".join([str(e) for e in v["y"]]), sp=" "*8)
+    except:
+      self.__log.log(pyLOG.LogLvl.ERROR, "Could not create html plot data.\n{}".format(traceback.format_exc()))
+      trace = {}
+    if ( not [k for k,v in trace.items() if v[2]] ):
+      self.__log.log(pyLOG.LogLvl.ERROR, "No data to plot.")
+      name = "dat_{mtr} = [{{x:[0], y:[0], type:'scatter', name:'dummy'}}];".format(mtr=pMeter)
+      live = False
+    else:
+      name = "".join(["dat_{mtr}[{i}].name = '{k:X} [{un}] ({n} points)';".format(mtr=pMeter, i=v[0], k=k, un=self.__sql.units[v[1]]["dsc"], n=v[2]) for k,v in trace.items() if v[2]])
 
-    # create html
-    html = "<html>\n" + html_head + "  <body>\n" + html_plot + html_form + html_link + "  </body>\n" + "</html>"
+    yield """        <script>
+          {nam}
+          Plotly.plot(fig_{mtr}, dat_{mtr}, lay_{mtr}, modebar);
+        </script>
+    """.format(mtr=pMeter, nam=name)
 
-    self.wfile.write(bytes(html, "utf8"))
-    return
+    if ( live ):
+      yield """    <script>
+          if ( window.EventSource ) {{
+            var idx_{mtr} = {{{idx}}};
+            var src_{mtr} = new EventSource('/api/live?{qry}');
+            src_{mtr}.onmessage = function(e) {{
+              var d = JSON.parse(e.data);
+              if ( d.obis in idx_{mtr} ) Plotly.extendTraces(fig_{mtr}, {{x: [d.x], y: [d.y]}}, [idx_{mtr}[d.obis]]);
+            }};
+          }}
+        </script>
+    """.format(mtr=pMeter, idx=", ".join(["{}: {}".format(k, v[0]) for k,v in trace.items()]), qry=urllib.parse.urlencode([("meter", pMeter)] + [("obis", k) for k in trace]))
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def __call__(self, *args, **kwargs):
@@ -453,6 +1650,312 @@ class HM_WebSrv_HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
 
 ########################################################################################################################
 
+class HM_WebSrv_HTTPServer(http.server.HTTPServer):
+  """
+  @brief   HM web server HTTP server serving the requests by a pool of worker threads. Each worker owns a request
+           handler and with it a read-only connection to the SQL database. Accepted requests wait in a bounded queue;
+           if it is full, the request is answered by '503 Service Unavailable' (plain HTTP) or closed (TLS). The
+           listening socket accepts plain connections, a worker does the TLS handshake within websrv keepalive seconds,
+           so a slow client does not block accepting the others. Live update streams are passed on to the broadcaster
+           thread of HM_WebSrv_Live.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, server_address, cfg, sslctx=None):
+    """
+    @brief   Constructor.
+    @param   server_address   The server address tuple (address, port).
+    @param   cfg              A HM web server configuration.
+    @param   sslctx           A ssl.SSLContext or None for plain HTTP.
+    """
+    self.__cfg = cfg
+    self.__log = pyHM_log.HM_Log(self.__cfg["logref"])
+    self.__ssl = sslctx
+    self.__que = queue.Queue(maxsize=max(1, self.__cfg.get("queue", 16)))
+    self.__cch = HM_WebSrv_Cache.create(self.__cfg)
+    self.__wrk = []
+    self.live  = HM_WebSrv_Live(self.__cfg)
+    self.request_queue_size = max(5, self.__cfg.get("queue", 16))
+
+    http.server.HTTPServer.__init__(self, server_address, None)
+
+    for i in range(max(1, self.__cfg.get("workers", 4))):
+      self.__wrk.append(threading.Thread(target=self.__work, name="HM_WebSrv_Worker{}".format(i), daemon=True))
+      self.__wrk[-1].start()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def process_request(self, request, client_address):
+    """
+    @brief   Queue an accepted request for the workers.
+    @param   request          The request socket.
+    @param   client_address   The client address.
+    """
+    try:
+      self.__que.put_nowait((request, client_address))
+    except queue.Full:
+      self.__log.log(pyLOG.LogLvl.ERROR, "Request queue full, rejecting request of '{}'.".format(client_address))
+      if ( None == self.__ssl ):
+        try   : request.sendall(b"HTTP/1.0 503 Service Unavailable\r\nContent-Length: 0\r\nRetry-After: 1\r\n\r\n")
+        except: pass
+      self.shutdown_request(request)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def server_close(self):
+    """
+    @brief   Close the server socket and stop the workers.
+    """
+    http.server.HTTPServer.server_close(self)
+    for w in self.__wrk:
+      self.__que.put(None)
+    for w in self.__wrk:
+      w.join(timeout=5.0)
+    self.live.close()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __work(self):
+    """
+    @brief   Worker thread serving queued requests by its own request handler.
+    """
+    try:
+      hdl = HM_WebSrv_HTTPRequestHandler(dict(self.__cfg, readonly=True), self.__cch)
+    except:
+      self.__log.log(pyLOG.LogLvl.ERROR, "Could not create request handler.\n{}".format(traceback.format_exc()))
+      return
+    while ( True ):
+      itm = self.__que.get()
+      if ( None == itm ): break
+      request, client_address = itm
+      if ( None != self.__ssl ):
+        try:
+          request.settimeout(self.__cfg.get("keepalive", 5.0))
+          request = self.__ssl.wrap_socket(request, server_side=True, do_handshake_on_connect=False)
+          request.do_handshake()
+        except (ssl.SSLError, OSError) as e:
+          self.__log.log(pyLOG.LogLvl.DEBUG, "TLS handshake with '{}' failed: {}".format(client_address, e))
+          self.shutdown_request(request)
+          continue
+      hdl.stream = None
+      try:
+        hdl(request, client_address, self)
+      except:
+        self.handle_error(request, client_address)
+      finally:
+        if ( None != hdl.stream ): self.live.add(hdl.stream, request)
+        else                     : self.shutdown_request(request)
+
+########################################################################################################################
+
+class HM_WebSrv_AsyncWriter(object):
+  """
+  @brief   HM web server file like object passing the response of a request handler running in an executor thread to
+           an asyncio stream writer. Each write waits until the stream writer is drained (flow control).
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, loop, writer):
+    """
+    @brief   Constructor.
+    @param   loop     The asyncio event loop of the stream writer.
+    @param   writer   The asyncio stream writer.
+    """
+    self.__loop = loop
+    self.__wrt  = writer
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  async def __send(self, data):
+    """
+    @brief   Write data to the stream writer and wait until it is drained.
+    @param   data   The data.
+    """
+    self.__wrt.write(data)
+    await self.__wrt.drain()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def write(self, data):
+    """
+    @brief   Write data, blocking the calling thread until the stream writer is drained.
+    @param   data   The data.
+    """
+    asyncio.run_coroutine_threadsafe(self.__send(bytes(data)), self.__loop).result()
+    return len(data)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def flush(self):
+    """
+    @brief   Nothing to flush, every write is drained.
+    """
+    pass
+
+########################################################################################################################
+
+class HM_WebSrv_AsyncServer(object):
+  """
+  @brief   HM web server HTTP server based on asyncio streams. Connections are held by the event loop, the requests are
+           served by the request handler of the thread of an executor, each with its own read-only connection to the SQL
+           database. Live update streams are served by the task of their connection, which passes only the polling of
+           the SQL database to the executor. Provides serve_forever, shutdown and server_close like
+           http.server.HTTPServer.
+  """
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __init__(self, server_address, cfg, sslctx=None):
+    """
+    @brief   Constructor.
+    @param   server_address   The server address tuple (address, port).
+    @param   cfg              A HM web server configuration.
+    @param   sslctx           A ssl.SSLContext or None for plain HTTP.
+    """
+    self.__cfg  = cfg
+    self.__log  = pyHM_log.HM_Log(self.__cfg["logref"])
+    self.__ssl  = sslctx
+    self.__tmo  = self.__cfg.get("timeout", 60.0)
+    self.__exe  = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.__cfg.get("workers", 4)))
+    self.__tls  = threading.local()
+    self.__cch  = HM_WebSrv_Cache.create(self.__cfg)
+    self.__loop = None
+    self.live   = HM_WebSrv_Live(self.__cfg)
+    self.__srv  = None
+    self.__done = threading.Event()
+    self.__sck  = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    self.__sck.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    self.__sck.bind(server_address)
+    self.__sck.listen(max(5, self.__cfg.get("queue", 16)))
+    self.server_address = self.__sck.getsockname()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __handler(self):
+    """
+    @brief   Returns the request handler of the calling executor thread.
+    """
+    hdl = getattr(self.__tls, "hdl", None)
+    if ( None == hdl ):
+      hdl = self.__tls.hdl = HM_WebSrv_HTTPRequestHandler(dict(self.__cfg, readonly=True), self.__cch)
+    return hdl
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __handle(self, request, client_address, wfile):
+    """
+    @brief   Serve a request by the request handler of the calling executor thread.
+    @param   request          The raw request line and headers.
+    @param   client_address   The client address.
+    @param   wfile            The file like object to write the response to.
+    @return  a tuple of whether the connection shall be closed and the live update stream of the request or None.
+    """
+    hdl = self.__handler()
+    hdl.stream         = None
+    hdl.client_address = client_address
+    hdl.server         = self
+    hdl.rfile          = io.BytesIO(request)
+    hdl.wfile          = wfile
+    hdl.close_connection = True
+    hdl.handle_one_request()
+    return (hdl.close_connection, hdl.stream)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __poll(self, stream):
+    """
+    @brief   Update a live update stream by the request handler of the calling executor thread.
+    @param   stream   A HM_WebSrv_LiveStream.
+    @return  the framed data to send, maybe empty.
+    """
+    return self.__handler().poll(stream)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  async def __live(self, stream, writer):
+    """
+    @brief   Serve a live update stream every websrv livepoll seconds until it ends and release it.
+    @param   stream   A HM_WebSrv_LiveStream reserved by HM_WebSrv_Live.acquire.
+    @param   writer   The asyncio stream writer.
+    """
+    try:
+      while ( not stream.expired() ):
+        data = await self.__loop.run_in_executor(self.__exe, self.__poll, stream)
+        if ( data ):
+          writer.write(data)
+          await writer.drain()
+        await asyncio.sleep(stream.poll)
+      writer.write(stream.end())
+      await writer.drain()
+    except ConnectionError:
+      pass
+    finally:
+      self.live.release()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  async def __client(self, reader, writer):
+    """
+    @brief   Serve the requests of a connection until it is closed.
+    @param   reader   The asyncio stream reader.
+    @param   writer   The asyncio stream writer.
+    """
+    client_address = writer.get_extra_info("peername")
+    wfile          = HM_WebSrv_AsyncWriter(self.__loop, writer)
+    try:
+      while ( True ):
+        try:
+          request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.__tmo)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+          break
+        close, stream = await self.__loop.run_in_executor(self.__exe, self.__handle, request, client_address, wfile)
+        if ( None != stream ):
+          await self.__live(stream, writer)
+        if ( close ):
+          break
+    except asyncio.CancelledError:
+      pass
+    except:
+      self.__log.log(pyLOG.LogLvl.ERROR, "Could not serve request of '{}'.\n{}".format(client_address, traceback.format_exc()))
+    finally:
+      writer.close()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  async def __serve(self):
+    """
+    @brief   Serve connections until shut down.
+    """
+    self.__srv = await asyncio.start_server(self.__client, sock=self.__sck, ssl=self.__ssl, limit=65536)
+    async with self.__srv:
+      try   : await self.__srv.serve_forever()
+      except asyncio.CancelledError: pass
+    # cancel the connections still open
+    tsk = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    for t in tsk:
+      t.cancel()
+    await asyncio.gather(*tsk, return_exceptions=True)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def serve_forever(self):
+    """
+    @brief   Run the event loop until shutdown is called.
+    """
+    self.__done.clear()
+    self.__loop = asyncio.new_event_loop()
+    try:
+      self.__loop.run_until_complete(self.__serve())
+    finally:
+      self.__loop.close()
+      self.__loop = None
+      self.__done.set()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def shutdown(self):
+    """
+    @brief   Stop serving and wait until serve_forever returned, callable from another thread.
+    """
+    if ( None != self.__loop and None != self.__srv ):
+      self.__loop.call_soon_threadsafe(self.__srv.close)
+      self.__done.wait()
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def server_close(self):
+    """
+    @brief   Close the server socket and the executor.
+    """
+    self.__sck.close()
+    self.__exe.shutdown(wait=False)
+
+########################################################################################################################
+
 class HM_WebSrv(object):
   """
   @brief   HM data web server main class.
@@ -465,7 +1968,7 @@ class HM_WebSrv(object):
     @param   cfg   A full HM configuration.
     """
     self.__cfg = cfg
-    self.__log = pyLOG.Log(self.__cfg["general"]["logref"])
+    self.__log = pyHM_log.HM_Log(self.__cfg["general"]["logref"])
     self.__thd = threading.Thread(target=self.__run, args=())
     self.__srv = None
 
@@ -495,12 +1998,19 @@ class HM_WebSrv(object):
     try:
       self.__log.log(pyLOG.LogLvl.INFO, "configuring web server '{}/{}' started".format(self.__cfg["websrv"]["address"], self.__cfg["websrv"]["port"]))
       server_address = (self.__cfg["websrv"]["address"], self.__cfg["websrv"]["port"])
-      self.__srv = http.server.HTTPServer(server_address, HM_WebSrv_HTTPRequestHandler(self.__cfg["websrv"]))
-      self.__srv.socket = ssl.wrap_socket(self.__srv.socket,
-                                          server_side=True,
-                                          keyfile=self.__cfg["websrv"]["key"],
-                                          certfile=self.__cfg["websrv"]["cert"],
-                                          ssl_version=ssl.PROTOCOL_TLSv1_2)
+      if ( self.__cfg["websrv"].get("mode", "single") in ("asyncio", "pool") ):
+        sslctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        sslctx.minimum_version = ssl.TLSVersion.TLSv1_2
+        sslctx.load_cert_chain(certfile=self.__cfg["websrv"]["cert"], keyfile=self.__cfg["websrv"]["key"])
+        if ( "asyncio" == self.__cfg["websrv"]["mode"] ): self.__srv = HM_WebSrv_AsyncServer(server_address, self.__cfg["websrv"], sslctx)
+        else                                             : self.__srv = HM_WebSrv_HTTPServer(server_address, self.__cfg["websrv"], sslctx)
+      else:
+        self.__srv = http.server.HTTPServer(server_address, HM_WebSrv_HTTPRequestHandler(self.__cfg["websrv"], HM_WebSrv_Cache.create(self.__cfg["websrv"])))
+        self.__srv.socket = ssl.wrap_socket(self.__srv.socket,
+                                            server_side=True,
+                                            keyfile=self.__cfg["websrv"]["key"],
+                                            certfile=self.__cfg["websrv"]["cert"],
+                                            ssl_version=ssl.PROTOCOL_TLSv1_2)
       self.__log.log(pyLOG.LogLvl.INFO, "configuring web server '{}/{}' done".format(self.__cfg["websrv"]["address"], self.__cfg["websrv"]["port"]))
     except:
       self.__log.log(pyLOG.LogLvl.INFO, "configuring web server '{}/{}' failed".format(self.__cfg["websrv"]["address"], self.__cfg["websrv"]["port"]))
@@ -509,6 +2019,7 @@ class HM_WebSrv(object):
       self.__srv = None
     else:
       self.__srv.serve_forever()
+      self.__srv.server_close()
     finally:
       self.__log.log(pyLOG.LogLvl.DEBUG, "Exiting thread '{}'".format(self.__thd.name))
       del(self.__srv)
@@ -524,8 +2035,18 @@ def signal_handler(signal, frame):
   o_websrv.stop()
   while ( True == o_websrv.isalive() ):
     time.sleep(0.1)
+  pyHM_log.LogExit()
   os._exit(1)
 
+########################################################################################################################
+
+def trace_handler(signal, frame):
+  """
+  @brief   Application call info tracing handler function, switches the call info tracing of the loggers as
+           configured by 'trace' in the currently saved configuration.
+  """
+  pyHM_log.HM_Log.reload("pyHM.cfg")
+
 ########################################################################################################################
 ########################################################################################################################
 ########################################################################################################################
@@ -533,10 +2054,12 @@ def signal_handler(signal, frame):
 if ( __name__ == '__main__' ):
 
   with ( open("pyHM.cfg", "r") ) as fhdl:
-    cfg = yaml.load(fhdl.read())
+    cfg = yaml.safe_load(fhdl.read())
 
   signal.signal(signal.SIGINT, signal_handler)
-  pyLOG.LogInit(cfg["general"]["logger"])
+  if ( hasattr(signal, "SIGUSR1") ):
+    signal.signal(signal.SIGUSR1, trace_handler)
+  pyHM_log.LogInit(cfg["general"])
   o_websrv = HM_WebSrv(cfg)
 
   while ( True ):
@@ -18,12 +18,16 @@ stop() {
   kill -INT $(pgrep -f ${SCR_EXE})
 }
 
+trace() {
+  kill -USR1 $(pgrep -f ${SCR_EXE})
+}
+
 #--------------------------------------------------------------------
 
 cd $(dirname ${BASH_SOURCE[0]})
 
 case $1 in
-  start|stop) "$1" ;;
+  start|stop|trace) "$1" ;;
 esac
 
 cd ${PWD_EXE}